@@ -1,31 +1,82 @@
-# from .analyzer_agent import AnalyzerAgent
-# from .debugger_agent import DebuggerAgent
-# from .fixer_agent import FixerAgent
-
-# class AgentOrchestrator:
-#     def __init__(self, mistral_api_key):
-#         self.analyzer = AnalyzerAgent()
-#         self.debugger = DebuggerAgent()
-#         # Connects the Codestral service to the Fixer Agent
-#         self.fixer = FixerAgent(mistral_api_key) 
-
-#     async def run_iteration(self, repo_path, logs):
-#         # 1. Analyzer Agent: Parse logs from Member 3 [cite: 13-15]
-#         error_data = self.analyzer.process_logs(logs)
-#         if not error_data:
-#             return None # Tests passed
-        
-#         # 2. Fixer Agent: Call Codestral and rewrite file [cite: 15-16]
-#         fix_info = await self.fixer.execute_fix(repo_path, error_data)
+import os
+from app.services import async_ops
+from app.services.autofixer import autofix_source
+from app.services.fix_validator import validate_fix
+from .analyzer_agent import AnalyzerAgent
+from .debugger_agent import DebuggerAgent
+from .fixer_agent import FixerAgent, commit_message
+
+class AgentOrchestrator:
+    def __init__(self, mistral_api_key):
+        self.analyzer = AnalyzerAgent()
+        self.debugger = DebuggerAgent()
+        # Connects the Codestral service to the Fixer Agent
+        self.fixer = FixerAgent(mistral_api_key) 
+
+    async def propose_fix(self, repo_path, logs, index=None):
+        """
+        Analyzer + Autofix + Fixer + Debugger without writing anything: the
+        fixed code comes back in fix_info["fixed_code"] for apply_fix(). Safe
+        to run for many files at once. Every candidate passes the local
+        validation gate (fix_validator) against the file as it is on disk;
+        returns None when none does. `index` is the run's ModuleIndex, shared
+        by every validation.
+        """
+        # 1. Analyzer Agent: Parse logs from Member 3 [cite: 13-15]
+        error_data = self.analyzer.process_logs(logs)
+        if not error_data:
+            return None # Tests passed
+        errors = error_data.get('errors') or [error_data]
+
+        with open(os.path.join(repo_path, error_data['file']), 'r') as f:
+            source = f.read()
+
+        def validate(fixed):
+            return validate_fix(source, fixed, error_data['file'], repo_path, index)
+
+        # 2. Deterministic autofix: mechanical errors never reach the model
+        autofix = autofix_source(source, errors)
+        if autofix["fixed"] and not autofix["remaining"]:
+            verdict = await async_ops.run_blocking(validate, autofix["source"])
+            if not verdict["success"]:
+                print(f"[FIXER] Autofix of {error_data['file']} rejected ({verdict['reason']}), asking the model")
+                autofix = {"source": source, "fixed": [], "remaining": errors}
+        autofixed = {(e['bug_type'], e['line'], e.get('description')): e['autofix'] for e in autofix["fixed"]}
+
+        # 3. Fixer Agent: Call Codestral for whatever is left [cite: 15-16]
+        if autofix["remaining"]:
+            fix_info = await self.fixer.propose_fix(
+                repo_path, {"file": error_data['file'], "errors": autofix["remaining"]},
+                source=autofix["source"], validate=validate
+            )
+            if fix_info is None:
+                return None # Nothing passed validation; no commit for this file
+        else:
+            fix_info = {"fixed_code": autofix["source"]}
+        fix_info["commit_msg"] = commit_message(error_data['file'], errors)
+        fix_info["autofixed"] = len(autofix["fixed"])
         
-#         # 3. Debugger Agent: Create the Dashboard string for the Judges [cite: 63]
-#         # Required format: "TYPE error in file line X -> Fix: summary"
-#         summary = f"Codestral applied {error_data['bug_type'].lower()} patch"
-#         fix_info["dashboard_output"] = self.debugger.get_dashboard_output(error_data, summary)
+        # 4. Debugger Agent: Create the Dashboard string for the Judges [cite: 63]
+        # Required format: "TYPE error in file line X -> Fix: summary"
+        dashboard = []
+        for e in errors:
+            summary = autofixed.get((e['bug_type'], e['line'], e.get('description')))
+            summary = f"Autofix {summary}" if summary else f"Codestral applied {e['bug_type'].lower()} patch"
+            dashboard.append(self.debugger.get_dashboard_output({**e, "file": error_data['file']}, summary))
+        fix_info["dashboard_output"] = "\n".join(dashboard)
         
-#         # Add metadata for results.json
-#         fix_info.update(error_data)
-#         return fix_info
+        # Add metadata for results.json
+        fix_info.update(error_data)
+        return fix_info
+
+    def apply_fix(self, repo_path, fix_info):
+        self.fixer.apply_fix(repo_path, fix_info, fix_info)
+
+    async def run_iteration(self, repo_path, logs):
+        fix_info = await self.propose_fix(repo_path, logs)
+        if fix_info:
+            self.apply_fix(repo_path, fix_info)
+        return fix_info
 
 
 import time
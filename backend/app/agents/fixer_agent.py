@@ -1,33 +1,74 @@
 # app/agents/fixer_agent.py
 import os
-from mistralai import Mistral #
+import tempfile
+from app.services.fixer_service import FixerService
+
+def commit_message(file, errors):
+    """
+    Commit message for the fix of `errors` in `file`. The mandatory
+    "[AI-AGENT]" prefix is added by CommitBatcher.commit, not here.
+    """
+    if len(errors) == 1:
+        return f"Fix {errors[0]['bug_type']} in {file}"
+    bug_types = ", ".join(sorted({e['bug_type'] for e in errors}))
+    return f"Fix {len(errors)} errors ({bug_types}) in {file}"
 
 class FixerAgent:
     def __init__(self, api_key):
-        self.client = Mistral(api_key=api_key) #
-        self.model = "codestral-latest"
-
-    async def execute_fix(self, repo_path, error_data): # Renamed
-        file_path = os.path.join(repo_path, error_data['file'])
-        
-        # Read the broken file
-        with open(file_path, 'r') as f:
-            original_content = f.read()
+        # Connects the Codestral service (FixerService.get_repair) to the agent
+        self.service = FixerService(api_key)
+        self.model = self.service.model
 
-        # Call AI to get fixed code (simplified for brevity)
-        # fixed_code = await self.call_mistral(original_content, error_data)
-        fixed_code = "..." # AI Result
+    async def propose_fix(self, repo_path, error_data, source=None, validate=None):
+        """
+        Generate the fix without touching the working tree, so proposals for
+        different files can be produced concurrently. error_data is one error
+        or a file's whole group ({"file", "errors": [...]}), fixed in one call.
+        `source` replaces the file's content on disk (e.g. already autofixed).
+        `validate` gates the generated code (FixerService.get_repair); None is
+        returned when no attempt passes it.
+        """
+        if source is None:
+            file_path = os.path.join(repo_path, error_data['file'])
+            
+            # Read the broken file
+            with open(file_path, 'r') as f:
+                source = f.read()
 
-        # Physically write the fix to the file
-        with open(file_path, 'w') as f:
-            f.write(fixed_code)
+        # Call AI to get fixed code
+        fixed_code = await self.service.get_repair(source, error_data, validate=validate)
+        if fixed_code is None:
+            return None
 
-        # Dashboard string required for Judges
-        fix_description = f"Fix: corrected {error_data['bug_type'].lower()} issue"
-        dashboard_string = f"{error_data['bug_type']} error in {error_data['file']} line {error_data['line']} -> {fix_description}"
+        # Dashboard string required for Judges (one line per error)
+        errors = error_data.get('errors') or [error_data]
+        dashboard_string = "\n".join(
+            f"{e['bug_type']} error in {error_data['file']} line {e['line']} -> Fix: corrected {e['bug_type'].lower()} issue"
+            for e in errors
+        )
 
         return {
             "fixed_code": fixed_code,
             "dashboard_output": dashboard_string,
-            "commit_msg": f"[AI-AGENT] Fix {error_data['bug_type']} in {error_data['file']}" # Mandatory prefix
-        }
\ No newline at end of file
+            "commit_msg": commit_message(error_data['file'], errors)
+        }
+
+    def apply_fix(self, repo_path, error_data, fix_info):
+        """Physically write the fix to the file (atomically: readers never see a half-written file)."""
+        file_path = os.path.join(repo_path, error_data['file'])
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix=".agent-tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(fix_info["fixed_code"])
+            os.replace(tmp_path, file_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    async def execute_fix(self, repo_path, error_data): # Renamed
+        fix_info = await self.propose_fix(repo_path, error_data)
+        if fix_info is None:
+            return None # No fix passed validation; nothing to write
+        self.apply_fix(repo_path, error_data, fix_info)
+        return fix_info
@@ -129,33 +129,74 @@
 
 import os
 import json
+import asyncio
 from sqlalchemy.orm import Session
 from app.db.models import Run, Fix
-from app.services.git_services import clone_repo, create_branch, commit_and_push
-from app.services.repo_scanner import scan_repo
+from app.services import async_ops
+from app.services.workspace_manager import get_workspace_manager
+from app.services.job_queue import get_job_queue
+from app.services.report_store import get_report_store
+from app.services.fix_scheduler import FixScheduler, group_by_file
+from app.services.repair_cache import get_repair_cache
+from app.services.llm_client import aclose_all
+from app.utils.sealed import seal, unseal
 from app.agents.agent_orchestrator import AgentOrchestrator
 
-# Shared memory for the hackathon session
-SCAN_REPORTS = {}
+# "queue": healing runs go to the durable job queue and run in worker
+# processes (python -m app.worker). "inline": FastAPI BackgroundTasks in the
+# API process, for local development without workers.
+HEALING_EXECUTION = os.getenv("HEALING_EXECUTION", "queue")
+
+def _cache_scan_report(payload, local_path, report):
+    """
+    Keep the report for Step 2 in the shared report store, keyed by team.
+    The stored entry holds the workspace through a "report-<team>" lease
+    (so any process can give it up), which the workspace manager drops once
+    the report's TTL has passed; the entry it replaces gives its lease up —
+    a healing run still working there holds its own. The GitHub token is
+    stored sealed.
+    """
+    store, workspaces = get_report_store(), get_workspace_manager()
+    owner = f"report-{payload.team_name}"
+    stored_payload = payload.model_dump()
+    stored_payload["github_token"] = seal(stored_payload["github_token"])
+
+    previous = store.get(payload.team_name)
+    store.put(payload.team_name, {
+        "local_path": local_path,
+        "report": report,
+        "payload": stored_payload
+    })
+    # Leased after the put, so the lease never expires before the report does
+    # (our allocation reference holds the workspace in between)
+    workspaces.lease(local_path, owner)
+    workspaces.release(local_path)   # the allocation's in-process reference
+    if previous and previous["local_path"] != local_path:
+        workspaces.unlease(previous["local_path"], owner)
+
+_scan_tasks = set()   # streamed scans in flight; the loop only keeps weak references
+
+def _sse(event, data):
+    """One Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 async def handle_scan_logic(payload):
     """
     Step 1 Logic: Fresh Clone and Scan.
     Utilizes the dot notation for the RunRequest Pydantic model.
     """
+    workspaces = get_workspace_manager()
+    local_path = workspaces.allocate(payload.repo_url)
     try:
-        # Fresh clone every time to ensure we have the latest code
-        local_path = clone_repo(payload.repo_url)
+        # Fresh checkout in a workspace of its own every time — off the event
+        # loop, like every blocking git/scan call below
+        await async_ops.clone_repo(payload.repo_url, strategy=payload.clone_strategy, local_path=local_path)
         
         # Run static analysis
-        report = scan_repo(local_path, payload.repo_url)
+        report = await async_ops.scan_repo(local_path, payload.repo_url)
         
         # Cache for Step 2
-        SCAN_REPORTS[payload.team_name] = {
-            "local_path": local_path,
-            "report": report,
-            "payload": payload.model_dump()
-        }
+        _cache_scan_report(payload, local_path, report)
 
         return {
             "success": True, 
@@ -165,17 +206,81 @@ async def handle_scan_logic(payload):
         }
     except Exception as e:
         print(f"[SCAN ERROR] {str(e)}")
+        workspaces.release(local_path)
         return {"success": False, "error": str(e)}
 
+async def stream_scan_logic(payload):
+    """
+    Step 1 Logic, streamed: the same clone + scan as handle_scan_logic, but
+    emitted as Server-Sent Events while the work happens instead of one
+    response at the end.
+
+    Events:
+        clone     {"stage", "percent", "message"}   git clone progress
+        discovery {"source_files", "test_files", "incremental"}
+        errors    {"file", "errors"}                one batch per file with errors
+        logic     {"errors"}                        pytest results
+        summary   {"total_errors", "summary", "commit"}
+        error     {"error"}                         scan failed; stream ends
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    done = object()
+
+    def emit(event, data):
+        loop.call_soon_threadsafe(queue.put_nowait, (event, data))
+
+    def on_scan_event(event, data):
+        # Called on the pool thread as iter_scan produces each event
+        if event == "file":
+            emit("errors", data)
+        elif event == "report":
+            # Cache for Step 2
+            _cache_scan_report(payload, local_path, data)
+            emit("summary", {
+                "total_errors": data["total_errors"],
+                "summary": data["summary"],
+                "commit": data["commit"]
+            })
+        else:
+            emit(event, data)
+
+    async def run_scan():
+        # Clone + scan through async_ops, under the same per-repo locks as
+        # handle_scan_logic; results are handed over through the queue one
+        # event at a time
+        try:
+            await async_ops.clone_repo(payload.repo_url, progress=lambda p: emit("clone", p),
+                                       strategy=payload.clone_strategy, local_path=local_path)
+            await async_ops.stream_scan(local_path, payload.repo_url, on_scan_event)
+        except Exception as e:
+            print(f"[SCAN ERROR] {str(e)}")
+            workspaces.release(local_path)
+            emit("error", {"error": str(e)})
+        finally:
+            emit(done, None)
+
+    workspaces = get_workspace_manager()
+    local_path = workspaces.allocate(payload.repo_url)
+    # A task of its own: the scan finishes (and its report is cached) even
+    # if the client goes away mid-stream
+    task = loop.create_task(run_scan())
+    _scan_tasks.add(task)
+    task.add_done_callback(_scan_tasks.discard)
+    while True:
+        event, data = await queue.get()
+        if event is done:
+            break
+        yield _sse(event, data)
+
 async def handle_fix_logic(team_name, background_tasks, db):
     """
     Step 2 Logic: Background task initialization.
     Fixes the NotNullViolation by providing default values.
     """
-    if team_name not in SCAN_REPORTS:
+    data = get_report_store().get(team_name)
+    if data is None:
         return {"success": False, "error": f"No scan report found for {team_name}."}
-
-    data = SCAN_REPORTS[team_name]
     
     # Create the DB entry with required fields to satisfy PostgreSQL constraints
     new_run = Run(
@@ -190,10 +295,17 @@ async def handle_fix_logic(team_name, background_tasks, db):
     db.commit()
     db.refresh(new_run)
 
-    # Trigger sequential multi-agent healing
-    background_tasks.add_task(process_healing_task, new_run.id, data, db)
-    
-    return {"success": True, "run_id": new_run.id}
+    # Trigger sequential multi-agent healing; the run holds the workspace
+    # until it finishes, even if a re-scan replaces this report meanwhile
+    get_workspace_manager().lease(data["local_path"], f"run-{new_run.id}")
+    if HEALING_EXECUTION == "inline":
+        background_tasks.add_task(_heal_in_workspace, new_run.id, data, db)
+        return {"success": True, "run_id": new_run.id}
+
+    # The lease outlives this process; the worker gives it up when the job is
+    # done for good
+    job_id = get_job_queue().enqueue("heal", {"run_id": new_run.id, "data": data}, ref=f"run-{new_run.id}")
+    return {"success": True, "run_id": new_run.id, "job_id": job_id}
 
 async def get_fix_progress_logic(run_id, db):
     """Step 3 Logic: Live database query for progress."""
@@ -202,18 +314,43 @@ async def get_fix_progress_logic(run_id, db):
         return {"success": False}
 
     fixes = db.query(Fix).filter(Fix.run_id == run_id).all()
+    job = get_job_queue().find(f"run-{run_id}") if HEALING_EXECUTION != "inline" else None
     return {
         "success": True,
         "status": run.status,
         "branch": run.branch,
         "fixed_count": len([f for f in fixes if f.status == "Fixed"]),
-        "details": fixes
+        "details": fixes,
+        "job": {
+            "status": job["status"],
+            "attempts": job["attempts"],
+            "last_error": job["last_error"]
+        } if job else None
     }
 
-async def process_healing_task(run_id, data, db):
+def startup_logic():
+    """App startup: collect workspaces orphaned by processes that are gone."""
+    get_workspace_manager().sweep_orphans()
+
+async def shutdown_logic():
+    """App shutdown: inline healing runs share the server loop's LLM clients."""
+    await aclose_all()
+
+async def _heal_in_workspace(run_id, data, db):
+    try:
+        await process_healing_task(run_id, data, db)
+    finally:
+        get_workspace_manager().unlease(data["local_path"], f"run-{run_id}")
+
+async def process_healing_task(run_id, data, db, retry=False):
     """
-    The sequential Multi-Agent worker.
+    The Multi-Agent worker.
     Delegates to Analyzer, Debugger, and Fixer agents.
+
+    retry=True marks another attempt at a run that failed part-way: the
+    checkout is reset to the scanned commit, the earlier attempt's Fix rows
+    are dropped and its pushed commits replaced, so the run starts over
+    instead of stacking fixes on a half-fixed tree.
     """
     # Initialize the Orchestrator with your Mistral Key
     orchestrator = AgentOrchestrator(mistral_api_key=os.environ.get("MISTRAL_API_KEY"))
@@ -222,45 +359,94 @@ async def process_healing_task(run_id, data, db):
     payload = data["payload"]
     report = data["report"]
 
-    # Deduplicate: one fix per file to prevent push race conditions
-    unique_failures = {err['file']: err for err in report['errors']}.values()
+    # One repair per file covering all of its errors (not just the last one)
+    file_groups = group_by_file(report['errors'])
+
+    if retry:
+        if report.get("commit"):
+            await async_ops.reset_workspace(local_path, report["commit"])
+        db.query(Fix).filter(Fix.run_id == run_id).delete(synchronize_session=False)
+        db.commit()
+        print(f"[FIXER] Run {run_id}: retrying from {(report.get('commit') or 'the current tree')[:7]}")
     
     # Initialize the specific AI branch
-    branch = create_branch(local_path, payload["team_name"], payload["leader_name"])
+    branch = await async_ops.create_branch(local_path, payload["team_name"], payload["leader_name"])
     
     # Update Run record with the branch name
     run = db.query(Run).filter(Run.id == run_id).first()
     run.branch = branch
     db.commit()
 
-    for failure in unique_failures:
-        # --- MULTI-AGENT HANDOFF ---
-        # 1. Debugger validates the bug_type
-        # 2. Fixer generates code and commit message
-        agent_result = await orchestrator.run_iteration(local_path, failure) #
+    # Per-fix verification: each fix re-checks only the touched file, its
+    # importers and the tests exercising it — no full rescan at the end
+    verifier = await async_ops.new_verifier(local_path, report)
+
+    # One local commit per fix; pushes are batched at checkpoints
+    batcher = await async_ops.new_batcher(local_path, branch, unseal(payload["github_token"]), payload["repo_url"],
+                                          replace_remote=retry)
+    unpushed = []   # Fix rows whose commits haven't reached the remote yet
 
+    def settle(push_result, final=False):
+        # Commits of a failed checkpoint push stay pending and ride along with
+        # the next one; only a failed end-of-run push fails their fixes
+        if push_result is None:
+            return
+        if push_result["success"]:
+            unpushed.clear()
+        elif final:
+            for fix in unpushed:
+                fix.status = "Failed"
+            db.commit()
+
+    # --- MULTI-AGENT HANDOFF ---
+    # Fixes for different files are generated concurrently (bounded and
+    # rate-limited); this loop is the only writer: apply, verify and commit
+    # one fix at a time as proposals come in
+    scheduler = FixScheduler(orchestrator, local_path, index=verifier.index)
+    async for group, agent_result in scheduler.run(file_groups):
         if agent_result:
-            # Safe sequential push with 'pull before push' logic
-            push_result = commit_and_push(
-                repo_path=local_path,
-                branch_name=branch,
-                commit_message=agent_result.get("commit_msg", "Apply AI Fix"),
-                github_token=payload["github_token"],
-                repo_url=payload["repo_url"]
-            )
-
-            # Record result using Agent's validated metadata
-            new_fix = Fix(
-                run_id=run_id,
-                file=failure["file"],
-                bug_type=agent_result.get("bug_type", failure["bug_type"]),
-                line=failure["line"],
-                status="Fixed" if push_result["success"] else "Failed"
-            )
-            db.add(new_fix)
+            await async_ops.apply_fix(orchestrator, local_path, agent_result)
+            verification = await async_ops.verify(verifier, [group["file"]])
+
+            commit_result = await async_ops.commit(batcher, agent_result.get("commit_msg", "Apply AI Fix"),
+                                                   paths=[group["file"]])
+
+            # One Fix row per error: each is resolved or not on its own
+            new_fixes = []
+            for failure in group["errors"]:
+                resolved = verifier.is_resolved(failure)
+                new_fixes.append(Fix(
+                    run_id=run_id,
+                    file=failure["file"],
+                    bug_type=failure["bug_type"],
+                    line=failure["line"],
+                    status="Fixed" if commit_result["success"] and resolved else "Failed"
+                ))
+            db.add_all(new_fixes)
             db.commit()
+            if commit_result["success"]:
+                unpushed.extend(new_fixes)
+                settle(commit_result["push"])
+            fixed = sum(fix.status == "Fixed" for fix in new_fixes)
+            print(f"[VERIFY] {group['file']}: {fixed}/{len(new_fixes)} error(s) resolved, "
+                  f"{verification['total_errors']} error(s) left in repo")
+        else:
+            # No fix passed the validation gate: nothing was written or committed
+            db.add_all([
+                Fix(run_id=run_id, file=failure["file"], bug_type=failure["bug_type"],
+                    line=failure["line"], status="Failed")
+                for failure in group["errors"]
+            ])
+            db.commit()
+            print(f"[VERIFY] {group['file']}: no valid fix, left untouched")
+
+    # End-of-run checkpoint: push whatever is still local
+    settle(await async_ops.flush(batcher), final=True)
 
-    # Final Verification Scan
-    final_report = scan_repo(local_path, payload["repo_url"])
-    run.status = "PASSED" if final_report["total_errors"] == 0 else "FAILED"
-    db.commit()
\ No newline at end of file
+    cache_stats = get_repair_cache().stats()
+    print(f"[FIXER] Repair cache: {cache_stats['replays']} replayed, hit rate {cache_stats['hit_rate']}, "
+          f"{cache_stats['entries']} entries / {cache_stats['bytes']} bytes")
+
+    # Verdict from the incrementally maintained error picture
+    run.status = "PASSED" if verifier.total_errors == 0 else "FAILED"
+    db.commit()
@@ -1,6 +1,6 @@
 # app/db/schemas.py
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, EmailStr
 
@@ -9,6 +9,8 @@ class RunRequest(BaseModel):
     team_name: str
     leader_name: str
     github_token: str
+    # None = CLONE_STRATEGY (default "worktree"); "auto" picks the cheapest for the repo
+    clone_strategy: Optional[Literal["full", "shallow", "blobless", "reference", "worktree", "auto"]] = None
 
 class RunResponse(BaseModel):
     status: str
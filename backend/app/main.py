@@ -14,6 +14,7 @@ load_dotenv()
 from app.routes.agent_routes import router as agent_router
 from app.routes.auth_routes import router as auth_router
 from app.routes.user_routes import router as user_router
+from app.controllers.agent_controller import startup_logic, shutdown_logic
 
 app = FastAPI(
     title="CI/CD Healing Agent API 🚀"
@@ -48,6 +49,18 @@ app.include_router(agent_router, prefix="/api/agent", tags=["Agent"])
 app.include_router(auth_router, prefix="/api/auth", tags=["Auth"])
 app.include_router(user_router, prefix="/api/users", tags=["Users"])
 
+# ---------------------------
+# 🔌 Startup: sweep orphaned workspaces / Shutdown: close pooled LLM
+#    connections (inline healing runs)
+# ---------------------------
+@app.on_event("startup")
+def startup():
+    startup_logic()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await shutdown_logic()
+
 # ---------------------------
 # 🏠 Root Endpoint
 # ---------------------------
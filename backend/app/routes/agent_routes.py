@@ -19,11 +19,13 @@
     
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.db.database import get_db
 from app.db.schemas import RunRequest
 from app.controllers.agent_controller import (
     handle_scan_logic, 
+    stream_scan_logic,
     handle_fix_logic, 
     get_fix_progress_logic
 )
@@ -38,6 +40,15 @@ async def scan_repo_endpoint(payload: RunRequest):
         raise HTTPException(status_code=500, detail=result.get("error"))
     return result
 
+@router.post("/scan-repo/stream")
+async def scan_repo_stream_endpoint(payload: RunRequest):
+    """Step 1, streamed: clone progress, per-file errors and the summary as SSE."""
+    return StreamingResponse(
+        stream_scan_logic(payload),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/fix-all")
 async def fix_all_endpoint(team_name: str, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Step 2: HTTP layer for triggering background healing."""
@@ -0,0 +1,121 @@
+# app/services/async_ops.py
+# Async facade over git_services / repo_scanner / verifier (and the agents'
+# file writes).
+# Every blocking git or analysis call made from a request handler or a
+# healing task goes through here: it runs on a bounded thread pool, never on
+# the uvicorn event loop, and calls touching the same checkout (or cloning the
+# same repo URL) are serialized with a per-key asyncio lock so concurrent runs
+# can't interleave commits, verification and pushes on one working tree.
+
+import os
+import asyncio
+import logging
+import weakref
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services import git_services, repo_scanner
+from app.services.verifier import VerificationEngine
+
+logger = logging.getLogger(__name__)
+
+GIT_OPS_WORKERS = int(os.getenv("GIT_OPS_WORKERS", "0")) or min(32, (os.cpu_count() or 1) * 4)
+
+_executor = None
+_locks = weakref.WeakValueDictionary()   # key → asyncio.Lock, dropped once nobody holds or awaits it
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Process-wide pool for blocking git / scan work, created lazily on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=GIT_OPS_WORKERS, thread_name_prefix="git-ops")
+        logger.info(f"[ASYNC] Blocking git/scan work runs on {GIT_OPS_WORKERS} thread(s)")
+    return _executor
+
+
+def repo_lock(key: str) -> asyncio.Lock:
+    """The lock for one checkout path or repo URL (created on first use; event-loop only)."""
+    if os.path.isabs(key):
+        key = os.path.realpath(key)   # GitPython may hand back a resolved working_tree_dir
+    lock = _locks.get(key)
+    if lock is None:
+        lock = asyncio.Lock()
+        _locks[key] = lock
+    return lock
+
+
+async def run_blocking(fn, *args, lock_key: str = None, **kwargs):
+    """Run fn(*args, **kwargs) on the pool; under repo_lock(lock_key) when given."""
+    loop = asyncio.get_running_loop()
+    call = functools.partial(fn, *args, **kwargs)
+    if lock_key is None:
+        return await loop.run_in_executor(get_executor(), call)
+    async with repo_lock(lock_key):
+        return await loop.run_in_executor(get_executor(), call)
+
+
+# ─── git_services ─────────────────────────────────────────────────────────────
+
+async def clone_repo(repo_url: str, progress=None, strategy: str = None, local_path: str = None) -> str:
+    # Keyed by URL: runs on the same repo queue here instead of each parking
+    # a pool thread on the mirror lock
+    return await run_blocking(git_services.clone_repo, repo_url, progress, strategy, local_path,
+                              lock_key=repo_url)
+
+
+async def create_branch(repo_path: str, team_name: str, leader_name: str) -> str:
+    return await run_blocking(git_services.create_branch, repo_path, team_name, leader_name,
+                              lock_key=repo_path)
+
+
+async def reset_workspace(repo_path: str, commit: str):
+    return await run_blocking(git_services.reset_workspace, repo_path, commit, lock_key=repo_path)
+
+
+async def new_batcher(repo_path: str, branch_name: str, github_token: str, repo_url: str,
+                      **kwargs) -> git_services.CommitBatcher:
+    return await run_blocking(git_services.CommitBatcher, repo_path, branch_name, github_token, repo_url,
+                              lock_key=repo_path, **kwargs)
+
+
+async def commit(batcher: git_services.CommitBatcher, commit_message: str, paths: list = None) -> dict:
+    return await run_blocking(batcher.commit, commit_message, paths, lock_key=batcher.repo.working_tree_dir)
+
+
+async def flush(batcher: git_services.CommitBatcher) -> dict:
+    return await run_blocking(batcher.flush, lock_key=batcher.repo.working_tree_dir)
+
+
+async def release_checkout(local_path: str):
+    return await run_blocking(git_services.release_checkout, local_path, lock_key=local_path)
+
+
+# ─── repo_scanner / verifier ──────────────────────────────────────────────────
+
+async def scan_repo(repo_path: str, repo_url: str = "", **kwargs) -> dict:
+    return await run_blocking(repo_scanner.scan_repo, repo_path, repo_url, lock_key=repo_path, **kwargs)
+
+
+async def stream_scan(repo_path: str, repo_url: str, on_event, **kwargs):
+    """repo_scanner.iter_scan under the checkout's lock; on_event(event, data) is called on the pool thread."""
+    def drain():
+        for event, data in repo_scanner.iter_scan(repo_path, repo_url, **kwargs):
+            on_event(event, data)
+    return await run_blocking(drain, lock_key=repo_path)
+
+
+async def new_verifier(repo_path: str, report: dict) -> VerificationEngine:
+    return await run_blocking(VerificationEngine, repo_path, report, lock_key=repo_path)
+
+
+async def verify(verifier: VerificationEngine, changed_files: list) -> dict:
+    return await run_blocking(verifier.verify, changed_files, lock_key=verifier.repo_path)
+
+
+# ─── agents ───────────────────────────────────────────────────────────────────
+
+async def apply_fix(orchestrator, repo_path: str, fix_info: dict):
+    # Writes the proposed file under the checkout's lock, so it can't land
+    # between another fix's verify and commit
+    return await run_blocking(orchestrator.apply_fix, repo_path, fix_info, lock_key=repo_path)
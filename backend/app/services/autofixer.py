@@ -0,0 +1,356 @@
+# app/services/autofixer.py
+# Deterministic fixes for mechanical errors, applied before any LLM call.
+# Unused imports (F401), unused locals (F841), string + variable concatenation
+# (TYPE_ERROR) and simple indentation slips are rewritten straight from the AST
+# positions in milliseconds; only what no rule could fix goes to the model.
+# Every rewrite must leave the file parseable — and compilable, when nothing is
+# left for the model — or the whole pass is dropped.
+
+import ast
+import re
+import logging
+import warnings
+
+logger = logging.getLogger(__name__)
+
+# (bug_type, compiled description pattern, fixer(source, tree, error, match))
+_RULES = []
+
+
+def autofix_rule(bug_type: str, pattern: str):
+    """
+    Register a fixer for errors of bug_type whose description matches pattern.
+
+        @autofix_rule("LINTING", r"^F401:? '(?P<name>[^']+)' imported but unused")
+        def fix_unused_import(source, tree, error, match):
+            ...
+            return new_source, line_delta, "removed unused import 'os'"
+
+    The fixer returns None when it can't handle this particular occurrence.
+    `tree` is None when the source doesn't parse.
+    """
+    def register(fixer):
+        _RULES.append((bug_type, re.compile(pattern), fixer))
+        return fixer
+    return register
+
+
+# ─── Source editing helpers ──────────────────────────────────────────────────
+
+def _char_col(line: str, byte_offset: int) -> int:
+    """AST column offsets count UTF-8 bytes; convert to a str index."""
+    return len(line.encode("utf-8")[:byte_offset].decode("utf-8", errors="ignore"))
+
+
+def _compiles(source: str, path: str = "<autofix>") -> bool:
+    """
+    A full compile, not just ast.parse: the compiler's own checks ("'return'
+    outside function", "'yield' outside function", misplaced nonlocal...)
+    only run past the AST stage.
+    """
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            compile(source, path, "exec", dont_inherit=True)
+        return True
+    except (SyntaxError, ValueError):
+        return False
+
+
+def _replace_statement(source: str, node: ast.stmt, replacement: str):
+    """
+    Replace the lines holding statement `node` with `replacement` (None to
+    delete it, falling back to `pass` when it was alone in its block).
+
+    Returns:
+        (new_source, line_delta), or None when the statement shares a line
+        with other code.
+    """
+    lines = source.splitlines(keepends=True)
+    start, end = node.lineno - 1, node.end_lineno - 1
+    prefix = lines[start][:_char_col(lines[start], node.col_offset)]
+    suffix = lines[end][_char_col(lines[end], node.end_col_offset):]
+    if prefix.strip() or not (suffix.strip() == "" or suffix.lstrip().startswith("#")):
+        return None
+    newline = "\n" if lines[end].endswith("\n") else ""
+
+    if replacement is not None:
+        new_lines = [prefix + replacement + suffix.rstrip("\r\n") + newline]
+    else:
+        new_lines = []
+    candidate = "".join(lines[:start] + new_lines + lines[end + 1:])
+    if replacement is None and not _compiles(candidate):
+        new_lines = [prefix + "pass" + newline]
+        candidate = "".join(lines[:start] + new_lines + lines[end + 1:])
+    return candidate, len(new_lines) - (end - start + 1)
+
+
+def _nodes_at(tree: ast.AST, line: int, *node_types):
+    return [n for n in ast.walk(tree) if isinstance(n, node_types) and getattr(n, "lineno", None) == line]
+
+
+# ─── Rules ───────────────────────────────────────────────────────────────────
+
+def _import_label(node, alias: ast.alias) -> str:
+    """The name pyflakes uses for an import in its F401 message."""
+    if isinstance(node, ast.Import):
+        full = alias.name
+    else:
+        module = "." * (node.level or 0) + (node.module or "")
+        full = f"{module}.{alias.name}" if node.module else f"{module}{alias.name}"
+    return f"{full} as {alias.asname}" if alias.asname else full
+
+
+@autofix_rule("LINTING", r"^F401:? '(?P<name>[^']+)' imported but unused")
+def fix_unused_import(source, tree, error, match):
+    if tree is None:
+        return None
+    for node in _nodes_at(tree, error["line"], ast.Import, ast.ImportFrom):
+        if isinstance(node, ast.ImportFrom) and node.module == "__future__":
+            continue
+        keep = [a for a in node.names if _import_label(node, a) != match["name"]]
+        if len(keep) == len(node.names):
+            continue
+        replacement = None
+        if keep:
+            trimmed = ast.ImportFrom(node.module, keep, node.level) if isinstance(node, ast.ImportFrom) \
+                else ast.Import(keep)
+            replacement = ast.unparse(trimmed)
+        edited = _replace_statement(source, node, replacement)
+        if edited:
+            return (*edited, f"removed unused import '{match['name']}'")
+    return None
+
+
+def _has_side_effects(node: ast.AST) -> bool:
+    return any(isinstance(n, (ast.Call, ast.Await, ast.Yield, ast.YieldFrom, ast.NamedExpr))
+               for n in ast.walk(node))
+
+
+@autofix_rule("LINTING", r"^F841:? local variable '(?P<name>\w+)' is assigned to but never used")
+def fix_unused_variable(source, tree, error, match):
+    if tree is None:
+        return None
+    name = match["name"]
+    lines = source.splitlines(keepends=True)
+
+    # except E as name:  →  except E:
+    for handler in _nodes_at(tree, error["line"], ast.ExceptHandler):
+        if handler.name == name:
+            line = lines[error["line"] - 1]
+            fixed = re.sub(rf"\s+as\s+{re.escape(name)}\b", "", line, count=1)
+            if fixed != line:
+                lines[error["line"] - 1] = fixed
+                return "".join(lines), 0, f"dropped unused exception name '{name}'"
+
+    for node in _nodes_at(tree, error["line"], ast.Assign, ast.AnnAssign):
+        targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+        if len(targets) != 1 or not isinstance(targets[0], ast.Name) or targets[0].id != name:
+            continue
+        if node.value is None:
+            continue
+        if not _has_side_effects(node.value):
+            edited = _replace_statement(source, node, None)
+            if edited:
+                return (*edited, f"removed unused variable '{name}'")
+            continue
+        # Keep the call (it may matter), drop the binding
+        if node.value.lineno != node.lineno:
+            continue
+        line = lines[node.lineno - 1]
+        start = _char_col(line, node.col_offset)
+        value_start = _char_col(line, node.value.col_offset)
+        lines[node.lineno - 1] = line[:start] + line[value_start:]
+        return "".join(lines), 0, f"dropped unused binding '{name}'"
+    return None
+
+
+@autofix_rule("TYPE_ERROR", r"variable '(?P<name>\w+)'")
+def fix_str_concat(source, tree, error, match):
+    if tree is None:
+        return None
+    name = match["name"]
+    spans = []
+    for node in _nodes_at(tree, error["line"], ast.BinOp):
+        if not isinstance(node.op, ast.Add):
+            continue
+        for side, other in ((node.left, node.right), (node.right, node.left)):
+            if isinstance(side, ast.Name) and side.id == name and side.lineno == side.end_lineno \
+                    and isinstance(other, ast.Constant) and isinstance(other.value, str):
+                spans.append((side.lineno, side.col_offset, side.end_col_offset))
+    if not spans:
+        return None
+    lines = source.splitlines(keepends=True)
+    # Right to left, so earlier offsets on the line stay valid
+    for line_no, col, end_col in sorted(set(spans), key=lambda s: (s[0], -s[1])):
+        line = lines[line_no - 1]
+        start, end = _char_col(line, col), _char_col(line, end_col)
+        lines[line_no - 1] = f"{line[:start]}str({line[start:end]}){line[end:]}"
+    return "".join(lines), 0, f"wrapped '{name}' with str()"
+
+
+def _indent_of(line: str) -> str:
+    return line[:len(line) - len(line.lstrip(" \t"))]
+
+
+def _width(line: str) -> int:
+    return len(_indent_of(line).expandtabs(4))
+
+
+def _is_code(line: str) -> bool:
+    return bool(line.strip()) and not line.lstrip().startswith("#")
+
+
+_DEFINITION = re.compile(r"(async\s+def|def|class)\b")
+
+
+def _body_floor(lines: list, index: int) -> int:
+    """
+    Body indentation of the innermost def/class enclosing lines[index]: the
+    line may not be dedented below it (that would move it out of the
+    definition, e.g. a `return` to module level). 0 at module level.
+    """
+    limit = None
+    for i in range(index - 1, -1, -1):
+        if not _is_code(lines[i]):
+            continue
+        width = _width(lines[i])
+        if limit is not None and width >= limit:
+            continue
+        limit = width
+        if _DEFINITION.match(lines[i].lstrip()):
+            # The first body line other than the misindented one sets it
+            for j in range(i + 1, len(lines)):
+                if j != index and _is_code(lines[j]):
+                    return _width(lines[j]) if _width(lines[j]) > width else width + 1
+            return width + 1
+        if width == 0:
+            break
+    return 0
+
+
+def _indentation_candidates(lines: list, index: int):
+    """Sources to try for an indentation error reported on lines[index]."""
+    variants = [lines]
+    # Tabs mixed with spaces: expand leading tabs everywhere, alone and then
+    # combined with each re-indentation below
+    if any("\t" in _indent_of(l) for l in lines):
+        expanded = [_indent_of(l).expandtabs(4) + l.lstrip(" \t") for l in lines]
+        yield expanded
+        variants.insert(0, expanded)
+    for variant in variants:
+        yield from _reindented(variant, index)
+
+
+def _reindented(lines: list, index: int):
+    """lines[index] (alone, then with its block) moved to each plausible level."""
+    prev = next((lines[i] for i in range(index - 1, -1, -1)
+                 if lines[i].strip() and not lines[i].lstrip().startswith("#")), "")
+    prev_indent = len(_indent_of(prev).expandtabs(4))
+    levels = []
+    if prev.rstrip().endswith(":"):
+        levels.append(prev_indent + 4)
+    levels.append(prev_indent)
+    for i in range(index - 1, -1, -1):   # enclosing block levels, innermost first
+        width = len(_indent_of(lines[i]).expandtabs(4))
+        if lines[i].strip() and width < min(levels):
+            levels.append(width)
+
+    current = len(_indent_of(lines[index]).expandtabs(4))
+    block_end = index + 1
+    while block_end < len(lines) and (not lines[block_end].strip()
+                                      or len(_indent_of(lines[block_end]).expandtabs(4)) >= current):
+        block_end += 1
+
+    floor = _body_floor(lines, index)
+    for width in levels:
+        if width < current and width < floor:
+            continue   # never dedent out of the enclosing definition
+        # Just the reported line, then the whole block it opens
+        yield lines[:index] + [" " * width + lines[index].lstrip(" \t")] + lines[index + 1:]
+        shift = width - current
+        block = [(" " * max(0, len(_indent_of(l).expandtabs(4)) + shift) + l.lstrip(" \t")) if l.strip() else l
+                 for l in lines[index:block_end]]
+        yield lines[:index] + block + lines[block_end:]
+
+
+@autofix_rule("INDENTATION", r"IndentationError")
+def fix_indentation(source, tree, error, match):
+    if tree is not None or not error.get("line"):
+        return None
+    lines = source.splitlines(keepends=True)
+    index = error["line"] - 1
+    if index >= len(lines):
+        return None
+    for candidate in _indentation_candidates(lines, index):
+        fixed = "".join(candidate)
+        if _compiles(fixed, error.get("file") or "<autofix>"):
+            return fixed, 0, f"re-indented line {error['line']}"
+    return None
+
+
+# ─── Driver ──────────────────────────────────────────────────────────────────
+
+def _match_rule(error: dict):
+    for bug_type, pattern, fixer in _RULES:
+        if error.get("bug_type") == bug_type:
+            match = pattern.search(error.get("description") or "")
+            if match:
+                return fixer, match
+    return None, None
+
+
+def autofix_source(source: str, errors: list) -> dict:
+    """
+    Apply every rule that matches one of `errors` to source.
+
+    Returns:
+        {
+          "source":    the rewritten source (unchanged when nothing applied),
+          "fixed":     errors fixed here, each with an "autofix" summary,
+          "remaining": errors left for the LLM, line numbers moved to match
+                       the rewritten source
+        }
+    """
+    def parse(text):
+        try:
+            return ast.parse(text)
+        except SyntaxError:
+            return None
+
+    original = source
+    tree = parse(source)
+    fixed, remaining, done = [], [], {}
+
+    # Bottom-up: a deleted line only shifts errors below it, which are done
+    for error in sorted(errors, key=lambda e: e.get("line") or 0, reverse=True):
+        signature = (error.get("bug_type"), error.get("line"), error.get("description"))
+        if signature in done:   # duplicates on one line go with the first fix
+            fixed.append({**error, "autofix": done[signature]})
+            continue
+        fixer, match = _match_rule(error)
+        result = None
+        if fixer:
+            try:
+                result = fixer(source, tree, error, match)
+            except Exception as e:
+                logger.warning(f"[AUTOFIX] {fixer.__name__} failed on {error['file']} line {error['line']}: {e}")
+        if result is None:
+            remaining.append(dict(error))
+            continue
+        source, delta, summary = result
+        tree = parse(source)
+        done[signature] = summary
+        fixed.append({**error, "autofix": summary})
+        if delta:
+            for later in remaining:
+                if (later.get("line") or 0) > error["line"]:
+                    later["line"] += delta
+
+    if fixed and (tree is None or (not remaining and not _compiles(source, errors[0]['file']))):
+        # A rule broke the file (or didn't repair it): drop the whole pass
+        logger.warning(f"[AUTOFIX] Rewrite of {errors[0]['file']} doesn't compile, leaving it to the LLM")
+        return {"source": original, "fixed": [], "remaining": [dict(e) for e in errors]}
+
+    remaining.reverse()
+    return {"source": source, "fixed": fixed[::-1], "remaining": remaining}
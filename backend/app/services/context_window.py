@@ -0,0 +1,99 @@
+# app/services/context_window.py
+# The part of a file a repair actually needs.
+# Instead of the whole file, the LLM gets the function or class enclosing the
+# error line(s) plus the module's imports for context, and returns only that
+# region, which is spliced back in place. Files that don't parse, errors at
+# module level, or regions covering most of the file fall back to whole-file
+# repairs (extract_window returns None).
+
+import os
+import ast
+import textwrap
+
+CONTEXT_WINDOW_MIN_LINES = int(os.getenv("CONTEXT_WINDOW_MIN_LINES", "60"))   # smaller files go whole
+CONTEXT_WINDOW_MAX_SHARE = float(os.getenv("CONTEXT_WINDOW_MAX_SHARE", "0.6"))
+
+_SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def _start_line(node) -> int:
+    """First line of a definition, decorators included."""
+    return min([node.lineno] + [d.lineno for d in node.decorator_list])
+
+
+def _enclosing(tree: ast.Module, line: int):
+    """
+    Innermost function/class containing line. Methods are enough on their
+    own; a line directly in a class body (not in a method) takes the class.
+    """
+    best = None
+    for node in ast.walk(tree):
+        if isinstance(node, _SCOPES) and _start_line(node) <= line <= node.end_lineno:
+            if best is None or _start_line(node) >= _start_line(best):
+                best = node
+    return best
+
+
+def extract_window(source: str, lines: list, min_lines: int = None, max_share: float = None) -> dict:
+    """
+    The smallest region of whole definitions covering every line in `lines`.
+
+    Returns:
+        {
+          "start", "end":  1-based inclusive line range of the region,
+          "region":        its text,
+          "imports":       the module's top-level import statements (context)
+        }
+        or None when the whole file should be sent instead.
+    """
+    min_lines = CONTEXT_WINDOW_MIN_LINES if min_lines is None else min_lines
+    max_share = CONTEXT_WINDOW_MAX_SHARE if max_share is None else max_share
+
+    file_lines = source.splitlines(keepends=True)
+    if len(file_lines) < min_lines or not lines:
+        return None
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+
+    scopes = [_enclosing(tree, line) for line in lines]
+    if any(scope is None for scope in scopes):
+        return None   # module-level code: no definition to cut out
+    start = min(_start_line(scope) for scope in scopes)
+    end = max(scope.end_lineno for scope in scopes)
+    if (end - start + 1) > max_share * len(file_lines):
+        return None
+
+    imports = [
+        ast.get_source_segment(source, node)
+        for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))
+    ]
+    return {
+        "start": start,
+        "end": end,
+        "region": "".join(file_lines[start - 1:end]),
+        "imports": "\n".join(imports)
+    }
+
+
+def splice_window(source: str, window: dict, new_region: str) -> str:
+    """
+    Put a repaired region back in place of window's lines. A region the model
+    returned dedented (or over-indented) is shifted back to the original
+    indentation first.
+    """
+    file_lines = source.splitlines(keepends=True)
+
+    def first_indent(text):
+        for line in text.splitlines():
+            if line.strip():
+                return line[:len(line) - len(line.lstrip())]
+        return ""
+
+    indent = first_indent(window["region"])
+    if first_indent(new_region) != indent:
+        new_region = textwrap.indent(textwrap.dedent(new_region), indent)
+    if window["region"].endswith("\n"):
+        new_region = new_region.rstrip("\n") + "\n"
+    return "".join(file_lines[:window["start"] - 1]) + new_region + "".join(file_lines[window["end"]:])
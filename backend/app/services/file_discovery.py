@@ -0,0 +1,190 @@
+# app/services/file_discovery.py
+# Single-walk file discovery shared by repo_scanner and test_runner.
+# One os.scandir traversal of the cloned repo: ignored directories are pruned
+# before we descend into them, .gitignore rules are honoured, and every file is
+# classified (python source / python test / JS test / TS test) on the way.
+
+import os
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Never descended into, whatever .gitignore says
+PRUNE_DIRS = {
+    ".git", "venv", ".venv", "__pycache__", "node_modules",
+    ".tox", ".nox", ".mypy_cache", ".pytest_cache", ".ruff_cache",
+}
+
+JS_TEST_SUFFIXES = (".test.js", ".spec.js")
+TS_TEST_SUFFIXES = (".test.ts", ".spec.ts")
+
+
+# ─── .gitignore matching ─────────────────────────────────────────────────────
+
+def _translate_glob(pattern: str) -> str:
+    """gitignore glob → regex body (no anchors). '*' stays inside one path segment."""
+    res, i, n = "", 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern[i:i + 2] == "**":
+                i += 2
+                if i < n and pattern[i] == "/":
+                    i += 1
+                    res += "(?:.*/)?"     # "**/" → zero or more directories
+                else:
+                    res += ".*"           # trailing "/**" → everything inside
+                continue
+            res += "[^/]*"
+        elif c == "?":
+            res += "[^/]"
+        elif c == "[":
+            j = pattern.find("]", i + 1)
+            if j == -1:
+                res += re.escape(c)
+            else:
+                body = pattern[i + 1:j]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                res += f"[{body}]"
+                i = j
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            res += re.escape(pattern[i])
+        else:
+            res += re.escape(c)
+        i += 1
+    return res
+
+
+def _load_gitignore(directory: str, base_rel: str) -> list:
+    """
+    Parse directory/.gitignore into rules:
+        (regex, negate, dir_only, anchored, base_rel)
+    where base_rel is the directory's path relative to the repo root.
+    """
+    path = os.path.join(directory, ".gitignore")
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return []
+
+    rules = []
+    for raw in lines:
+        line = raw.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        line = line.replace("\\#", "#").replace("\\!", "!")
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        # A slash anywhere but the end anchors the pattern to this .gitignore's directory
+        anchored = "/" in line
+        line = line.lstrip("/")
+        rules.append((re.compile(f"^{_translate_glob(line)}$"), negate, dir_only, anchored, base_rel))
+    return rules
+
+
+def _is_ignored(rel_path: str, is_dir: bool, rules: list) -> bool:
+    """Last matching rule wins, as in git (deeper .gitignore files come later)."""
+    ignored = False
+    name = rel_path.rsplit("/", 1)[-1]
+    for regex, negate, dir_only, anchored, base_rel in rules:
+        if dir_only and not is_dir:
+            continue
+        if anchored:
+            if base_rel:
+                if not rel_path.startswith(base_rel + "/"):
+                    continue
+                target = rel_path[len(base_rel) + 1:]
+            else:
+                target = rel_path
+        else:
+            target = name
+        if regex.match(target):
+            ignored = not negate
+    return ignored
+
+
+# ─── Classification ──────────────────────────────────────────────────────────
+
+def _classify(name: str):
+    if name.endswith(".py"):
+        # pytest's own collection pattern: conftest.py and helpers under
+        # tests/ are ordinary modules and get the static checks
+        if name.startswith("test_") or name.endswith("_test.py"):
+            return "python_test"
+        return "python_source"
+    if name.endswith(JS_TEST_SUFFIXES):
+        return "js_test"
+    if name.endswith(TS_TEST_SUFFIXES):
+        return "ts_test"
+    return None
+
+
+# ─── Walk ────────────────────────────────────────────────────────────────────
+
+def discover_files(repo_path: str, index=None) -> dict:
+    """
+    Walk the repo once and classify every file of interest.
+
+    If `index` (an import_resolver.ModuleIndex) is given, every Python file is
+    added to it during the same walk and the index is built at the end.
+
+    Returns:
+        {
+            "python_source": [abs paths],
+            "python_test":   [abs paths],
+            "js_test":       [abs paths],
+            "ts_test":       [abs paths],
+        }   each list sorted, so downstream reports are deterministic
+    """
+    repo_path = os.path.abspath(repo_path)
+    found = {"python_source": [], "python_test": [], "js_test": [], "ts_test": []}
+
+    # (absolute dir, path relative to repo root, active .gitignore rules)
+    stack = [(repo_path, "", _load_gitignore(repo_path, ""))]
+    while stack:
+        directory, rel_dir, rules = stack.pop()
+        try:
+            entries = sorted(os.scandir(directory), key=lambda e: e.name)
+        except OSError as e:
+            logger.warning(f"[DISCOVER] Cannot read {directory}: {e}")
+            continue
+
+        for entry in entries:
+            rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+
+            if is_dir:
+                if entry.name in PRUNE_DIRS or _is_ignored(rel, True, rules):
+                    continue
+                stack.append((entry.path, rel, rules + _load_gitignore(entry.path, rel)))
+                continue
+
+            kind = _classify(entry.name)
+            if kind is None or _is_ignored(rel, False, rules):
+                continue
+            found[kind].append(entry.path)
+            if index is not None and kind.startswith("python"):
+                index.add(entry.path)
+
+    for files in found.values():
+        files.sort()
+    if index is not None:
+        index.build()
+
+    logger.info(
+        f"[DISCOVER] {len(found['python_source'])} source, {len(found['python_test'])} Python test, "
+        f"{len(found['js_test'])} JS test, {len(found['ts_test'])} TS test files"
+    )
+    return found
@@ -0,0 +1,64 @@
+# app/services/fix_scheduler.py
+# Concurrent fix generation for a healing run.
+# Every file gets one repair covering all of its errors; up to
+# FIX_CONCURRENCY of them are in flight at once (request pacing, 429 backoff
+# and retries live in llm_client). Proposals only read the checkout, so they can
+# overlap freely; applying, verifying and committing them stays with the single
+# consumer of FixScheduler.run() — one writer per working tree.
+
+import os
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+FIX_CONCURRENCY = int(os.getenv("FIX_CONCURRENCY", "4"))
+
+
+def group_by_file(errors: list) -> list:
+    """
+    One repair unit per file: [{"file", "errors": [...]}], in the order files
+    first appear in `errors`, each group keeping its errors' order.
+    """
+    groups = {}
+    for error in errors:
+        groups.setdefault(error["file"], {"file": error["file"], "errors": []})["errors"].append(error)
+    return list(groups.values())
+
+
+class FixScheduler:
+    """
+    Produces fix proposals for many files concurrently.
+
+        scheduler = FixScheduler(orchestrator, local_path)
+        async for group, fix_info in scheduler.run(group_by_file(errors)):
+            ...   # apply / verify / commit, one at a time
+
+    Results arrive in completion order; fix_info is None when no fix could be
+    produced for that unit.
+    """
+
+    def __init__(self, orchestrator, repo_path: str, concurrency: int = None, index=None):
+        self.orchestrator = orchestrator
+        self.repo_path = repo_path
+        self.index = index   # the run's ModuleIndex, for the validation gate
+        self.concurrency = max(1, concurrency or FIX_CONCURRENCY)
+
+    async def _propose(self, failure: dict, slots: asyncio.Semaphore):
+        async with slots:
+            try:
+                return failure, await self.orchestrator.propose_fix(self.repo_path, failure, index=self.index)
+            except Exception as e:
+                logger.warning(f"[FIX] No fix for {failure['file']}: {e}")
+                return failure, None
+
+    async def run(self, failures):
+        """Yield (failure, fix_info) pairs as proposals complete."""
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks = [asyncio.ensure_future(self._propose(failure, slots)) for failure in failures]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
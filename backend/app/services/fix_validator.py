@@ -0,0 +1,77 @@
+# app/services/fix_validator.py
+# Local gate between fix generation and commit.
+# A generated file must compile, must not come out of repo_scanner's
+# file-level checks (flake8 included) worse than it went in, and must keep
+# every top-level function and class; a fix failing any of these is sent back
+# to the model at once instead of costing a commit, a push and another scan.
+
+import os
+import ast
+import logging
+import warnings
+
+from app.services.import_resolver import ImportResolver
+from app.services.repo_scanner import analyze_source
+
+logger = logging.getLogger(__name__)
+
+FIX_VALIDATION_RETRIES = int(os.getenv("FIX_VALIDATION_RETRIES", "2"))
+
+
+def _top_level_definitions(tree: ast.Module) -> set:
+    return {
+        node.name for node in tree.body
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+    }
+
+
+def validate_fix(original: str, fixed: str, relative: str, repo_path: str = "", index=None) -> dict:
+    """
+    Check a proposed replacement for `relative` against its current content.
+    Pass the run's ModuleIndex as `index` so imports resolve without walking
+    the tree again. Blocking (flake8 runs twice): call it off the event loop.
+
+    Returns:
+        {"success": True, "errors_before", "errors_after"} or
+        {"success": False, "reason"}
+    """
+    if not relative.endswith(".py"):
+        return {"success": True, "errors_before": None, "errors_after": None}
+    if not fixed.strip() and original.strip():
+        return {"success": False, "reason": "the fix empties the file"}
+
+    # A full compile, not just the AST: "'return' outside function", a
+    # module-level yield and the like are only caught by the compiler proper
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            compile(fixed, relative, "exec", dont_inherit=True)
+    except SyntaxError as e:
+        return {"success": False, "reason": f"{type(e).__name__} at line {e.lineno}: {e.msg}"}
+    except ValueError as e:   # e.g. null bytes
+        return {"success": False, "reason": str(e)}
+    fixed_tree = ast.parse(fixed)
+
+    try:
+        original_tree = ast.parse(original)
+    except SyntaxError:
+        original_tree = None
+    if original_tree is not None:
+        deleted = _top_level_definitions(original_tree) - _top_level_definitions(fixed_tree)
+        if deleted:
+            return {"success": False,
+                    "reason": f"the fix deletes top-level definition(s): {', '.join(sorted(deleted))}"}
+
+    file_path = os.path.join(repo_path, relative) if repo_path else ""
+    resolver = ImportResolver(repo_path, index)
+    errors_before = analyze_source(original, relative, file_path, repo_path, resolver, lint=True)
+    errors_after = analyze_source(fixed, relative, file_path, repo_path, resolver, lint=True)
+    if len(errors_after) > len(errors_before):
+        before = {(e["bug_type"], e.get("description")) for e in errors_before}
+        introduced = [e for e in errors_after if (e["bug_type"], e.get("description")) not in before]
+        detail = "; ".join(f"{e['bug_type']} at line {e['line']}: {e.get('description')}" for e in introduced[:3])
+        return {"success": False,
+                "reason": f"the fix raises the error count from {len(errors_before)} to {len(errors_after)}"
+                          + (f" ({detail})" if detail else "")}
+
+    return {"success": True, "errors_before": len(errors_before), "errors_after": len(errors_after)}
@@ -1,60 +1,205 @@
 import os
-# Updated imports for Mistral v1.0.0+
-from mistralai import Mistral 
+import ast
+from app.services import async_ops
 from app.services.git_services import commit_and_push #
+from app.services.context_window import extract_window, splice_window
+from app.services.patcher import apply_unified_diff, PatchError
+from app.services.llm_client import get_llm_client
+from app.services.repair_cache import get_repair_cache
+from app.services.fix_validator import validate_fix, FIX_VALIDATION_RETRIES
+
+# "diff": the model returns a unified diff, applied in memory (falls back to
+# "code" when it doesn't apply); "code": the model returns the corrected code
+LLM_OUTPUT_MODE = os.getenv("LLM_OUTPUT_MODE", "diff")
 
 class FixerService:
     def __init__(self, api_key:str):
-        # New initialization for v1.0.0
         if not api_key:
             raise ValueError("MISTRAL_API_KEY is missing from environment")
-        self.client = Mistral(api_key=api_key)
+        # Requests go through the shared client layer (pooled connections,
+        # rate limiting, retries, hedging), looked up per event loop on use
+        self.api_key = api_key
         self.model = "codestral-latest"
 
-    async def get_repair(self, file_content, error_data):
+    async def get_repair(self, file_content, error_data, validate=None):
         """
         Uses Codestral to generate a fix based on test_runner results.
+        error_data is one error, or {"file", "errors": [...]} for every error in a file.
+
+        In LLM_OUTPUT_MODE "diff" the model answers with a unified diff that is
+        applied in memory; a diff that is malformed or doesn't apply falls
+        through to asking for code. Only the definitions around the error
+        lines (plus the imports) are sent when they can be isolated; corrected
+        code for that region is spliced back into file_content. Otherwise — or
+        if the splice doesn't parse — the whole file goes. Returns the full
+        corrected file either way. Repairs are cached (repair_cache), so a
+        region seen before with the same errors costs no model call.
+
+        `validate(fixed) -> {"success", "reason"}` (see fix_validator) gates
+        every candidate, on the async_ops pool rather than the event loop (it is
+        blocking): a rejected fix is retried right away, with the reason
+        in the prompt, up to FIX_VALIDATION_RETRIES times; None is returned
+        if none passes. Only accepted fixes are cached.
         """
-        system_msg = "You are a senior DevOps engineer. Return ONLY the raw corrected code for the file. No explanations. No backticks."
-        
-        # Mapping teammate's 'error' key to the prompt
-        error_log = error_data.get('error', 'No log provided')
+        # A file's errors travel together ({"file", "errors": [...]}) so one
+        # round trip fixes all of them; a single error is still accepted
+        errors = error_data.get('errors') or [error_data]
+        if len(errors) == 1:
+            task = f"""Fix the {errors[0]['bug_type']} in {error_data['file']} at line {errors[0]['line']}.
+        Description: {errors[0].get('description')}
+        Hint: {errors[0].get('fix_hint')}"""
+            scope = "the error"
+        else:
+            listed = "\n".join(
+                f"        {i}. {e['bug_type']} at line {e['line']}: {e.get('description')} (Hint: {e.get('fix_hint')})"
+                for i, e in enumerate(errors, 1)
+            )
+            task = f"Fix these {len(errors)} errors in {error_data['file']}:\n{listed}"
+            scope = "all of the listed errors and nothing else"
+
+        window = extract_window(file_content, [e['line'] for e in errors if e.get('line')])
+
+        # Same region, same errors, same model: replay the earlier fix
+        cache = get_repair_cache()
+        cached = cache.replay(file_content, window, errors, self.model)
+        if cached is not None:
+            verdict = await async_ops.run_blocking(validate, cached) if validate else {"success": True}
+            if verdict["success"]:
+                print(f"[FIXER] Replayed cached repair for {error_data['file']}")
+                return cached
+            cache.forget(file_content, window, errors, self.model)
+            print(f"[FIXER] Dropped cached repair for {error_data['file']}: {verdict['reason']}")
+
+        feedback = None
+        attempts = 1 + (FIX_VALIDATION_RETRIES if validate else 0)
+        for attempt in range(1, attempts + 1):
+            attempt_task = task
+            if feedback:
+                attempt_task += f"\n        A previous fix was rejected because {feedback}. Do not repeat that."
+            fixed = await self._generate_repair(file_content, error_data, attempt_task, scope, window)
+            verdict = await async_ops.run_blocking(validate, fixed) if validate else {"success": True}
+            if verdict["success"]:
+                cache.store(file_content, fixed, window, errors, self.model)
+                return fixed
+            feedback = verdict["reason"]
+            print(f"[FIXER] Rejected fix for {error_data['file']} (attempt {attempt}/{attempts}): {feedback}")
+        return None
+
+    async def _generate_repair(self, file_content, error_data, task, scope, window):
+        """The model calls behind get_repair (diff, then region, then whole file)."""
+        if LLM_OUTPUT_MODE == "diff":
+            fixed = await self._repair_with_diff(file_content, error_data, task, scope, window)
+            if fixed is not None:
+                return fixed
+
+        if window:
+            region = await self._complete(
+                "You are a senior DevOps engineer. Return ONLY the raw corrected code excerpt. No explanations. No backticks.",
+                f"""
+        {task}
+        (Line numbers refer to the whole file; the excerpt below is lines {window['start']}-{window['end']}.)
+
+        ### IMPORTS (context only, do not return them):
+{window['imports']}
+
+        ### CODE (lines {window['start']}-{window['end']}):
+{window['region']}
         
+        ### INSTRUCTION:
+        Correct {scope}. Return ONLY the corrected lines {window['start']}-{window['end']}, with their original indentation — not the rest of the file.
+        """
+            )
+            fixed = splice_window(file_content, window, region)
+            try:
+                ast.parse(fixed)
+                return fixed
+            except SyntaxError:
+                print(f"[FIXER] Spliced region of {error_data['file']} doesn't parse, retrying with the whole file")
+
         user_msg = f"""
-        Fix the {error_data['bug_type']} in {error_data['file']} at line {error_data['line']}.
-        Description: {error_data.get('description')}
-        Hint: {error_data.get('fix_hint')}
+        {task}
 
         ### ORIGINAL CODE:
         {file_content}
     
         
         ### INSTRUCTION:
-        Correct only the error. Return the entire file content.
+        Correct {scope}. Return the entire file content.
         """
+        content = await self._complete(
+            "You are a senior DevOps engineer. Return ONLY the raw corrected code for the file. No explanations. No backticks.",
+            user_msg
+        )
+        return content.strip()
+
+    async def _repair_with_diff(self, file_content, error_data, task, scope, window):
+        """
+        Ask for a unified diff instead of code, so the response scales with the
+        change rather than the file, and apply it in memory. Returns the
+        patched file, or None when the diff is malformed, doesn't apply or
+        breaks the parse (the caller then asks for code).
+        """
+        if window:
+            shown = f"""(Line numbers refer to the whole file; the excerpt below is lines {window['start']}-{window['end']}.)
 
-        # Updated chat call for v1.0.0
-        chat_response = self.client.chat.complete(
-            model=self.model,
-            messages=[
+        ### IMPORTS (context only):
+{window['imports']}
+
+        ### CODE (lines {window['start']}-{window['end']}):
+{window['region']}"""
+        else:
+            shown = f"""### ORIGINAL CODE:
+{file_content}"""
+
+        diff = await self._complete(
+            "You are a senior DevOps engineer. Return ONLY a unified diff (--- / +++ headers, @@ hunks with 3 lines of context). No explanations. No backticks.",
+            f"""
+        {task}
+        {shown}
+        
+        ### INSTRUCTION:
+        Correct {scope}. Return a unified diff against {error_data['file']} with line numbers of the whole file.
+        """
+        )
+        try:
+            fixed = apply_unified_diff(file_content, diff)
+        except PatchError as e:
+            print(f"[FIXER] Rejected diff for {error_data['file']}: {e}")
+            return None
+        try:
+            ast.parse(fixed)
+        except SyntaxError as e:
+            try:
+                ast.parse(file_content)
+            except SyntaxError:
+                pass   # was already broken elsewhere; the gate downstream judges it
+            else:
+                print(f"[FIXER] Rejected diff for {error_data['file']}: result doesn't parse ({e.msg})")
+                return None
+        return fixed
+
+    async def _complete(self, system_msg, user_msg):
+        """One chat completion; returns the code with any Markdown fence removed."""
+        content = await get_llm_client(self.api_key).chat(
+            self.model,
+            [
                 {"role": "system", "content": system_msg},
                 {"role": "user", "content": user_msg}
             ]
         )
 
-        content = chat_response.choices[0].message.content.strip()
-
         # 🚨 CRITICAL UPDATE: Strip Markdown code blocks if the AI includes them
-        if content.startswith("```"):
+        if content.strip().startswith("```"):
             # Removes the first line (```python) and the last line (```)
-            lines = content.splitlines()
+            lines = content.strip().splitlines()
             if lines[0].startswith("```"):
                 lines = lines[1:]
-            if lines[-1].startswith("```"):
+            if lines and lines[-1].startswith("```"):
                 lines = lines[:-1]
-            content = "\n".join(lines).strip()
+            content = "\n".join(lines)
 
-        return content
+        # Surrounding blank lines go; the first line's indentation stays (excerpts)
+        return content.strip("\n").rstrip()
 
     async def apply_and_push_fix(self, repo_path, failure, branch_name, github_token, repo_url, commit_counter):
         """
@@ -65,7 +210,12 @@ class FixerService:
         with open(file_path, 'r') as f:
             original_content = f.read()
 
-        fixed_code = await self.get_repair(original_content, failure)
+        fixed_code = await self.get_repair(
+            original_content, failure,
+            validate=lambda fixed: validate_fix(original_content, fixed, failure['file'], repo_path)
+        )
+        if fixed_code is None:
+            return {"success": False, "reason": "No generated fix passed validation"}
 
         with open(file_path, 'w') as f:
             f.write(fixed_code)
@@ -224,11 +224,22 @@ import re
 import sys
 import stat
 import json
+import time
 import shutil
+import hashlib
 import logging
 import tempfile
+import uuid
+import threading
+import statistics
+from contextlib import contextmanager
 from datetime import datetime
-from git import Repo, GitCommandError
+from git import Repo, GitCommandError, RemoteProgress
+
+try:
+    import fcntl
+except ImportError:   # Windows: in-process locking only
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
@@ -264,30 +275,407 @@ def _sanitize_for_branch(text: str) -> str:
     text = re.sub(r'_+', '_', text)            # collapse multiple underscores
     text = text.strip('_')                      # remove leading/trailing underscores
     return text
-    
-def clone_repo(repo_url: str) -> str:
+
+
+# ─── Clone strategies ─────────────────────────────────────────────────────────
+#   full      → complete history (the original behaviour)
+#   shallow   → --depth 1: HEAD only; pull-before-push degrades to a no-op
+#   blobless  → --filter=blob:none: all commits/trees, file contents fetched on checkout
+#   reference → --reference --dissociate against the pooled bare mirror; only
+#               objects missing from it are downloaded
+#   worktree  → `git worktree add` on the pooled bare mirror after a `git fetch`;
+#               nothing is cloned at all once the mirror exists
+#   auto      → whichever strategy has the lowest median time for this repo so far
+#
+# Every run gets its own directory under CLONE_RUNS_DIR, so concurrent runs
+# against the same repo never share a checkout. Release it with release_checkout().
+
+CLONE_STRATEGIES = ("full", "shallow", "blobless", "reference", "worktree")
+CLONE_STRATEGY = os.getenv("CLONE_STRATEGY", "worktree")
+CLONE_MIRROR_DIR = os.getenv("CLONE_MIRROR_DIR", os.path.join(CLONE_BASE, "_mirrors"))
+CLONE_RUNS_DIR = os.getenv("CLONE_RUNS_DIR", os.path.join(CLONE_BASE, "runs"))
+MIRROR_POOL_MAX_MB = int(os.getenv("MIRROR_POOL_MAX_MB", "4096"))
+CLONE_TIMINGS_PATH = os.getenv("CLONE_TIMINGS_PATH", os.path.join(CLONE_BASE, "clone_timings.jsonl"))
+CLONE_TIMINGS_KEEP = 20   # samples kept per (repo, strategy)
+
+_clone_timings = None     # repo_url → strategy → [seconds, ...], loaded lazily
+_timings_lock = threading.Lock()
+
+
+def _load_clone_timings() -> dict:
+    global _clone_timings
+    if _clone_timings is None:
+        _clone_timings = {}
+        try:
+            with open(CLONE_TIMINGS_PATH, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    samples = _clone_timings.setdefault(entry["repo_url"], {}).setdefault(entry["strategy"], [])
+                    samples.append(entry["seconds"])
+                    del samples[:-CLONE_TIMINGS_KEEP]
+        except OSError:
+            pass
+    return _clone_timings
+
+
+def _record_clone_timing(repo_url: str, strategy: str, seconds: float, mirror_seconds: float = 0.0):
+    # Strategies are compared on end-to-end latency, mirror refresh included
+    entry = {
+        "repo_url": repo_url,
+        "strategy": strategy,
+        "seconds": round(seconds + mirror_seconds, 3),
+        "mirror_seconds": round(mirror_seconds, 3),
+        "at": datetime.utcnow().isoformat()
+    }
+    with _timings_lock:
+        samples = _load_clone_timings().setdefault(repo_url, {}).setdefault(strategy, [])
+        samples.append(entry["seconds"])
+        del samples[:-CLONE_TIMINGS_KEEP]
+        try:
+            os.makedirs(os.path.dirname(CLONE_TIMINGS_PATH), exist_ok=True)
+            with open(CLONE_TIMINGS_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            logger.warning(f"[GIT] Could not persist clone timing: {e}")
+    logger.info(f"[GIT] {strategy} clone of {repo_url} took {seconds:.2f}s"
+                + (f" (+{mirror_seconds:.2f}s mirror update)" if mirror_seconds else ""))
+
+
+def get_clone_timings(repo_url: str) -> dict:
+    """
+    Recorded clone times for a repo.
+
+    Returns:
+        { strategy: {"runs": n, "median": seconds, "last": seconds}, ... }
+    """
+    with _timings_lock:
+        per_strategy = {k: list(v) for k, v in _load_clone_timings().get(repo_url, {}).items()}
+    return {
+        strategy: {"runs": len(samples), "median": statistics.median(samples), "last": samples[-1]}
+        for strategy, samples in per_strategy.items() if samples
+    }
+
+
+def cheapest_clone_strategy(repo_url: str, default: str = None) -> str:
+    """Strategy with the lowest median clone time for repo_url, or `default` if none recorded."""
+    timings = get_clone_timings(repo_url)
+    if not timings:
+        return default or (CLONE_STRATEGY if CLONE_STRATEGY in CLONE_STRATEGIES else "full")
+    return min(timings, key=lambda s: timings[s]["median"])
+
+
+# ─── Bare-mirror pool ────────────────────────────────────────────────────────
+# One bare repository per repo URL. Upstream branches are fetched into
+# refs/remotes/origin/*, so the branches runs create in their worktrees
+# (refs/heads/*) are never touched by a fetch. Cold mirrors are evicted,
+# least recently used first, once the pool exceeds MIRROR_POOL_MAX_MB.
+
+_LAST_USED_MARKER = "agent-last-used"
+_mirror_locks = {}
+_mirror_locks_guard = threading.Lock()
+
+
+def _repo_name(repo_url: str) -> str:
+    return repo_url.rstrip("/").split("/")[-1].replace(".git", "")
+
+
+def _mirror_path(repo_url: str) -> str:
+    # Keyed by the full URL: forks of the same project get separate mirrors
+    digest = hashlib.sha1(repo_url.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(CLONE_MIRROR_DIR, f"{_repo_name(repo_url)}-{digest}.git")
+
+
+@contextmanager
+def _mirror_lock(mirror: str, blocking: bool = True):
     """
-    Clone the given GitHub repository to temp/agent_repos/<repo_name>.
-    If already exists, force-deletes and re-clones for a clean state.
+    Exclusive access to one mirror: a thread lock within this process plus
+    an flock on <mirror>.lock across processes (where fcntl exists).
+    Yields False instead of waiting when blocking=False and the mirror is busy.
+    """
+    with _mirror_locks_guard:
+        lock = _mirror_locks.setdefault(mirror, threading.Lock())
+    if not lock.acquire(blocking):
+        yield False
+        return
+    try:
+        if fcntl is None:
+            yield True
+            return
+        os.makedirs(os.path.dirname(mirror), exist_ok=True)
+        with open(f"{mirror}.lock", "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    finally:
+        lock.release()
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _live_worktrees(mirror: str) -> int:
+    """Worktrees still checked out from a mirror (stale entries are pruned first)."""
+    try:
+        Repo(mirror).git.worktree("prune")
+    except GitCommandError:
+        pass
+    try:
+        return len(os.listdir(os.path.join(mirror, "worktrees")))
+    except OSError:
+        return 0
+
+
+def _refresh_mirror(repo_url: str, mirror: str, progress=None):
+    """Create or fetch the mirror. Caller holds the mirror lock."""
+    callback = _CloneProgress(progress) if progress else None
+    if os.path.isdir(mirror):
+        Repo(mirror).remote("origin").fetch(prune=True, progress=callback)
+    else:
+        os.makedirs(CLONE_MIRROR_DIR, exist_ok=True)
+        repo = Repo.clone_from(repo_url, mirror, bare=True, progress=callback)
+        with repo.config_writer() as cw:
+            cw.set_value('remote "origin"', "fetch", "+refs/heads/*:refs/remotes/origin/*")
+        repo.remote("origin").fetch(prune=True)
+    with open(os.path.join(mirror, _LAST_USED_MARKER), "w"):
+        pass   # mtime = last use, read by evict_mirrors
+
+
+def ensure_mirror(repo_url: str, progress=None) -> str:
+    """Create the pooled bare mirror of repo_url, or fetch new objects into it."""
+    mirror = _mirror_path(repo_url)
+    with _mirror_lock(mirror):
+        _refresh_mirror(repo_url, mirror, progress)
+    evict_mirrors(keep=mirror)
+    return mirror
+
+
+def evict_mirrors(keep: str = None, max_bytes: int = None) -> list:
+    """
+    Delete least-recently-used mirrors until the pool fits in max_bytes
+    (default MIRROR_POOL_MAX_MB). Mirrors with live worktrees, mirrors
+    another run is currently using, and `keep` are never evicted.
 
     Returns:
-        str: Local path to the cloned repository.
+        list: paths of the evicted mirrors.
     """
-    # Define a consistent path for the repo
-    repo_name = repo_url.split("/")[-1].replace(".git", "")
-    local_path = f"/tmp/agent_repos/{repo_name}"
+    max_bytes = MIRROR_POOL_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+    try:
+        mirrors = [
+            os.path.join(CLONE_MIRROR_DIR, name) for name in os.listdir(CLONE_MIRROR_DIR)
+            if name.endswith(".git")
+        ]
+    except OSError:
+        return []
+
+    def last_used(mirror):
+        try:
+            return os.path.getmtime(os.path.join(mirror, _LAST_USED_MARKER))
+        except OSError:
+            return 0.0
+
+    sizes = {m: _dir_size(m) for m in mirrors}
+    total = sum(sizes.values())
+    evicted = []
+    for mirror in sorted(mirrors, key=last_used):
+        if total <= max_bytes:
+            break
+        if mirror == keep:
+            continue
+        with _mirror_lock(mirror, blocking=False) as acquired:
+            if not acquired or _live_worktrees(mirror):
+                continue
+            _force_remove(mirror)
+        total -= sizes[mirror]
+        evicted.append(mirror)
+        logger.info(f"[GIT] Evicted mirror {os.path.basename(mirror)} ({sizes[mirror] // (1024 * 1024)} MB)")
+    return evicted
+
+
+def _add_worktree(repo_url: str, local_path: str, progress=None):
+    """Fetch into the pooled mirror and check its default branch out at local_path (detached)."""
+    mirror = _mirror_path(repo_url)
+    with _mirror_lock(mirror):
+        _refresh_mirror(repo_url, mirror, progress)
+        repo = Repo(mirror)
+        default_branch = repo.git.symbolic_ref("--short", "HEAD")
+        repo.git.worktree("add", "--detach", local_path, f"refs/remotes/origin/{default_branch}")
+    evict_mirrors(keep=mirror)
+
+
+def _is_worktree(local_path: str) -> bool:
+    # A linked worktree's .git is a file pointing into the mirror
+    return os.path.isfile(os.path.join(local_path, ".git"))
+
+
+def _common_dir(repo: Repo) -> str:
+    return os.path.abspath(os.path.join(repo.working_tree_dir, repo.git.rev_parse("--git-common-dir")))
+
+
+def release_checkout(local_path: str):
+    """
+    Dispose of a run's checkout. Worktrees are unregistered from their mirror
+    (and the run's local branch deleted there); plain clones are deleted.
+    """
+    if not _is_worktree(local_path):
+        _force_remove(local_path)
+        return
 
-    # 🚨 THE RE-CLONE FIX: Delete the old folder if it exists
-    if os.path.exists(local_path):
-        print(f"[GIT] Cleaning up existing directory: {local_path}")
-        shutil.rmtree(local_path)
+    try:
+        repo = Repo(local_path)
+        mirror = _common_dir(repo)
+        branch = None if repo.head.is_detached else repo.active_branch.name
+    except Exception as e:
+        logger.warning(f"[GIT] {local_path} is not a usable worktree, deleting it: {e}")
+        _force_remove(local_path)
+        return
+
+    with _mirror_lock(mirror):
+        mirror_repo = Repo(mirror)
+        mirror_repo.git.worktree("remove", "--force", local_path)
+        if branch:
+            try:
+                mirror_repo.git.branch("-D", branch)
+            except GitCommandError:
+                pass
+    logger.info(f"[GIT] Released worktree {local_path}")
+
+
+class _CloneProgress(RemoteProgress):
+    """Forwards git's clone progress to a callback, once per whole percent per stage."""
+
+    STAGES = {
+        RemoteProgress.COUNTING: "counting",
+        RemoteProgress.COMPRESSING: "compressing",
+        RemoteProgress.RECEIVING: "receiving",
+        RemoteProgress.RESOLVING: "resolving",
+        RemoteProgress.CHECKING_OUT: "checking_out",
+    }
 
-    print(f"[GIT] Cloning fresh repository from {repo_url}...")
-    Repo.clone_from(repo_url, local_path)
+    def __init__(self, callback):
+        super().__init__()
+        self.callback = callback
+        self._last = None
+
+    def update(self, op_code, cur_count, max_count=None, message=""):
+        stage = self.STAGES.get(op_code & RemoteProgress.OP_MASK)
+        if stage is None:
+            return
+        percent = int(cur_count * 100 / max_count) if max_count else None
+        if (stage, percent) == self._last:
+            return
+        self._last = (stage, percent)
+        self.callback({"stage": stage, "percent": percent, "message": (message or "").strip()})
+
+
+def clone_repo(repo_url: str, progress=None, strategy: str = None, local_path: str = None) -> str:
+    """
+    Check the given GitHub repository out into a fresh per-run directory:
+    `local_path` (must not exist yet; see workspace_manager), or by default
+    temp/agent_repos/runs/<repo_name>-<id>. Nothing is deleted first: every
+    run gets its own path, so concurrent runs never clobber each other.
+
+    `strategy` is one of CLONE_STRATEGIES or "auto" (default: CLONE_STRATEGY).
+    Every clone's wall time is recorded per repo and strategy; see
+    get_clone_timings(). A reference clone whose mirror can't be prepared
+    falls back to a full clone.
+
+    `progress`, if given, is called with {"stage", "percent", "message"}
+    dicts while git reports clone progress.
+
+    Returns:
+        str: Local path to the checkout; hand it to release_checkout() when done.
+    """
+    strategy = strategy or CLONE_STRATEGY
+    if strategy == "auto":
+        strategy = cheapest_clone_strategy(repo_url)
+    if strategy not in CLONE_STRATEGIES:
+        raise ValueError(f"Unknown clone strategy '{strategy}', expected one of {CLONE_STRATEGIES} or 'auto'")
+
+    if local_path is None:
+        local_path = os.path.join(CLONE_RUNS_DIR, f"{_repo_name(repo_url)}-{uuid.uuid4().hex[:8]}")
+    os.makedirs(os.path.dirname(local_path), exist_ok=True)
+
+    print(f"[GIT] Checking out {repo_url} ({strategy}) into {local_path}...")
+    if strategy == "worktree":
+        started = time.perf_counter()
+        _add_worktree(repo_url, local_path, progress)
+        _record_clone_timing(repo_url, strategy, time.perf_counter() - started)
+        return local_path
+
+    options, mirror_seconds = {}, 0.0
+    if strategy == "shallow":
+        options["depth"] = 1
+    elif strategy == "blobless":
+        options["filter"] = "blob:none"
+    elif strategy == "reference":
+        started = time.perf_counter()
+        try:
+            # --dissociate: the checkout must survive the mirror being evicted
+            options["reference"] = ensure_mirror(repo_url)
+            options["dissociate"] = True
+        except GitCommandError as e:
+            logger.warning(f"[GIT] Mirror for {repo_url} unavailable, falling back to a full clone: {e}")
+            strategy = "full"
+        mirror_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    Repo.clone_from(repo_url, local_path, progress=_CloneProgress(progress) if progress else None, **options)
+    _record_clone_timing(repo_url, strategy, time.perf_counter() - started, mirror_seconds)
     
     return local_path
 
 
+def get_head_commit(repo_path: str):
+    """SHA of HEAD, or None if repo_path isn't a git checkout (or has no commits)."""
+    try:
+        return Repo(repo_path).head.commit.hexsha
+    except Exception:
+        return None
+
+
+def get_changed_files(repo_path: str, base_commit: str) -> list:
+    """
+    Paths (relative to the repo root) that differ from base_commit:
+    committed since, staged, unstaged and untracked. Renames are listed as
+    delete + add so both the old and the new path show up.
+
+    Raises GitCommandError if base_commit isn't in the local history.
+    """
+    repo = Repo(repo_path)
+    changed = set(repo.git.diff("--name-only", "--no-renames", base_commit).splitlines())
+    changed.update(repo.untracked_files)
+    return sorted(os.path.normpath(p) for p in changed if p)
+
+
+def reset_workspace(repo_path: str, commit: str):
+    """
+    Put the checkout back at `commit`: tracked files reset, untracked files
+    removed (ignored ones are kept). Used before a retried healing run so it
+    starts from the scanned tree rather than a previous attempt's half-fixed one.
+    """
+    repo = Repo(repo_path)
+    repo.git.reset("--hard", commit)
+    repo.git.clean("-fd")
+    logger.info(f"[GIT] Reset {repo_path} to {commit[:7]}")
+
+
 def create_branch(repo_path: str, team_name: str, leader_name: str) -> str:
     """
     Create a new branch with EXACT required format:
@@ -304,54 +692,165 @@ def create_branch(repo_path: str, team_name: str, leader_name: str) -> str:
     # CRITICAL: Exact format as per hackathon spec
     branch_name = f"{team_sanitized}_{leader_sanitized}_AI_Fix"
 
+    # Linked worktrees share their mirror's refs, and git won't check out a
+    # branch that another live worktree has: each one commits on a local
+    # branch of its own, and CommitBatcher pushes HEAD to branch_name
+    local_branch = branch_name
+    if _is_worktree(repo_path):
+        local_branch = f"{branch_name}-{os.path.basename(os.path.normpath(repo_path))}"
+
     repo = Repo(repo_path)
-    repo.git.checkout('-b', branch_name)
-    logger.info(f"[BRANCH] Created branch: {branch_name}")
+    # -B: a previous run's branch of the same name may still exist (in a
+    # reused checkout or the mirror's refs); it is reset to this run's HEAD
+    repo.git.checkout('-B', local_branch)
+    logger.info(f"[BRANCH] Created branch: {branch_name}"
+                + (f" (local {local_branch})" if local_branch != branch_name else ""))
 
     return branch_name
 
 
-def commit_and_push(repo_path, branch_name, commit_message, github_token, repo_url):
-    repo = Repo(repo_path)
-    repo.git.add(A=True)
-    full_message = f"[AI-AGENT] {commit_message}"
-    commit = repo.index.commit(full_message)
+# ─── Commit batching ──────────────────────────────────────────────────────────
+# One local commit per fix, pushed at checkpoints: every PUSH_EVERY_COMMITS
+# commits, once PUSH_EVERY_SECONDS have passed since the last push, and at
+# flush() (end of run). Each push is a single refspec push straight to the
+# token URL — no fetch first; only a rejected push pulls and retries once.
+
+PUSH_EVERY_COMMITS = int(os.getenv("PUSH_EVERY_COMMITS", "10"))
+PUSH_EVERY_SECONDS = float(os.getenv("PUSH_EVERY_SECONDS", "60"))
 
-    clean_url = repo_url.replace("https://", "").replace("http://", "")
-    auth_url = f"https://{github_token}@{clean_url}"
 
+def _count_commits(repo: Repo) -> int:
+    """Commits reachable from HEAD, counted by git itself rather than walked in Python."""
     try:
-        origin = repo.remote(name='origin')
-        origin.set_url(auth_url)
+        return int(repo.git.rev_list("--count", "HEAD"))
+    except (GitCommandError, ValueError):
+        return 0
+
+
+def _auth_url(repo_url: str, github_token: str) -> str:
+    clean_url = repo_url.replace("https://", "").replace("http://", "")
+    return f"https://{github_token}@{clean_url}"
+
+
+class CommitBatcher:
+    """
+    Commits fixes locally and defers the network push to checkpoints.
+
+        batcher = CommitBatcher(repo_path, branch, token, repo_url)
+        for fix in fixes:
+            ...
+            result = batcher.commit("Fix ...")   # result["push"] set when a checkpoint pushed
+        final = batcher.flush()                  # end of run
+
+    commit_count is maintained incrementally: git counts the history once,
+    up front, and every commit adds one.
+    """
 
-        # ─── PULL BEFORE PUSH (Crucial for sequential fixes) ───
+    def __init__(self, repo_path: str, branch_name: str, github_token: str, repo_url: str,
+                 max_commits: int = None, max_seconds: float = None, replace_remote: bool = False):
+        self.repo = Repo(repo_path)
+        self.branch_name = branch_name
+        self.github_token = github_token
+        self.repo_url = repo_url
+        self.max_commits = PUSH_EVERY_COMMITS if max_commits is None else max_commits
+        self.max_seconds = PUSH_EVERY_SECONDS if max_seconds is None else max_seconds
+
+        self.commit_count = _count_commits(self.repo)
+        self.pending = []   # shas committed since the last successful push
+        # A retried run starts over from the scanned commit: its first push
+        # replaces what the failed attempt left on the remote branch
+        self.replace_remote = replace_remote
+        self.pushes = 0
+        self._last_push = time.monotonic()
+
+    def _redact(self, text: str) -> str:
+        return text.replace(self.github_token, "***") if self.github_token else text
+
+    def commit(self, commit_message: str, paths: list = None) -> dict:
+        """
+        Stage `paths` (everything when None) and commit locally; push if this
+        commit reaches a checkpoint.
+
+        Returns:
+            {"success", "sha", "commit_count", "push": push result | None}
+        """
+        try:
+            if paths:
+                self.repo.git.add("--", *paths)
+            else:
+                self.repo.git.add(A=True)
+            commit = self.repo.index.commit(f"[AI-AGENT] {commit_message}")
+        except Exception as e:
+            print(f"[GIT ERROR] Commit failed: {e}")
+            return {"success": False, "reason": str(e), "push": None}
+
+        self.commit_count += 1
+        self.pending.append(commit.hexsha)
+
+        push = None
+        due = time.monotonic() - self._last_push >= self.max_seconds
+        if len(self.pending) >= self.max_commits or due:
+            push = self.push()
+        return {"success": True, "sha": commit.hexsha, "commit_count": self.commit_count, "push": push}
+
+    def push(self) -> dict:
+        """
+        Push every pending commit with one refspec push.
+
+        Returns:
+            {"success", "branch", "sha", "commit_count", "pushed_commits"} or
+            {"success": False, "reason", "pushed_commits": 0}
+        """
+        if not self.pending:
+            return {"success": True, "branch": self.branch_name, "sha": self.repo.head.commit.hexsha,
+                    "commit_count": self.commit_count, "pushed_commits": 0}
+
+        auth_url = _auth_url(self.repo_url, self.github_token)
+        # HEAD, not refs/heads/<branch>: in a worktree the local branch has its own name
+        refspec = f"HEAD:refs/heads/{self.branch_name}"
+        if self.replace_remote:
+            refspec = "+" + refspec
         try:
-            # Fetch to see if branch exists on remote
-            origin.fetch()
-            if f"origin/{branch_name}" in [ref.name for ref in origin.refs]:
-                repo.git.pull('origin', branch_name)
-                print(f"[GIT] Pulled latest from {branch_name}")
+            try:
+                self.repo.git.push("--porcelain", auth_url, refspec)
+            except GitCommandError as e:
+                if "rejected" not in str(e) and "non-fast-forward" not in str(e):
+                    raise
+                # Someone else moved the branch: integrate once and retry
+                print(f"[GIT] Push of {self.branch_name} rejected, pulling and retrying")
+                self.repo.git.pull("--no-rebase", auth_url, self.branch_name)
+                self.commit_count = _count_commits(self.repo)
+                self.repo.git.push("--porcelain", auth_url, refspec)
         except Exception as e:
-            print(f"[GIT] No remote branch to pull yet or pull failed: {e}")
-
-        # ─── THE PUSH ───
-        push_info = origin.push(refspec=f"refs/heads/{branch_name}:refs/heads/{branch_name}")
-        
-        # 🚨 CHECK FOR PUSH ERRORS
-        info = push_info[0]
-        if info.flags & info.ERROR:
-            error_msg = f"Push failed: {info.summary}"
+            error_msg = f"Push failed: {self._redact(str(e))}"
             print(f"[GIT ERROR] {error_msg}")
-            return {"success": False, "reason": error_msg}
+            return {"success": False, "reason": error_msg, "pushed_commits": 0}
 
-        print(f"[GIT SUCCESS] Pushed {commit.hexsha[:7]} to {branch_name}")
-        return {"success": True, "branch": branch_name, "sha": commit.hexsha, "commit_count": len(list(repo.iter_commits()))}
+        pushed = len(self.pending)
+        self.pending = []
+        self.replace_remote = False
+        self.pushes += 1
+        self._last_push = time.monotonic()
+        sha = self.repo.head.commit.hexsha
+        print(f"[GIT SUCCESS] Pushed {pushed} commit(s) up to {sha[:7]} to {self.branch_name}")
+        return {"success": True, "branch": self.branch_name, "sha": sha,
+                "commit_count": self.commit_count, "pushed_commits": pushed}
 
-    except Exception as e:
-        print(f"[GIT CRITICAL ERROR] {str(e)}")
-        return {"success": False, "reason": str(e)}
-    finally:
-        origin.set_url(repo_url)
+    def flush(self) -> dict:
+        """End-of-run checkpoint."""
+        return self.push()
+
+
+def commit_and_push(repo_path, branch_name, commit_message, github_token, repo_url):
+    """One commit, pushed immediately — a CommitBatcher with a checkpoint after every commit."""
+    batcher = CommitBatcher(repo_path, branch_name, github_token, repo_url, max_commits=1)
+    result = batcher.commit(commit_message)
+    if not result["success"]:
+        return {"success": False, "reason": result["reason"]}
+    push = result["push"]
+    if not push["success"]:
+        return {"success": False, "reason": push["reason"]}
+    return {"success": True, "branch": branch_name, "sha": push["sha"], "commit_count": push["commit_count"]}
 
 
 def generate_results_json(
@@ -444,7 +943,7 @@ def get_repo_info(repo_path: str) -> dict:
     repo = Repo(repo_path)
     return {
         "current_branch": repo.active_branch.name,
-        "commit_count":   len(list(repo.iter_commits())),
+        "commit_count":   _count_commits(repo),
         "remote_url":     repo.remotes.origin.url if repo.remotes else None,
         "is_dirty":       repo.is_dirty(untracked_files=True)
     }
@@ -0,0 +1,360 @@
+# app/services/import_resolver.py
+# Static import resolution for the IMPORT check.
+# Nothing from the scanned repo (or its dependencies) is ever imported or executed:
+# modules are located with import-system finders / the repo's own file layout,
+# and exported names are read from the target module's AST.
+
+import os
+import ast
+import sys
+import logging
+import importlib.util
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# origin: source file (None for namespace packages / builtins)
+# search_locations: package __path__, None for plain modules
+ModuleInfo = namedtuple("ModuleInfo", "name origin search_locations local")
+
+_COMPOUND_BODIES = ("body", "orelse", "finalbody")
+
+
+def _top_level_names(tree: ast.Module):
+    """
+    Names bound at module level, looking through if/try/with blocks.
+
+    Returns:
+        (names, complete) — complete is False when the module can bind names
+        we can't see statically (star imports, module-level __getattr__).
+    """
+    names, complete = set(), True
+
+    def bind_target(target):
+        if isinstance(target, ast.Name):
+            names.add(target.id)
+        elif isinstance(target, (ast.Tuple, ast.List)):
+            for elt in target.elts:
+                bind_target(elt)
+        elif isinstance(target, ast.Starred):
+            bind_target(target.value)
+
+    def visit(body):
+        nonlocal complete
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                names.add(node.name)
+                if node.name == "__getattr__":
+                    complete = False
+            elif isinstance(node, ast.Assign):
+                for target in node.targets:
+                    bind_target(target)
+            elif isinstance(node, (ast.AnnAssign, ast.AugAssign)):
+                bind_target(node.target)
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    names.add(alias.asname or alias.name.split(".")[0])
+            elif isinstance(node, ast.ImportFrom):
+                for alias in node.names:
+                    if alias.name == "*":
+                        complete = False
+                    else:
+                        names.add(alias.asname or alias.name)
+            elif isinstance(node, (ast.If, ast.Try, ast.With, ast.For, ast.While)) or \
+                    type(node).__name__ == "TryStar":
+                if isinstance(node, ast.For):
+                    bind_target(node.target)
+                for field in _COMPOUND_BODIES:
+                    visit(getattr(node, field, []))
+                for handler in getattr(node, "handlers", []):
+                    if handler.name:
+                        names.add(handler.name)
+                    visit(handler.body)
+
+    visit(tree.body)
+    return names, complete
+
+
+def module_name_for(relative: str) -> str:
+    """'pkg/sub/mod.py' → 'pkg.sub.mod', 'pkg/__init__.py' → 'pkg'."""
+    parts = relative.replace(os.sep, "/").split("/")
+    parts[-1] = parts[-1][:-3] if parts[-1].endswith(".py") else parts[-1]
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(p for p in parts if p)
+
+
+# ─── Repo-local module index ─────────────────────────────────────────────────
+
+class ModuleIndex:
+    """
+    Every module and package in the cloned tree, keyed by dotted name.
+
+    Files are fed in with add() during the discovery walk and the index is
+    built once with build(); after that every lookup is a dict hit. A file is
+    registered under its repo-root-relative name (pkg/sub/mod.py → pkg.sub.mod)
+    and, when its package chain starts below the root (src/ layouts, backend/app,
+    script folders), also under the name relative to that package root.
+    """
+
+    def __init__(self, repo_path: str):
+        self.repo_path = os.path.abspath(repo_path)
+        self._files = []
+        self._modules = {}
+
+    def add(self, file_path: str):
+        self._files.append(os.path.abspath(file_path))
+
+    def build(self) -> "ModuleIndex":
+        self._files.sort()
+        package_dirs = {
+            os.path.dirname(f) for f in self._files if os.path.basename(f) == "__init__.py"
+        }
+
+        def package_root(directory: str) -> str:
+            while directory in package_dirs and directory != self.repo_path:
+                directory = os.path.dirname(directory)
+            return directory
+
+        namespaces = {}
+
+        def register(file_path: str, root: str):
+            name = module_name_for(os.path.relpath(file_path, root))
+            if not name or name in self._modules:
+                return
+            if os.path.basename(file_path) == "__init__.py":
+                self._modules[name] = ModuleInfo(name, file_path, [os.path.dirname(file_path)], True)
+            else:
+                self._modules[name] = ModuleInfo(name, file_path, None, True)
+            # Parent directories without __init__.py act as namespace packages
+            parts = name.split(".")
+            for i in range(1, len(parts)):
+                namespaces.setdefault(".".join(parts[:i]), os.path.join(root, *parts[:i]))
+
+        # Root-relative names win over package-root names on collisions
+        for file_path in self._files:
+            register(file_path, self.repo_path)
+        for file_path in self._files:
+            root = package_root(os.path.dirname(file_path))
+            if root != self.repo_path:
+                register(file_path, root)
+
+        for name, directory in namespaces.items():
+            if name not in self._modules:
+                self._modules[name] = ModuleInfo(name, None, [directory], True)
+
+        logger.info(f"[IMPORTS] Indexed {len(self._modules)} repo-local modules")
+        return self
+
+    @classmethod
+    def from_tree(cls, repo_path: str) -> "ModuleIndex":
+        """Standalone build for callers that don't go through find_source_files."""
+        from app.services.file_discovery import discover_files
+        index = cls(repo_path)
+        discover_files(repo_path, index)
+        return index
+
+    def get(self, name: str):
+        return self._modules.get(name)
+
+    def __len__(self):
+        return len(self._modules)
+
+
+class ImportResolver:
+    """
+    Resolves imports for one scan. All lookups are memoized on the instance,
+    so create one per scan and share it across every file in that scan.
+
+    Lookup order mirrors running from the repo root: the cloned tree (via its
+    ModuleIndex) first, then whatever the import system can find on sys.path.
+    Exported names are parsed at most once per module per scan, however many
+    files import it.
+    """
+
+    def __init__(self, repo_path: str = "", index: ModuleIndex = None):
+        self.repo_path = os.path.abspath(repo_path) if repo_path else ""
+        if index is None and self.repo_path:
+            index = ModuleIndex.from_tree(self.repo_path)
+        self.index = index
+        self._modules = {}   # dotted name → ModuleInfo | None
+        self._exports = {}   # dotted name → (names, complete)
+
+    # ── Module lookup ────────────────────────────────────────────────────────
+
+    def find_module(self, name: str):
+        if name not in self._modules:
+            self._modules[name] = self._find_local(name) or self._find_installed(name)
+        return self._modules[name]
+
+    def _find_local(self, name: str):
+        return self.index.get(name) if self.index is not None else None
+
+    def _find_installed(self, name: str):
+        """Locate a module via the import system's finders without importing it."""
+        if name in sys.modules:
+            mod = sys.modules[name]
+            return ModuleInfo(name, getattr(mod, "__file__", None),
+                              list(getattr(mod, "__path__", None) or []) or None, False)
+
+        parts = name.split(".")
+        try:
+            spec = importlib.util.find_spec(parts[0])
+        except (ImportError, ValueError):
+            spec = None
+
+        for i in range(1, len(parts)):
+            if spec is None or not spec.submodule_search_locations:
+                return None
+            # Ask the meta-path finders directly: importlib.util.find_spec on a
+            # dotted name would import (and execute) every parent package
+            spec = self._find_submodule_spec(".".join(parts[:i + 1]), list(spec.submodule_search_locations))
+
+        if spec is None:
+            return None
+        origin = spec.origin if spec.has_location else None
+        locations = list(spec.submodule_search_locations) if spec.submodule_search_locations else None
+        return ModuleInfo(name, origin, locations, False)
+
+    @staticmethod
+    def _find_submodule_spec(fullname: str, path: list):
+        for finder in sys.meta_path:
+            find_spec = getattr(finder, "find_spec", None)
+            if find_spec is None:
+                continue
+            try:
+                spec = find_spec(fullname, path)
+            except Exception:
+                continue
+            if spec is not None:
+                return spec
+        return None
+
+    # ── Exported names ───────────────────────────────────────────────────────
+
+    def exports(self, info: ModuleInfo):
+        """(names, complete) for a module, from its source AST when available."""
+        if info.name in self._exports:
+            return self._exports[info.name]
+
+        result = (set(), False)
+        if info.origin and info.origin.endswith(".py"):
+            try:
+                with open(info.origin, "r", encoding="utf-8", errors="ignore") as f:
+                    result = _top_level_names(ast.parse(f.read()))
+            except (OSError, SyntaxError, ValueError) as e:
+                logger.debug(f"[IMPORTS] Could not parse {info.origin}: {e}")
+        elif info.origin is None and info.search_locations and info.local:
+            # Namespace package inside the repo: only submodules are importable
+            result = (set(), True)
+        elif info.name in sys.modules:
+            # Builtins / extension modules the API process already loaded
+            result = (set(dir(sys.modules[info.name])), True)
+
+        self._exports[info.name] = result
+        return result
+
+    def has_name(self, info: ModuleInfo, name: str) -> bool:
+        names, complete = self.exports(info)
+        if name in names:
+            return True
+        # `from pkg import submodule`
+        if info.search_locations and self.find_module(f"{info.name}.{name}"):
+            return True
+        # Can't prove the name is missing → don't report it
+        return not complete
+
+    # ── Import check ─────────────────────────────────────────────────────────
+
+    def _absolute_target(self, ref: dict, relative: str):
+        """Resolve a (possibly relative) from-import to an absolute module name."""
+        if not ref["level"]:
+            return ref["module"]
+
+        package = module_name_for(relative).split(".")
+        if os.path.basename(relative) != "__init__.py":
+            package = package[:-1]
+        drop = ref["level"] - 1
+        if drop > len(package):
+            return None
+        base = package[:len(package) - drop]
+        if ref["module"]:
+            base = base + [ref["module"]]
+        return ".".join(base) or None
+
+    def referenced_modules(self, imports: list, relative: str) -> set:
+        """
+        Every dotted name an import list can bind to: each imported module,
+        its parent packages and, for `from pkg import name`, pkg.name (which
+        may be a submodule). Repo-local or not, resolvable or not.
+        """
+        names = set()
+        for ref in imports:
+            target = ref["module"] if ref["names"] is None else self._absolute_target(ref, relative)
+            if not target:
+                continue
+            parts = target.split(".")
+            names.update(".".join(parts[:i]) for i in range(1, len(parts) + 1))
+            names.update(f"{target}.{name}" for name in ref["names"] or [])
+        return names
+
+    def local_dependencies(self, imports: list, relative: str) -> set:
+        """
+        Repo-local files a module depends on through its imports: every
+        module actually executed by the import (parent packages included) and,
+        for `from pkg import name`, the submodule pkg.name when there is one.
+        """
+        if self.index is None:
+            return set()
+        deps = set()
+        for name in self.referenced_modules(imports, relative):
+            info = self.index.get(name)
+            if info is not None and info.origin:
+                deps.add(info.origin)
+        return deps
+
+    def check_imports(self, imports: list, relative: str) -> list:
+        """
+        Turn the import references collected by static_checks into IMPORT errors.
+
+        Each ref is {"line", "module", "names", "level"}; names is None for a
+        plain `import a.b`.
+        """
+        errors = []
+
+        def report(line, description, fix_hint):
+            errors.append({
+                "file": relative,
+                "bug_type": "IMPORT",
+                "line": line,
+                "description": description,
+                "fix_hint": fix_hint
+            })
+
+        for ref in imports:
+            line = ref["line"]
+
+            if ref["names"] is None:
+                if not self.find_module(ref["module"]):
+                    report(line, f"ImportError: No module named '{ref['module']}'",
+                           f"Install '{ref['module']}' or remove the import")
+                continue
+
+            target = self._absolute_target(ref, relative)
+            if target is None:
+                # Relative import at the repo root — nothing to resolve it against
+                continue
+
+            display = "." * ref["level"] + (ref["module"] or "")
+            info = self.find_module(target)
+            if info is None:
+                report(line, f"ImportError: No module named '{display or target}'",
+                       f"Install or remove the import at line {line}")
+                continue
+
+            for name in ref["names"]:
+                if name != "*" and not self.has_name(info, name):
+                    report(line, f"ImportError: cannot import '{name}' from '{display}'",
+                           f"'{name}' does not exist in '{display}'")
+
+        return errors
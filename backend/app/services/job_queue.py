@@ -0,0 +1,221 @@
+# app/services/job_queue.py
+# Durable job queue for healing runs, backed by SQLite.
+# The API only enqueues; worker processes (python -m app.worker) claim jobs,
+# run them and report back. A claimed job is invisible to other workers until
+# its visibility timeout runs out — workers heartbeat to extend it — so a job
+# whose worker died is picked up again. Failed attempts are retried with
+# backoff until max_attempts, and no more than JOB_MAX_RUNNING jobs run at once
+# across all workers.
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUE_PATH = os.getenv(
+    "JOB_QUEUE_PATH",
+    os.path.join(tempfile.gettempdir(), "agent_queue", "jobs.sqlite3")
+)
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_MAX_RUNNING = int(os.getenv("JOB_MAX_RUNNING", "4"))
+JOB_VISIBILITY_TIMEOUT = float(os.getenv("JOB_VISIBILITY_TIMEOUT", "300"))
+JOB_RETRY_BACKOFF = float(os.getenv("JOB_RETRY_BACKOFF", "30"))   # seconds × attempt number
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+class JobQueue:
+    """
+    Jobs move queued → running → done, or back to queued on a retryable
+    failure / expired visibility timeout, and to failed once out of attempts.
+
+        job_id = queue.enqueue("heal", {...})
+        job = queue.claim("worker-1")         # None when nothing is claimable
+        queue.heartbeat(job["id"], "worker-1")
+        queue.complete(job["id"], "worker-1")  # or queue.fail(job["id"], "worker-1", "error")
+
+    Safe to share between processes (SQLite WAL + immediate transactions for
+    every state change) and between threads (one connection, one lock).
+    """
+
+    def __init__(self, path: str = None, max_running: int = None):
+        self.path = path or JOB_QUEUE_PATH
+        self.max_running = JOB_MAX_RUNNING if max_running is None else max_running
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " kind TEXT NOT NULL,"
+            " ref TEXT,"
+            " payload TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " max_attempts INTEGER NOT NULL,"
+            " available_at REAL NOT NULL,"
+            " lease_until REAL,"
+            " worker TEXT,"
+            " last_error TEXT,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, available_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_ref ON jobs(ref)")
+
+    def _transaction(self, fn):
+        """Run fn(conn) in one BEGIN IMMEDIATE transaction (write lock taken up front)."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    @staticmethod
+    def _row(row) -> dict:
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        return job
+
+    # ── Producer side ───────────────────────────────────────────────────────
+
+    def enqueue(self, kind: str, payload: dict, ref: str = None, max_attempts: int = None) -> int:
+        """Add a job; `ref` is a lookup key for find() (e.g. "run-12")."""
+        now = time.time()
+        return self._transaction(lambda conn: conn.execute(
+            "INSERT INTO jobs (kind, ref, payload, status, max_attempts, available_at, created_at, updated_at)"
+            " VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+            (kind, ref, json.dumps(payload), max_attempts or JOB_MAX_ATTEMPTS, now, now, now)
+        ).lastrowid)
+
+    def get(self, job_id: int) -> dict:
+        with self._lock:
+            return self._row(self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def find(self, ref: str) -> dict:
+        """Latest job enqueued under ref, or None."""
+        with self._lock:
+            return self._row(self._conn.execute(
+                "SELECT * FROM jobs WHERE ref = ? ORDER BY id DESC LIMIT 1", (ref,)
+            ).fetchone())
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+        counts.update({status: n for status, n in rows})
+        return counts
+
+    # ── Worker side ─────────────────────────────────────────────────────────
+
+    def claim(self, worker: str, visibility_timeout: float = None):
+        """
+        Take the oldest claimable job: queued and due, or running with an
+        expired visibility timeout (its worker is gone). Returns None when
+        nothing is claimable or JOB_MAX_RUNNING jobs are already running.
+        """
+        timeout = JOB_VISIBILITY_TIMEOUT if visibility_timeout is None else visibility_timeout
+
+        def claim_one(conn):
+            now = time.time()
+            # Abandoned jobs that already used their last attempt fail here
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', last_error = 'visibility timeout expired', updated_at = ?"
+                " WHERE status = 'running' AND lease_until < ? AND attempts >= max_attempts",
+                (now, now)
+            )
+            running = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'running' AND lease_until >= ?", (now,)
+            ).fetchone()[0]
+            if running >= self.max_running:
+                return None
+            row = conn.execute(
+                "SELECT id FROM jobs"
+                " WHERE (status = 'queued' AND available_at <= ?) OR (status = 'running' AND lease_until < ?)"
+                " ORDER BY available_at, id LIMIT 1",
+                (now, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_until = ?,"
+                " worker = ?, updated_at = ? WHERE id = ?",
+                (now + timeout, worker, now, row["id"])
+            )
+            return self._row(conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+
+        job = self._transaction(claim_one)
+        if job:
+            logger.info(f"[QUEUE] {worker} claimed job {job['id']} ({job['kind']}, "
+                        f"attempt {job['attempts']}/{job['max_attempts']})")
+        return job
+
+    def heartbeat(self, job_id: int, worker: str, visibility_timeout: float = None) -> bool:
+        """Extend the claim. False if the job is no longer ours (timed out and re-claimed)."""
+        timeout = JOB_VISIBILITY_TIMEOUT if visibility_timeout is None else visibility_timeout
+        now = time.time()
+        return self._transaction(lambda conn: conn.execute(
+            "UPDATE jobs SET lease_until = ?, updated_at = ?"
+            " WHERE id = ? AND worker = ? AND status = 'running'",
+            (now + timeout, now, job_id, worker)
+        ).rowcount == 1)
+
+    def complete(self, job_id: int, worker: str) -> bool:
+        now = time.time()
+        return self._transaction(lambda conn: conn.execute(
+            "UPDATE jobs SET status = 'done', lease_until = NULL, updated_at = ?"
+            " WHERE id = ? AND worker = ? AND status = 'running'",
+            (now, job_id, worker)
+        ).rowcount == 1)
+
+    def fail(self, job_id: int, worker: str, error: str) -> str:
+        """
+        Record a failed attempt.
+
+        Returns:
+            "queued" (will be retried after backoff), "failed" (out of
+            attempts), or None if the job is no longer ours.
+        """
+        def fail_one(conn):
+            now = time.time()
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND worker = ? AND status = 'running'",
+                (job_id, worker)
+            ).fetchone()
+            if row is None:
+                return None
+            status = "queued" if row["attempts"] < row["max_attempts"] else "failed"
+            conn.execute(
+                "UPDATE jobs SET status = ?, available_at = ?, lease_until = NULL, last_error = ?,"
+                " updated_at = ? WHERE id = ?",
+                (status, now + JOB_RETRY_BACKOFF * row["attempts"], error[:2000], now, job_id)
+            )
+            return status
+
+        status = self._transaction(fail_one)
+        logger.warning(f"[QUEUE] Job {job_id} attempt failed ({status}): {error[:200]}")
+        return status
+
+
+def get_job_queue() -> JobQueue:
+    """Process-wide job queue, opened lazily on first use."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue()
+    return _job_queue
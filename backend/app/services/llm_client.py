@@ -0,0 +1,255 @@
+# app/services/llm_client.py
+# Shared async client for the Mistral chat completions API.
+# One pooled httpx.AsyncClient per event loop and API key keeps connections
+# alive across repairs; a process-wide token bucket keeps request starts within
+# the API quota; 429s and 5xx/transport errors are retried with jittered
+# backoff (a 429 pauses every caller, honouring Retry-After); and a request
+# still outstanding after the hedge delay gets a duplicate, first answer wins.
+# LLM_BASE_URL points it at any compatible endpoint, e.g. a local stub server.
+# Whoever owns an event loop calls aclose_all() before the loop ends.
+
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+import weakref
+import statistics
+from collections import deque
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://api.mistral.ai")
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+LLM_BURST = int(os.getenv("LLM_BURST", "5"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "1"))
+LLM_RETRY_MAX_SECONDS = float(os.getenv("LLM_RETRY_MAX_SECONDS", "30"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "16"))
+# Seconds before a duplicate request is sent; "auto" = p95 of recent
+# latencies (once enough are known), "off" = never hedge
+LLM_HEDGE_AFTER = os.getenv("LLM_HEDGE_AFTER", "auto")
+LLM_HEDGE_MIN_SAMPLES = 20
+
+_clients = weakref.WeakKeyDictionary()   # event loop → {api_key: LLMClient}
+_clients_lock = threading.Lock()
+_bucket = None
+_bucket_lock = threading.Lock()
+
+
+class LLMError(Exception):
+    """A chat completion failed for good; status_code is None for transport errors."""
+
+    def __init__(self, message: str, status_code: int = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class TokenBucket:
+    """
+    Process-wide request pacing: `rate_per_minute` tokens a minute, up to
+    `burst` saved up. Loop-agnostic (a thread lock plus asyncio.sleep), so it
+    holds across the event loops of a worker's successive runs.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token (possibly going into debt); seconds until it is ours."""
+        with self._lock:
+            now = time.monotonic()
+            if self.rate > 0:
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 and self.rate > 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    async def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def try_acquire(self) -> bool:
+        """Take a token only if one is available right now (hedges never queue)."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return False
+            if self.rate > 0:
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self.rate > 0 and self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def pause(self, seconds: float):
+        """The API pushed back: nobody starts a request for `seconds`."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def get_token_bucket() -> TokenBucket:
+    """Process-wide token bucket shared by every LLMClient."""
+    global _bucket
+    with _bucket_lock:
+        if _bucket is None:
+            _bucket = TokenBucket(LLM_REQUESTS_PER_MINUTE, LLM_BURST)
+    return _bucket
+
+
+def _retry_after(response) -> float:
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class LLMClient:
+    """
+    Chat completions over one keep-alive connection pool.
+
+        client = get_llm_client(api_key)
+        content = await client.chat("codestral-latest", [{"role": "user", "content": "..."}])
+
+    Must be used on the event loop it was created on; get_llm_client()
+    hands out one per loop.
+    """
+
+    def __init__(self, api_key: str, base_url: str = None, bucket: TokenBucket = None,
+                 hedge_after: str = None, max_retries: int = None):
+        self.base_url = (base_url or LLM_BASE_URL).rstrip("/")
+        self.bucket = bucket or get_token_bucket()
+        self.hedge_after = LLM_HEDGE_AFTER if hedge_after is None else str(hedge_after)
+        self.max_retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+        self._http = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"Authorization": f"Bearer {api_key}", "Accept": "application/json"},
+            timeout=LLM_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS,
+                                max_keepalive_connections=LLM_MAX_CONNECTIONS)
+        )
+        self._latencies = deque(maxlen=200)
+        self._stats = {"requests": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "failures": 0}
+
+    # ── Single request with retries ─────────────────────────────────────────
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: spreads the retries of callers that failed together
+        return random.uniform(0, min(LLM_RETRY_MAX_SECONDS, LLM_RETRY_BASE_SECONDS * (2 ** attempt)))
+
+    async def _send(self, payload: dict, have_token: bool = False) -> str:
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt or not have_token:
+                await self.bucket.acquire()
+            self._stats["requests"] += 1
+            started = time.monotonic()
+            response = None
+            try:
+                response = await self._http.post("/v1/chat/completions", json=payload)
+            except httpx.TransportError as e:
+                last_error = LLMError(f"{type(e).__name__}: {e}")
+            else:
+                if response.status_code == 200:
+                    self._latencies.append(time.monotonic() - started)
+                    return response.json()["choices"][0]["message"]["content"]
+                last_error = LLMError(f"HTTP {response.status_code}: {response.text[:300]}", response.status_code)
+                if response.status_code != 429 and response.status_code < 500:
+                    break   # our request is wrong; retrying won't help
+
+            if attempt == self.max_retries:
+                break
+            delay = _retry_after(response) or self._backoff(attempt)
+            if response is not None and response.status_code == 429:
+                self.bucket.pause(delay)
+            self._stats["retries"] += 1
+            logger.info(f"[LLM] {last_error}; retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+        self._stats["failures"] += 1
+        raise last_error
+
+    # ── Hedging ─────────────────────────────────────────────────────────────
+
+    def _hedge_delay(self):
+        if self.hedge_after == "off":
+            return None
+        if self.hedge_after != "auto":
+            return float(self.hedge_after)
+        if len(self._latencies) < LLM_HEDGE_MIN_SAMPLES:
+            return None
+        return statistics.quantiles(self._latencies, n=20)[-1]   # p95
+
+    async def chat(self, model: str, messages: list, **params) -> str:
+        """Content of the first choice of one chat completion."""
+        payload = {"model": model, "messages": messages, **params}
+        delay = self._hedge_delay()
+        if delay is None:
+            return await self._send(payload)
+
+        primary = asyncio.ensure_future(self._send(payload))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or not self.bucket.try_acquire():
+            return await primary
+
+        self._stats["hedges"] += 1
+        hedge = asyncio.ensure_future(self._send(payload, have_token=True))
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._stats["hedge_wins"] += 1
+                        return task.result()
+            return primary.result()   # both failed: surface the primary's error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    # ── Housekeeping ────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        latencies = sorted(self._latencies)
+        return {
+            **self._stats,
+            "p50_seconds": round(latencies[len(latencies) // 2], 3) if latencies else None,
+            "p95_seconds": round(latencies[int(len(latencies) * 0.95)], 3) if latencies else None,
+        }
+
+    async def aclose(self):
+        await self._http.aclose()
+
+
+def get_llm_client(api_key: str) -> LLMClient:
+    """The LLMClient for api_key on the running event loop, created on first use."""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        per_loop = _clients.setdefault(loop, {})
+        client = per_loop.get(api_key)
+        if client is None:
+            client = per_loop[api_key] = LLMClient(api_key)
+    return client
+
+
+async def aclose_all():
+    """Close the clients of the running event loop (call before the loop ends)."""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        per_loop = _clients.pop(loop, {})
+    for client in per_loop.values():
+        await client.aclose()
@@ -0,0 +1,149 @@
+# app/services/patcher.py
+# In-process application of unified diffs returned by the LLM.
+# Models miscount hunk headers and drift line numbers, so hunks are located by
+# their content: exact match nearest the stated position first, then ignoring
+# trailing whitespace, then with up to `fuzz` context lines dropped from either
+# end (as GNU patch does). Anything malformed or not applying cleanly raises
+# PatchError, and nothing is returned for the caller to write.
+
+import re
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class PatchError(ValueError):
+    """The diff is malformed or doesn't apply to the source."""
+
+
+def parse_unified_diff(diff: str) -> list:
+    """
+    Hunks of a single-file unified diff.
+
+    Returns:
+        [{"old_start": int, "lines": [(tag, text), ...]}, ...] where tag is
+        " " (context), "-" (removed) or "+" (added).
+    """
+    hunks = []
+    current = None
+    raw_lines = diff.splitlines()
+    skip = False
+    for i, raw in enumerate(raw_lines):
+        if skip:
+            skip = False
+            continue
+        # File headers; a "--- " only counts when "+++ " follows (else it's a
+        # removed line starting with "--")
+        if raw.startswith(("diff --git ", "index ")):
+            current = None
+            continue
+        if raw.startswith("--- ") and i + 1 < len(raw_lines) and raw_lines[i + 1].startswith("+++ "):
+            current = None
+            skip = True
+            continue
+        header = _HUNK_HEADER.match(raw)
+        if header:
+            old_start = int(header.group(1))
+            if header.group(2) == "0":
+                old_start += 1   # "-N,0" inserts after line N
+            current = {"old_start": old_start, "lines": []}
+            hunks.append(current)
+            continue
+        if current is None:
+            if raw.strip():
+                raise PatchError(f"Unexpected line outside a hunk: {raw[:80]!r}")
+            continue
+        if raw.startswith("\\"):   # "\ No newline at end of file"
+            continue
+        if raw == "":
+            current["lines"].append((" ", ""))   # blank context line whose space got trimmed
+        elif raw[0] in " -+":
+            current["lines"].append((raw[0], raw[1:]))
+        else:
+            raise PatchError(f"Malformed hunk line: {raw[:80]!r}")
+
+    if not hunks:
+        raise PatchError("No hunks in diff")
+    for hunk in hunks:
+        if not any(tag in "-+" for tag, _ in hunk["lines"]):
+            raise PatchError(f"Hunk at line {hunk['old_start']} changes nothing")
+    return hunks
+
+
+def _find(lines: list, old: list, expected: int, start: int, loose: bool):
+    """Index of `old` in lines[start:] nearest to `expected`, or None."""
+    norm = (lambda s: s.rstrip()) if loose else (lambda s: s)
+    target = [norm(l) for l in old]
+    last = len(lines) - len(old)
+    if last < start:
+        return None
+    candidates = range(start, last + 1)
+    for index in sorted(candidates, key=lambda i: abs(i - expected)):
+        if all(norm(lines[index + k]) == target[k] for k in range(len(old))):
+            return index
+    return None
+
+
+def _locate(lines: list, hunk_lines: list, expected: int, start: int, fuzz: int):
+    """
+    Where the hunk applies.
+
+    Returns:
+        (index, trimmed hunk lines) or None.
+    """
+    for trim in range(fuzz + 1):
+        body = list(hunk_lines)
+        # Drop up to `trim` context lines from each end
+        lead = 0
+        while lead < trim and body and body[0][0] == " ":
+            body.pop(0)
+            lead += 1
+        tail = 0
+        while tail < trim and body and body[-1][0] == " ":
+            body.pop()
+            tail += 1
+        if trim and not (lead or tail):
+            break
+        old = [text for tag, text in body if tag != "+"]
+        if not old:
+            return (min(max(expected + lead, start), len(lines)), body)
+        for loose in (False, True):
+            index = _find(lines, old, expected + lead, start, loose)
+            if index is not None:
+                return index, body
+    return None
+
+
+def apply_unified_diff(source: str, diff: str, fuzz: int = 2) -> str:
+    """
+    Apply a unified diff to source and return the patched text.
+
+    Raises:
+        PatchError when the diff is malformed or a hunk can't be placed.
+    """
+    hunks = parse_unified_diff(diff)
+    trailing_newline = source.endswith("\n")
+    lines = source.splitlines()
+    out = []
+    cursor = 0   # lines[:cursor] are already copied to out
+    offset = 0   # drift between stated and actual positions so far
+
+    for hunk in hunks:
+        expected = max(hunk["old_start"] - 1 + offset, cursor)
+        placed = _locate(lines, hunk["lines"], expected, cursor, fuzz)
+        if placed is None:
+            raise PatchError(f"Hunk at line {hunk['old_start']} doesn't apply")
+        index, body = placed
+        offset = index - (hunk["old_start"] - 1)
+        out.extend(lines[cursor:index])
+        consumed = 0
+        for tag, text in body:
+            if tag == "+":
+                out.append(text)
+                continue
+            if tag == " ":
+                out.append(lines[index + consumed])   # keep the file's own whitespace
+            consumed += 1
+        cursor = index + consumed
+
+    out.extend(lines[cursor:])
+    return "\n".join(out) + ("\n" if trailing_newline else "")
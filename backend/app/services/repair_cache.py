@@ -0,0 +1,131 @@
+# app/services/repair_cache.py
+# Persistent cache of LLM repairs, in front of FixerService.get_repair.
+# The same broken region with the same errors — a re-run on one repo, or forks
+# of one template — gets the same fix without another model call. Entries are
+# keyed by a normalized hash of the code window (indentation, trailing
+# whitespace and blank lines don't matter), the bug types and descriptions, and
+# the model; they hold the corrected window only, so they replay wherever that
+# window sits in the file. A replay must parse or it is dropped from the cache.
+
+import os
+import ast
+import json
+import hashlib
+import logging
+import tempfile
+import textwrap
+import threading
+
+from app.utils.disk_cache import DiskCache
+from app.services.context_window import splice_window
+
+logger = logging.getLogger(__name__)
+
+# Bump REPAIR_CACHE_VERSION when the prompts change enough to invalidate old fixes
+REPAIR_CACHE_VERSION = "1"
+REPAIR_CACHE_PATH = os.getenv(
+    "REPAIR_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "agent_cache", "repairs.sqlite3")
+)
+REPAIR_CACHE_MAX_MB = int(os.getenv("REPAIR_CACHE_MAX_MB", "128"))
+
+_repair_cache = None
+_repair_cache_lock = threading.Lock()
+
+
+def _normalize(code: str) -> str:
+    lines = [line.rstrip() for line in textwrap.dedent(code.replace("\r\n", "\n")).splitlines()]
+    return "\n".join(line for line in lines if line)
+
+
+def _region_of(source: str, window: dict) -> str:
+    """The text a cache entry covers: the window's region, or the whole file."""
+    return window["region"] if window else source
+
+
+def _fixed_region(original: str, fixed: str, window: dict):
+    """
+    The corrected window cut out of a fixed file, or None if the fix also
+    changed lines outside it (then it can't be replayed as a region).
+    """
+    if not window:
+        return fixed
+    before = original.splitlines(keepends=True)
+    after = fixed.splitlines(keepends=True)
+    head, tail = window["start"] - 1, len(before) - window["end"]
+    if len(after) < head + tail or after[:head] != before[:head] or (tail and after[-tail:] != before[-tail:]):
+        return None
+    return "".join(after[head:len(after) - tail])
+
+
+class RepairCache:
+    """
+    Corrected windows in a DiskCache (SQLite, LRU by bytes), shared by all
+    processes on the node.
+
+        fixed = cache.replay(source, window, errors, model)   # None on a miss
+        ...
+        cache.store(source, fixed, window, errors, model)
+    """
+
+    def __init__(self, path: str = None, max_bytes: int = None):
+        self._cache = DiskCache(path or REPAIR_CACHE_PATH,
+                                REPAIR_CACHE_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes)
+        self.replays = 0
+        self.rejected = 0
+        self.stores = 0
+
+    def key(self, source: str, window: dict, errors: list, model: str) -> str:
+        signature = sorted((e.get("bug_type") or "", e.get("description") or "") for e in errors)
+        h = hashlib.sha256()
+        h.update(f"{REPAIR_CACHE_VERSION}|{model}|{'window' if window else 'file'}|".encode())
+        h.update(json.dumps(signature).encode())
+        h.update(_normalize(_region_of(source, window)).encode())
+        return h.hexdigest()
+
+    def replay(self, source: str, window: dict, errors: list, model: str):
+        """The cached fix applied to source, or None on a miss or a replay that doesn't parse."""
+        key = self.key(source, window, errors, model)
+        region = self._cache.get(key)
+        if region is None:
+            return None
+        fixed = splice_window(source, window, region) if window else region
+        try:
+            ast.parse(fixed)
+        except SyntaxError as e:
+            self.rejected += 1
+            self._cache.delete(key)
+            logger.info(f"[REPAIRS] Dropped cached fix that no longer parses ({e.msg})")
+            return None
+        self.replays += 1
+        return fixed
+
+    def store(self, source: str, fixed: str, window: dict, errors: list, model: str):
+        """Remember a fix; skipped when it doesn't parse or reaches outside the window."""
+        try:
+            ast.parse(fixed)
+        except SyntaxError:
+            return
+        region = _fixed_region(source, fixed, window)
+        if region is None:
+            return
+        self._cache.put(self.key(source, window, errors, model), region)
+        self.stores += 1
+
+    def forget(self, source: str, window: dict, errors: list, model: str):
+        """Drop the entry for this region and errors (e.g. its fix failed validation)."""
+        self._cache.delete(self.key(source, window, errors, model))
+        self.replays = max(0, self.replays - 1)   # the replay it came from didn't count
+        self.rejected += 1
+
+    def stats(self) -> dict:
+        return {**self._cache.stats(), "replays": self.replays, "rejected": self.rejected, "stores": self.stores}
+
+
+def get_repair_cache() -> RepairCache:
+    """Process-wide repair cache, opened lazily on first use."""
+    global _repair_cache
+    with _repair_cache_lock:
+        if _repair_cache is None:
+            _repair_cache = RepairCache()
+    return _repair_cache
@@ -4,18 +4,49 @@
 # This report is passed directly to Member 1's fixer agent 
  
 import os 
-import ast 
 import re 
-import glob 
 import json 
 import shutil 
 import logging 
 import subprocess 
 import sys 
 import tempfile 
+import hashlib 
+import multiprocessing 
+from concurrent.futures import ProcessPoolExecutor, as_completed 
+ 
+from app.utils.disk_cache import DiskCache 
+from app.services.static_checks import CheckContext, parse_source, run_checks 
+from app.services.import_resolver import ImportResolver, ModuleIndex, module_name_for 
+from app.services.file_discovery import discover_files 
+from app.services.git_services import get_head_commit, get_changed_files 
  
 logger = logging.getLogger(__name__) 
  
+# ─── Scan settings ─────────────────────────────────────────────────────────── 
+# Number of worker processes for static analysis. SCAN_WORKERS=1 forces the 
+# serial in-process path (handy when debugging a single file). 
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", "0")) or (os.cpu_count() or 1) 
+ 
+# Below this many files the pool start-up costs more than it saves 
+PARALLEL_MIN_FILES = 8 
+ 
+FLAKE8_SELECT     = "F401,F811,F841"   # unused imports, redefined, unused vars 
+FLAKE8_BATCH_SIZE = 500                # files per flake8 process (argv length cap) 
+FLAKE8_TIMEOUT    = 300 
+ 
+# ─── Analysis result cache ─────────────────────────────────────────────────── 
+# Bump ANALYZER_VERSION whenever analyze_file's checks change so stale cached 
+# results are never replayed. 
+ANALYZER_VERSION     = "3" 
+ANALYSIS_CACHE_PATH  = os.getenv( 
+    "ANALYSIS_CACHE_PATH", 
+    os.path.join(tempfile.gettempdir(), "agent_cache", "analysis.sqlite3") 
+) 
+ANALYSIS_CACHE_MAX_MB = int(os.getenv("ANALYSIS_CACHE_MAX_MB", "256")) 
+ 
+_analysis_cache = None 
+ 
  
 # ─── Bug type classifier (same labels as hackathon spec) ──────────────────── 
 BUG_TYPE_PATTERNS = { 
@@ -46,182 +77,252 @@ def _extract_line_number(text: str) -> int:
  
 # ─── Find source files (not test files) ───────────────────────────────────── 
  
-def find_source_files(repo_path: str) -> list: 
-    """Find all Python source files, excluding test files and venv.""" 
-    all_py = glob.glob(os.path.join(repo_path, "**/*.py"), recursive=True) 
+def find_source_files(repo_path: str, index: ModuleIndex = None, discovered: dict = None) -> list: 
+    """ 
+    Find all Python source files, excluding test files and ignored dirs. 
  
-    skip = ["test_", "_test.py", "venv", ".venv", "__pycache__", "node_modules", ".git"] 
-    source_files = [f for f in all_py if not any(s in f for s in skip)] 
+    Backed by file_discovery's single scandir walk; pass `discovered` to reuse 
+    a walk that already happened. When `index` is given it is filled and built 
+    from that same walk (test files included — they can be import targets). 
+    """ 
+    if discovered is None: 
+        discovered = discover_files(repo_path, index) 
+    source_files = discovered["python_source"] 
  
     logger.info(f"[SCAN] Found {len(source_files)} source files") 
     return source_files 
  
  
 # ─── Static analysis per file ──────────────────────────────────────────────── 
+# Analysis is split in two: a file-local "record" that depends only on the 
+# file's bytes (parse result, AST checks, unresolved imports, lint) — which is 
+# what workers compute and the cache stores — and a finalize step that resolves 
+# the imports against the current tree with one per-scan ImportResolver. 
  
-def analyze_file(file_path: str, repo_path: str) -> list: 
+def _analyze_source_record(source: str, relative: str, file_path: str = "", repo_path: str = "") -> dict: 
     """ 
-    Run static analysis on a single file. 
-    Detects: SYNTAX, INDENTATION, IMPORT, TYPE_ERROR, LINTING errors. 
+    Parse once and run every rule registered in static_checks over one shared 
+    traversal of the tree. 
  
-    Returns list of error dicts. 
+    Returns: 
+        { "errors": [...], "imports": [...] }  — imports is None when the file 
+        doesn't parse (the SYNTAX/INDENTATION error is then the only error). 
     """ 
-    errors = [] 
+    tree, parse_error = parse_source(source, relative, file_path or relative) 
+    if parse_error: 
+        return {"errors": [parse_error], "imports": None} 
+ 
+    ctx = CheckContext(relative, file_path, repo_path) 
+    run_checks(tree, ctx) 
+    return {"errors": ctx.errors, "imports": ctx.imports} 
+ 
+ 
+def _analyze_file_record(file_path: str, repo_path: str, lint: list = None) -> dict: 
     relative = os.path.relpath(file_path, repo_path) 
  
     try: 
         with open(file_path, "r", encoding="utf-8", errors="ignore") as f: 
             source = f.read() 
     except Exception as e: 
-        return [{"file": relative, "bug_type": "UNKNOWN", "line": 0, 
-                 "description": str(e), "fix_hint": "Cannot read file"}] 
+        return {"errors": [{"file": relative, "bug_type": "UNKNOWN", "line": 0, 
+                            "description": str(e), "fix_hint": "Cannot read file"}], 
+                "imports": None} 
  
-    # ── SYNTAX check ──────────────────────────────────────────────────────── 
-    try: 
-        ast.parse(source) 
-    except SyntaxError as e: 
-        errors.append({ 
-            "file": relative, 
-            "bug_type": "SYNTAX", 
-            "line": e.lineno or 0, 
-            "description": f"SyntaxError: {e.msg}", 
-            "fix_hint": f"Fix syntax at line {e.lineno}: {(e.text or '').strip()}" 
-        }) 
-        return errors  # Can't do more analysis if syntax is broken 
+    record = _analyze_source_record(source, relative, file_path, repo_path) 
+    if record["imports"] is None: 
+        return record  # Can't do more analysis if syntax is broken 
+ 
+    # ── LINTING check (via flake8) ─────────────────────────────────────────── 
+    # scan_repo lints the whole file set in one flake8 run and passes each 
+    # file's share in via `lint`; standalone callers fall back to a 1-file batch 
+    if lint is None: 
+        lint = run_flake8_batch([file_path], repo_path).get(relative, []) 
+    record["lint"] = lint 
+    return record 
+ 
+ 
+def _finalize_record(record: dict, relative: str, resolver: ImportResolver) -> list: 
+    """Resolve a record's imports and merge its lint output into the final error list.""" 
+    errors = [{**e, "file": relative} for e in record["errors"]] 
+    if record["imports"] is None: 
+        return errors 
+    errors.extend(resolver.check_imports(record["imports"], relative)) 
+    _merge_lint_errors(errors, relative, record.get("lint") or []) 
+    return errors 
  
-    # ── INDENTATION check ──────────────────────────────────────────────────── 
+ 
+def collect_imports(file_path: str, repo_path: str) -> list: 
+    """ 
+    Import references of one file, e.g. for dependency graphs. Served from the 
+    analysis cache when this exact content was scanned before; otherwise the 
+    file is parsed (no checks resolved, no lint). Unparseable files → []. 
+    """ 
     try: 
-        compile(source, file_path, "exec") 
-    except IndentationError as e: 
+        record = json.loads(get_analysis_cache().get(_analysis_cache_key(file_path)) or "null") 
+    except Exception: 
+        record = None 
+    if record is None: 
+        try: 
+            with open(file_path, "r", encoding="utf-8", errors="ignore") as f: 
+                source = f.read() 
+        except OSError: 
+            return [] 
+        record = _analyze_source_record(source, os.path.relpath(file_path, repo_path), file_path, repo_path) 
+    return record["imports"] or [] 
+ 
+ 
+def analyze_source(source: str, relative: str, file_path: str = "", repo_path: str = "", 
+                   resolver: ImportResolver = None, lint: bool = False) -> list: 
+    """ 
+    AST-level checks on in-memory source. 
+    Detects: SYNTAX, INDENTATION, IMPORT, TYPE_ERROR errors, plus LINTING 
+    when `lint` is set (flake8 on the source via stdin). 
+    """ 
+    record = _analyze_source_record(source, relative, file_path, repo_path) 
+    if lint and record["imports"] is not None: 
+        record["lint"] = lint_source(source, relative) 
+    return _finalize_record(record, relative, resolver or ImportResolver(repo_path)) 
+ 
+ 
+def analyze_file(file_path: str, repo_path: str, lint: list = None, 
+                 resolver: ImportResolver = None) -> list: 
+    """ 
+    Run static analysis on a single file. 
+    Detects: SYNTAX, INDENTATION, IMPORT, TYPE_ERROR, LINTING errors. 
+ 
+    `lint` is this file's precomputed flake8 output from run_flake8_batch; 
+    when omitted, flake8 is run on just this file. Pass the scan's shared 
+    `resolver` so import lookups are memoized across files. 
+ 
+    Returns list of error dicts. 
+    """ 
+    record = _analyze_file_record(file_path, repo_path, lint) 
+    relative = os.path.relpath(file_path, repo_path) 
+    return _finalize_record(record, relative, resolver or ImportResolver(repo_path)) 
+ 
+ 
+# ─── Batched linting (one flake8 run for the whole file set) ──────────────── 
+ 
+def _merge_lint_errors(errors: list, relative: str, diagnostics: list): 
+    """Append flake8 diagnostics to errors, skipping lines the IMPORT check already flagged.""" 
+    import_lines = {e["line"] for e in errors if e["bug_type"] == "IMPORT"} 
+    for line_no, code, message in diagnostics: 
+        # Don't duplicate what IMPORT check already caught 
+        if line_no in import_lines: 
+            continue 
         errors.append({ 
             "file": relative, 
-            "bug_type": "INDENTATION", 
-            "line": e.lineno or 0, 
-            "description": f"IndentationError: {e.msg}", 
-            "fix_hint": f"Fix indentation at line {e.lineno}" 
+            "bug_type": "LINTING", 
+            "line": line_no, 
+            "description": f"{code}: {message}", 
+            "fix_hint": f"Remove or use the unused import at line {line_no}" 
         }) 
-        return errors 
  
-    # ── IMPORT check (via AST) ─────────────────────────────────────────────── 
-    try: 
-        tree = ast.parse(source) 
-        lines = source.splitlines() 
- 
-        for node in ast.walk(tree): 
-            if isinstance(node, ast.ImportFrom): 
-                module = node.module or "" 
-                names = [alias.name for alias in node.names] 
-                try: 
-                    mod = __import__(module, fromlist=names) 
-                    for name in names: 
-                        if not hasattr(mod, name): 
-                            errors.append({ 
-                                "file": relative, 
-                                "bug_type": "IMPORT", 
-                                "line": node.lineno, 
-                                "description": f"ImportError: cannot import '{name}' from '{module}'", 
-                                "fix_hint": f"'{name}' does not exist in '{module}'" 
-                            }) 
-                except ImportError as e: 
-                    errors.append({ 
-                        "file": relative, 
-                        "bug_type": "IMPORT", 
-                        "line": node.lineno, 
-                        "description": f"ImportError: {str(e)}", 
-                        "fix_hint": f"Install or remove the import at line {node.lineno}" 
-                    }) 
  
-            elif isinstance(node, ast.Import): 
-                for alias in node.names: 
-                    try: 
-                        __import__(alias.name) 
-                    except ImportError: 
-                        errors.append({ 
-                            "file": relative, 
-                            "bug_type": "IMPORT", 
-                            "line": node.lineno, 
-                            "description": f"ImportError: No module named '{alias.name}'", 
-                            "fix_hint": f"Install '{alias.name}' or remove the import" 
-                        }) 
- 
-        # ── TYPE_ERROR check (string + non-string concatenation) ───────────── 
-        for node in ast.walk(tree): 
-            if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add): 
-                left, right = node.left, node.right 
-                left_str  = isinstance(left,  ast.Constant) and isinstance(left.value,  str) 
-                right_str = isinstance(right, ast.Constant) and isinstance(right.value, str) 
- 
-                if left_str and isinstance(right, ast.Name) and not right_str: 
-                    errors.append({ 
-                        "file": relative, 
-                        "bug_type": "TYPE_ERROR", 
-                        "line": node.lineno, 
-                        "description": f"TypeError: string + non-string variable '{right.id}'", 
-                        "fix_hint": f"Wrap '{right.id}' with str() at line {node.lineno}" 
-                    }) 
-                elif right_str and isinstance(left, ast.Name) and not left_str: 
-                    errors.append({ 
-                        "file": relative, 
-                        "bug_type": "TYPE_ERROR", 
-                        "line": node.lineno, 
-                        "description": f"TypeError: non-string variable '{left.id}' + string", 
-                        "fix_hint": f"Wrap '{left.id}' with str() at line {node.lineno}" 
-                    }) 
+def run_flake8_batch(file_paths: list, repo_path: str, workers: int = None) -> dict: 
+    """ 
+    Lint many files with a single flake8 process instead of one per file. 
  
-    except Exception as e: 
-        logger.warning(f"[SCAN] AST analysis failed for {relative}: {e}") 
+    flake8 parallelises across files itself (--jobs), so interpreter start-up 
+    and plugin loading are paid once per batch rather than once per file. 
+    Files are chunked only to keep argv under the OS limit. 
  
-    # ── LINTING check (via flake8) ─────────────────────────────────────────── 
+    Returns: 
+        { "src/utils.py": [(line, "F401", "'os' imported but unused"), ...] } 
+    """ 
+    diagnostics = {} 
+    if not file_paths: 
+        return diagnostics 
+ 
+    jobs = str(workers or SCAN_WORKERS) 
+    for i in range(0, len(file_paths), FLAKE8_BATCH_SIZE): 
+        chunk = file_paths[i:i + FLAKE8_BATCH_SIZE] 
+        try: 
+            flake = subprocess.run( 
+                [ 
+                    sys.executable, "-m", "flake8", 
+                    f"--select={FLAKE8_SELECT}", 
+                    f"--jobs={jobs}", 
+                    "--format=%(path)s::%(row)d::%(code)s::%(text)s", 
+                    *chunk 
+                ], 
+                capture_output=True, text=True, timeout=FLAKE8_TIMEOUT 
+            ) 
+        except Exception as e: 
+            logger.warning(f"[SCAN] flake8 batch failed ({len(chunk)} files): {e}") 
+            continue 
+ 
+        for line in flake.stdout.splitlines(): 
+            parts = line.strip().split("::", 3) 
+            if len(parts) != 4: 
+                continue 
+            path, row, code, message = parts 
+            try: 
+                line_no = int(row) 
+            except ValueError: 
+                continue 
+            rel = os.path.relpath(os.path.abspath(path), repo_path) 
+            diagnostics.setdefault(rel, []).append((line_no, code.strip(), message.strip())) 
+ 
+    logger.info(f"[SCAN] flake8: {sum(len(d) for d in diagnostics.values())} diagnostics " 
+                f"across {len(diagnostics)} files") 
+    return diagnostics 
+ 
+ 
+def lint_source(source: str, relative: str) -> list: 
+    """ 
+    flake8 on in-memory source (fed through stdin), e.g. a proposed fix that 
+    isn't on disk yet. 
+ 
+    Returns: 
+        [(line, "F401", "'os' imported but unused"), ...] 
+    """ 
     try: 
         flake = subprocess.run( 
             [ 
                 sys.executable, "-m", "flake8", 
-                "--select=F401,F811,F841",   # unused imports, redefined, unused vars 
+                f"--select={FLAKE8_SELECT}", 
+                f"--stdin-display-name={relative}", 
                 "--format=%(row)d::%(code)s::%(text)s", 
-                file_path 
+                "-" 
             ], 
-            capture_output=True, text=True, timeout=30 
+            input=source, capture_output=True, text=True, timeout=FLAKE8_TIMEOUT 
         ) 
- 
-        for line in flake.stdout.splitlines(): 
-            parts = line.strip().split("::") 
-            if len(parts) == 3: 
-                try: 
-                    line_no  = int(parts[0]) 
-                    code     = parts[1].strip() 
-                    message  = parts[2].strip() 
- 
-                    # Don't duplicate what IMPORT check already caught 
-                    already = any(e["line"] == line_no and e["bug_type"] == "IMPORT" for e in errors) 
-                    if not already: 
-                        errors.append({ 
-                            "file": relative, 
-                            "bug_type": "LINTING", 
-                            "line": line_no, 
-                            "description": f"{code}: {message}", 
-                            "fix_hint": f"Remove or use the unused import at line {line_no}" 
-                        }) 
-                except ValueError: 
-                    pass 
     except Exception as e: 
-        logger.warning(f"[SCAN] flake8 failed for {relative}: {e}") 
+        logger.warning(f"[SCAN] flake8 on {relative} failed: {e}") 
+        return [] 
  
-    return errors 
+    diagnostics = [] 
+    for line in flake.stdout.splitlines(): 
+        parts = line.strip().split("::", 2) 
+        if len(parts) != 3: 
+            continue 
+        row, code, message = parts 
+        try: 
+            diagnostics.append((int(row), code.strip(), message.strip())) 
+        except ValueError: 
+            continue 
+    return diagnostics 
  
  
 # ─── Pytest for LOGIC errors ───────────────────────────────────────────────── 
  
-def detect_logic_errors(repo_path: str) -> list: 
+def detect_logic_errors(repo_path: str, discovered: dict = None, test_files: list = None) -> list: 
     """ 
     Run pytest to detect LOGIC errors (wrong return values, wrong conditions etc). 
     These can only be caught by running actual tests. 
+ 
+    `discovered` is the scan's discover_files result, reused to avoid re-walking the tree. 
+    `test_files` restricts the run to just those test files (used by the verifier 
+    to re-run only the tests affected by a fix). 
     """ 
     errors = [] 
  
-    test_files = ( 
-        glob.glob(os.path.join(repo_path, "**/test_*.py"), recursive=True) + 
-        glob.glob(os.path.join(repo_path, "**/*_test.py"), recursive=True) 
-    ) 
+    selected = test_files is not None 
+    if not selected: 
+        if discovered is None: 
+            discovered = discover_files(repo_path) 
+        test_files = discovered["python_test"] 
  
     if not test_files: 
         logger.info("[SCAN] No test files — skipping LOGIC detection") 
@@ -229,110 +330,339 @@ def detect_logic_errors(repo_path: str) -> list:
  
     logger.info(f"[SCAN] Running pytest for LOGIC errors ({len(test_files)} test files)") 
  
-    report_file = os.path.join(tempfile.gettempdir(), "scan_pytest_report.json") 
+    # Unique per run: verifications of concurrent fixes must not share a report. 
+    # mkstemp creates it (closed here; pytest overwrites it), and it is removed 
+    # however the run ends 
+    fd, report_file = tempfile.mkstemp(prefix="scan_pytest_", suffix=".json") 
+    os.close(fd) 
+    targets = [os.path.relpath(f, repo_path) for f in test_files] if selected else [] 
  
     try: 
-        subprocess.run( 
-            [ 
-                sys.executable, "-m", "pytest", 
-                "--tb=short", "-q", 
-                "--json-report", 
-                f"--json-report-file={report_file}" 
-            ], 
-            cwd=repo_path, 
-            capture_output=True, 
-            text=True, 
-            timeout=120 
-        ) 
-    except subprocess.TimeoutExpired: 
-        logger.error("[SCAN] pytest timed out") 
-        return [] 
-    except FileNotFoundError: 
-        logger.warning("[SCAN] pytest not found") 
-        return [] 
- 
-    if not os.path.exists(report_file): 
-        logger.warning("[SCAN] pytest JSON report not generated") 
-        return [] 
+        try: 
+            subprocess.run( 
+                [ 
+                    sys.executable, "-m", "pytest", 
+                    "--tb=short", "-q", 
+                    "--json-report", 
+                    f"--json-report-file={report_file}", 
+                    *targets 
+                ], 
+                cwd=repo_path, 
+                capture_output=True, 
+                text=True, 
+                timeout=120 
+            ) 
+        except subprocess.TimeoutExpired: 
+            logger.error("[SCAN] pytest timed out") 
+            return [] 
+        except FileNotFoundError: 
+            logger.warning("[SCAN] pytest not found") 
+            return [] 
+ 
+        if not os.path.getsize(report_file): 
+            logger.warning("[SCAN] pytest JSON report not generated") 
+            return [] 
+ 
+        try: 
+            with open(report_file) as f: 
+                report = json.load(f) 
+ 
+            for test in report.get("tests", []): 
+                if test["outcome"] in ("failed", "error"): 
+                    node    = test.get("nodeid", "") 
+                    file_p  = node.split("::")[0] 
+                    call    = test.get("call") or test.get("setup") or {} 
+                    err_txt = call.get("longrepr", "") if isinstance(call, dict) else "" 
+                    line_no = 0 
+                    if isinstance(call, dict): 
+                        line_no = call.get("crash", {}).get("lineno", 0) 
+                    if not line_no: 
+                        line_no = _extract_line_number(err_txt) 
  
-    try: 
-        with open(report_file) as f: 
-            report = json.load(f) 
- 
-        for test in report.get("tests", []): 
-            if test["outcome"] in ("failed", "error"): 
-                node    = test.get("nodeid", "") 
-                file_p  = node.split("::")[0] 
-                call    = test.get("call") or test.get("setup") or {} 
-                err_txt = call.get("longrepr", "") if isinstance(call, dict) else "" 
-                line_no = 0 
-                if isinstance(call, dict): 
-                    line_no = call.get("crash", {}).get("lineno", 0) 
-                if not line_no: 
-                    line_no = _extract_line_number(err_txt) 
- 
-                errors.append({ 
-                    "file": file_p, 
-                    "bug_type": "LOGIC", 
-                    "line": line_no, 
-                    "description": f"Test failed: {err_txt[:200].strip()}", 
-                    "fix_hint": f"Fix logic error in {file_p} at line {line_no}" 
-                }) 
+                    errors.append({ 
+                        "file": file_p, 
+                        "bug_type": "LOGIC", 
+                        "line": line_no, 
+                        "description": f"Test failed: {err_txt[:200].strip()}", 
+                        "fix_hint": f"Fix logic error in {file_p} at line {line_no}" 
+                    }) 
  
-    except Exception as e: 
-        logger.error(f"[SCAN] Failed to parse pytest report: {e}") 
+        except Exception as e: 
+            logger.error(f"[SCAN] Failed to parse pytest report: {e}") 
     finally: 
-        if os.path.exists(report_file): 
+        try: 
             os.remove(report_file) 
+        except OSError: 
+            pass 
  
     return errors 
  
  
+# ─── Parallel fan-out ──────────────────────────────────────────────────────── 
+ 
+def _analyze_file_safe(file_path: str, repo_path: str, lint: list = None) -> dict: 
+    """Worker entry point: never lets one bad file take down the whole pool.""" 
+    try: 
+        return _analyze_file_record(file_path, repo_path, lint) 
+    except Exception as e: 
+        relative = os.path.relpath(file_path, repo_path) 
+        logger.warning(f"[SCAN] analysis crashed for {relative}: {e}") 
+        return {"errors": [{"file": relative, "bug_type": "UNKNOWN", "line": 0, 
+                            "description": str(e), "fix_hint": "Analyzer crashed on this file"}], 
+                "imports": None} 
+ 
+ 
+def _iter_file_records(source_files: list, repo_path: str, workers: int = None, lint: dict = None): 
+    """Yield (relative_path, record) per file, in completion order.""" 
+    workers = workers or SCAN_WORKERS 
+    if lint is None: 
+        lint = run_flake8_batch(source_files, repo_path, workers) 
+    workers = min(workers, len(source_files)) 
+ 
+    if workers <= 1 or len(source_files) < PARALLEL_MIN_FILES: 
+        for file_path in source_files: 
+            rel = os.path.relpath(file_path, repo_path) 
+            yield rel, _analyze_file_safe(file_path, repo_path, lint.get(rel, [])) 
+        return 
+ 
+    logger.info(f"[SCAN] Analyzing {len(source_files)} files on {workers} worker processes") 
+ 
+    # spawn, not fork: the API process runs threads (uvicorn, GitPython) and 
+    # forking those can deadlock on locks held at fork time 
+    ctx = multiprocessing.get_context("spawn") 
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool: 
+        futures = { 
+            pool.submit(_analyze_file_safe, file_path, repo_path, 
+                        lint.get(os.path.relpath(file_path, repo_path), [])): file_path 
+            for file_path in source_files 
+        } 
+        for future in as_completed(futures): 
+            yield os.path.relpath(futures[future], repo_path), future.result() 
+ 
+ 
+def get_analysis_cache() -> DiskCache: 
+    """Process-wide analysis cache, opened lazily on first use.""" 
+    global _analysis_cache 
+    if _analysis_cache is None: 
+        _analysis_cache = DiskCache(ANALYSIS_CACHE_PATH, ANALYSIS_CACHE_MAX_MB * 1024 * 1024) 
+    return _analysis_cache 
+ 
+ 
+def _analysis_cache_key(file_path: str) -> str: 
+    """ 
+    Key = content hash + everything else that changes a file's record: 
+    analyzer version, flake8 rule selection and the interpreter (its grammar 
+    decides what parses). Paths are deliberately left out, so a file moved or 
+    copied between repos still hits. Imports are stored unresolved and checked 
+    against the current tree on every scan, so a hit can't go stale when some 
+    *other* file changes. 
+    """ 
+    h = hashlib.sha256() 
+    h.update(f"{ANALYZER_VERSION}|{FLAKE8_SELECT}|{sys.version_info[:2]}|".encode()) 
+    with open(file_path, "rb") as f: 
+        for block in iter(lambda: f.read(1 << 16), b""): 
+            h.update(block) 
+    return h.hexdigest() 
+ 
+ 
+def _lookup_cached(source_files: list, repo_path: str, cache: DiskCache): 
+    """ 
+    Split source_files into cache hits and files that still need analysis. 
+ 
+    Returns: 
+        (cached_records, pending_files, keys)  where cached_records and keys 
+        are keyed by relative path 
+    """ 
+    cached_records, pending, keys = {}, [], {} 
+    for file_path in source_files: 
+        rel = os.path.relpath(file_path, repo_path) 
+        try: 
+            keys[rel] = _analysis_cache_key(file_path) 
+        except OSError: 
+            pending.append(file_path) 
+            continue 
+ 
+        hit = cache.get(keys[rel]) 
+        if hit is None: 
+            pending.append(file_path) 
+            continue 
+        # Cached records are path-free; _finalize_record re-attaches the path 
+        cached_records[rel] = json.loads(hit) 
+ 
+    return cached_records, pending, keys 
+ 
+ 
+def _store_cached(cache: DiskCache, key: str, record: dict): 
+    # UNKNOWN means the analyzer itself failed — don't pin that result 
+    if key and not any(e["bug_type"] == "UNKNOWN" for e in record["errors"]): 
+        stripped = [{k: v for k, v in e.items() if k != "file"} for e in record["errors"]] 
+        cache.put(key, json.dumps({**record, "errors": stripped})) 
+ 
+ 
+def iter_analyzed_files(source_files: list, repo_path: str, resolver: ImportResolver, 
+                        workers: int = None, use_cache: bool = True, cache_stats: dict = None, 
+                        module_refs: dict = None): 
+    """ 
+    Cache-aware analysis of a file set: cached records are replayed first, 
+    the misses are linted in one batch and analyzed on the worker pool, and 
+    fresh records are written back to the cache. 
+ 
+    `cache_stats`, if given, has its "hits"/"misses" counters incremented. 
+    `module_refs`, if given, maps each file to the sorted module names its 
+    imports can bind to (ImportResolver.referenced_modules). 
+ 
+    Yields: 
+        (relative_path, [error dicts]) per file 
+    """ 
+    records, pending, keys = {}, source_files, {} 
+    cache = get_analysis_cache() if use_cache else None 
+    if cache: 
+        records, pending, keys = _lookup_cached(source_files, repo_path, cache) 
+        cache.flush()   # the hits' access times, in one write 
+        if cache_stats is not None: 
+            cache_stats["hits"] += len(source_files) - len(pending) 
+            cache_stats["misses"] += len(pending) 
+        logger.info(f"[SCAN] Cache: {len(source_files) - len(pending)} hit(s), {len(pending)} miss(es)") 
+ 
+    def finalize(rel, record): 
+        if module_refs is not None: 
+            module_refs[rel] = sorted(resolver.referenced_modules(record["imports"] or [], rel)) 
+        return _finalize_record(record, rel, resolver) 
+ 
+    for rel, record in records.items(): 
+        yield rel, finalize(rel, record) 
+ 
+    for rel, record in _iter_file_records(pending, repo_path, workers): 
+        if cache: 
+            _store_cached(cache, keys.get(rel), record) 
+        yield rel, finalize(rel, record) 
+ 
+ 
+def sort_errors(errors: list) -> list: 
+    """Deterministic ordering so two scans of the same tree diff cleanly.""" 
+    return sorted(errors, key=lambda e: ( 
+        e.get("file") or "", e.get("line") or 0, e.get("bug_type") or "", e.get("description") or "" 
+    )) 
+ 
+ 
 # ─── Main scan function ─────────────────────────────────────────────────────── 
  
-def scan_repo(repo_path: str, repo_url: str = "") -> dict: 
+def _incremental_scope(repo_path: str, source_files: list, base_commit: str, previous_report: dict): 
     """ 
-    Main entry point. 
-    Scans a cloned repo and returns a structured error report. 
+    Work out what an incremental scan has to analyze. 
  
-    This report is passed directly to the fixer agent (Member 1). 
+    Files changed since base_commit are analyzed. So is any untouched file 
+    that imports a module whose file changed, was added or was deleted: its 
+    imports can break or heal without an edit. Those importers are found from 
+    the module names the previous report stored per file under "imports". 
+    Every other untouched file keeps its previous static errors as they were; 
+    LOGIC errors always come from the fresh pytest run. 
  
     Returns: 
-        { 
-            "repository": str, 
-            "total_errors": int, 
-            "summary": { "SYNTAX": n, "LOGIC": n, ... }, 
-            "errors": [ 
-                { 
-                    "file": "src/utils.py", 
-                    "bug_type": "LINTING", 
-                    "line": 1, 
-                    "description": "F401: 'os' imported but unused", 
-                    "fix_hint": "Remove or use the unused import at line 1" 
-                }, 
-                ... 
-            ] 
-        } 
+        (files_to_analyze, carried_errors, carried_imports, changed_paths) — or 
+        None when the scan has to fall back to a full one (no prior report or 
+        import data, unknown base...). 
+    """ 
+    previous_imports = (previous_report or {}).get("imports") 
+    if not base_commit or previous_imports is None: 
+        return None 
+    try: 
+        changed = set(get_changed_files(repo_path, base_commit)) 
+    except Exception as e: 
+        logger.warning(f"[SCAN] git diff against {base_commit[:7]} failed, doing a full scan: {e}") 
+        return None 
+ 
+    # Every name a changed file can be imported under: "src/pkg/mod.py" is 
+    # src.pkg.mod from the repo root, pkg.mod or mod from its package roots 
+    changed_modules = set() 
+    for path in changed: 
+        if path.endswith(".py"): 
+            parts = module_name_for(path).split(".") 
+            changed_modules.update(".".join(parts[i:]) for i in range(len(parts)) if parts[i]) 
+ 
+    analyze, kept = [], set() 
+    for f in source_files: 
+        rel = os.path.relpath(f, repo_path) 
+        if rel not in changed and rel in previous_imports and changed_modules.isdisjoint(previous_imports[rel]): 
+            kept.add(rel) 
+        else: 
+            analyze.append(f) 
+ 
+    carried_errors = [e for e in previous_report.get("errors") or [] 
+                      if e.get("file") in kept and e["bug_type"] != "LOGIC"] 
+    return analyze, carried_errors, {rel: previous_imports[rel] for rel in kept}, changed 
+ 
+ 
+def iter_scan(repo_path: str, repo_url: str = "", workers: int = None, use_cache: bool = True, 
+              base_commit: str = None, previous_report: dict = None): 
+    """ 
+    scan_repo as a stream of events, produced as the work happens. 
+ 
+    Yields (event, data) tuples: 
+        ("discovery", {"source_files": n, "test_files": n, "incremental": {...} | None}) 
+        ("file",      {"file": rel, "errors": [...]})   # only files with errors 
+        ("logic",     {"errors": [...]})                # pytest results 
+        ("report",    report)                           # last; same dict scan_repo returns 
+ 
     """ 
     logger.info(f"[SCAN] Starting scan of {repo_path}") 
  
-    # 1. Find source files 
-    source_files = find_source_files(repo_path) 
+    # 1. Find source files — one walk classifies sources and tests and 
+    #    indexes the repo's own modules 
+    index = ModuleIndex(repo_path) 
+    discovered = discover_files(repo_path, index) 
+    source_files = find_source_files(repo_path, discovered=discovered) 
+    head_commit = get_head_commit(repo_path) 
+ 
+    # Incremental mode: only changed files and the importers of changed 
+    # modules are analyzed; everything else keeps its previous errors 
+    all_errors, incremental, module_refs = [], None, {} 
+    discovered_count = len(source_files) 
+    scope = _incremental_scope(repo_path, source_files, base_commit, previous_report) 
+    if scope: 
+        source_files, carried, module_refs, changed = scope 
+        all_errors.extend(carried) 
+        incremental = { 
+            "base_commit": base_commit, 
+            "changed_files": len(changed), 
+            "analyzed_files": len(source_files), 
+            "carried_files": len(module_refs) 
+        } 
+        logger.info(f"[SCAN] Incremental: {len(source_files)} file(s) to analyze since " 
+                    f"{base_commit[:7]}, {len(module_refs)} carried over") 
  
-    # 2. Static analysis on each file 
-    all_errors = [] 
-    for file_path in source_files: 
-        file_errors = analyze_file(file_path, repo_path) 
+    yield "discovery", { 
+        "source_files": discovered_count, 
+        "test_files": len(discovered["python_test"]), 
+        "incremental": incremental 
+    } 
+ 
+    # Carried-over errors go out first, one event per file like fresh ones 
+    carried_by_file = {} 
+    for e in all_errors: 
+        carried_by_file.setdefault(e["file"], []).append(e) 
+    for rel, file_errors in sorted(carried_by_file.items()): 
+        yield "file", {"file": rel, "errors": sort_errors(file_errors)} 
+ 
+    # 2-3. Replay cached results for unchanged files, analyze the rest on the 
+    #      worker pool. One resolver per scan: import lookups are memoized 
+    #      across all files 
+    resolver = ImportResolver(repo_path, index) 
+    cache_stats = {"hits": 0, "misses": 0} 
+    for rel, file_errors in iter_analyzed_files(source_files, repo_path, resolver, workers, 
+                                                use_cache, cache_stats, module_refs): 
         if file_errors: 
-            rel = os.path.relpath(file_path, repo_path) 
             logger.info(f"[SCAN] {rel}: {len(file_errors)} error(s)") 
+            yield "file", {"file": rel, "errors": sort_errors(file_errors)} 
         all_errors.extend(file_errors) 
  
-    # 3. Pytest for LOGIC errors 
-    logic_errors = detect_logic_errors(repo_path) 
+    # 4. Pytest for LOGIC errors 
+    logic_errors = detect_logic_errors(repo_path, discovered) 
+    yield "logic", {"errors": sort_errors(logic_errors)} 
     all_errors.extend(logic_errors) 
+    all_errors = sort_errors(all_errors) 
  
-    # 4. Build summary 
+    # 5. Build summary 
     summary = { 
         "SYNTAX":      len([e for e in all_errors if e["bug_type"] == "SYNTAX"]), 
         "INDENTATION": len([e for e in all_errors if e["bug_type"] == "INDENTATION"]), 
@@ -346,10 +676,66 @@ def scan_repo(repo_path: str, repo_url: str = "") -> dict:
         "repository": repo_url or repo_path, 
         "total_errors": len(all_errors), 
         "summary": summary, 
+        "commit": head_commit, 
+        "cache": cache_stats, 
+        "incremental": incremental, 
+        "imports": module_refs, 
         "errors": all_errors   # ← Pass this to Member 1's fixer agent 
     } 
  
     logger.info(f"[SCAN] Complete — {len(all_errors)} total errors found") 
     logger.info(f"[SCAN] Summary: {summary}") 
  
-    return report 
\ No newline at end of file
+    yield "report", report 
+ 
+ 
+def scan_repo(repo_path: str, repo_url: str = "", workers: int = None, use_cache: bool = True, 
+              base_commit: str = None, previous_report: dict = None) -> dict: 
+    """ 
+    Main entry point. 
+    Scans a cloned repo and returns a structured error report. 
+    (iter_scan streams the same scan as it runs.) 
+ 
+    Static analysis runs on a process pool of `workers` (default SCAN_WORKERS); 
+    the final errors list is sorted by file/line so reports diff cleanly. 
+    Files whose content was analyzed before are served from the on-disk 
+    analysis cache; per-scan hit/miss counts are reported under "cache". 
+ 
+    Incremental mode: given `base_commit` and the `previous_report` produced 
+    at that commit, only files changed since base_commit (per git diff) and 
+    untouched files importing a changed, added or deleted module are analyzed, 
+    so importers of a changed module gain or lose IMPORT errors. Every other 
+    file keeps its errors from previous_report. Importers are found through 
+    the report's "imports" (file → module names its imports can bind to); a 
+    previous report without it means a full scan. The report's "commit" is the 
+    HEAD it was taken at, i.e. the base_commit for the next incremental scan. 
+ 
+    This report is passed directly to the fixer agent (Member 1). 
+ 
+    Returns: 
+        { 
+            "repository": str, 
+            "total_errors": int, 
+            "summary": { "SYNTAX": n, "LOGIC": n, ... }, 
+            "commit": str | None, 
+            "cache": { "hits": n, "misses": n }, 
+            "incremental": { "base_commit": str, "changed_files": n, 
+                             "analyzed_files": n, "carried_files": n } | None, 
+            "imports": { "src/utils.py": ["os", "src.models", ...], ... }, 
+            "errors": [ 
+                { 
+                    "file": "src/utils.py", 
+                    "bug_type": "LINTING", 
+                    "line": 1, 
+                    "description": "F401: 'os' imported but unused", 
+                    "fix_hint": "Remove or use the unused import at line 1" 
+                }, 
+                ... 
+            ] 
+        } 
+    """ 
+    report = None 
+    for event, data in iter_scan(repo_path, repo_url, workers, use_cache, base_commit, previous_report): 
+        if event == "report": 
+            report = data 
+    return report 
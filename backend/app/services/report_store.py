@@ -0,0 +1,135 @@
+# app/services/report_store.py
+# Where scan reports wait between /scan-repo and /fix-all.
+# Reports are stored compactly (compact JSON, zlib, base64) with a TTL and a
+# byte budget; the least recently used are evicted first. The default "disk"
+# backend is a SQLite file shared by every uvicorn worker and queue worker on
+# the node, so scan and fix can land on different processes; "memory" keeps
+# the old single-process behaviour, bounded.
+
+import os
+import json
+import time
+import zlib
+import base64
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+
+from app.utils.disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+REPORT_STORE = os.getenv("REPORT_STORE", "disk")   # disk | memory
+REPORT_STORE_PATH = os.getenv(
+    "REPORT_STORE_PATH",
+    os.path.join(tempfile.gettempdir(), "agent_cache", "reports.sqlite3")
+)
+REPORT_STORE_MAX_MB = int(os.getenv("REPORT_STORE_MAX_MB", "64"))
+REPORT_TTL_SECONDS = float(os.getenv("REPORT_TTL_SECONDS", str(6 * 3600)))
+
+_report_store = None
+_report_store_lock = threading.Lock()
+
+
+def encode_report(value) -> str:
+    raw = json.dumps(value, separators=(",", ":")).encode("utf-8")
+    return base64.b64encode(zlib.compress(raw, 6)).decode("ascii")
+
+
+def decode_report(blob: str):
+    return json.loads(zlib.decompress(base64.b64decode(blob)))
+
+
+class MemoryReportStore:
+    """Per-process LRU of encoded reports, bounded by max_bytes, entries expire after ttl."""
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key → (expires_at, blob)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            blob = entry[1]
+        return decode_report(blob)
+
+    def put(self, key: str, value):
+        blob = encode_report(value)
+        if len(blob) > self.max_bytes:
+            logger.warning(f"[REPORTS] Report for {key} ({len(blob)} bytes) exceeds the store budget")
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.time() + self.ttl, blob)
+            self._bytes += len(blob)
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+    def _drop(self, key: str):
+        _, blob = self._entries.pop(key)
+        self._bytes -= len(blob)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"backend": "memory", "entries": len(self._entries), "bytes": self._bytes,
+                    "max_bytes": self.max_bytes}
+
+
+class DiskReportStore:
+    """
+    Reports in a DiskCache (SQLite, LRU by bytes), shared by all processes
+    on the node. The expiry time is stored in front of each value.
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl: float):
+        self.ttl = ttl
+        self._cache = DiskCache(path, max_bytes)
+
+    def get(self, key: str):
+        stored = self._cache.get(key)
+        if stored is None:
+            return None
+        expires_at, blob = stored.split(":", 1)
+        if float(expires_at) < time.time():
+            self._cache.delete(key)
+            return None
+        return decode_report(blob)
+
+    def put(self, key: str, value):
+        self._cache.put(key, f"{time.time() + self.ttl:.0f}:{encode_report(value)}")
+
+    def delete(self, key: str):
+        self._cache.delete(key)
+
+    def stats(self) -> dict:
+        return {"backend": "disk", **self._cache.stats()}
+
+
+def get_report_store():
+    """Process-wide report store (REPORT_STORE backend), opened lazily on first use."""
+    global _report_store
+    with _report_store_lock:
+        if _report_store is None:
+            max_bytes = REPORT_STORE_MAX_MB * 1024 * 1024
+            if REPORT_STORE == "memory":
+                _report_store = MemoryReportStore(max_bytes, REPORT_TTL_SECONDS)
+            else:
+                _report_store = DiskReportStore(REPORT_STORE_PATH, max_bytes, REPORT_TTL_SECONDS)
+            logger.info(f"[REPORTS] Using the {REPORT_STORE} report store")
+    return _report_store
@@ -0,0 +1,141 @@
+# app/services/static_checks.py
+# Rule registry behind repo_scanner.analyze_file.
+# Each source file is parsed exactly once and its tree walked exactly once;
+# every node is dispatched to the checks registered for its type, so adding
+# a rule adds a handler call, not another parse or another walk.
+
+import ast
+import logging
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+# node type → [handler(node, ctx), ...]
+_NODE_HANDLERS = defaultdict(list)
+
+
+def node_check(*node_types):
+    """
+    Register a check for one or more AST node types.
+
+        @node_check(ast.BinOp)
+        def check_something(node, ctx):
+            if ...:
+                ctx.report("TYPE_ERROR", node.lineno, "TypeError: ...", "Fix hint")
+    """
+    def register(handler):
+        for node_type in node_types:
+            _NODE_HANDLERS[node_type].append(handler)
+        return handler
+    return register
+
+
+class CheckContext:
+    """Per-file state shared by all checks during a single traversal."""
+
+    def __init__(self, relative: str, file_path: str = "", repo_path: str = ""):
+        self.relative = relative
+        self.file_path = file_path
+        self.repo_path = repo_path
+        self.errors = []
+        self.imports = []   # import references for import_resolver
+
+    def report(self, bug_type: str, line: int, description: str, fix_hint: str):
+        self.errors.append({
+            "file": self.relative,
+            "bug_type": bug_type,
+            "line": line,
+            "description": description,
+            "fix_hint": fix_hint
+        })
+
+
+# ─── Parse (once) ────────────────────────────────────────────────────────────
+
+def parse_source(source: str, relative: str, filename: str = "<unknown>"):
+    """
+    Parse source into an AST.
+
+    Returns:
+        (tree, None) on success, or (None, error dict) for SYNTAX/INDENTATION
+        failures. IndentationError is a SyntaxError subclass, so it must be
+        checked first to get its own label.
+    """
+    try:
+        return ast.parse(source, filename=filename), None
+    except IndentationError as e:
+        return None, {
+            "file": relative,
+            "bug_type": "INDENTATION",
+            "line": e.lineno or 0,
+            "description": f"IndentationError: {e.msg}",
+            "fix_hint": f"Fix indentation at line {e.lineno}"
+        }
+    except SyntaxError as e:
+        return None, {
+            "file": relative,
+            "bug_type": "SYNTAX",
+            "line": e.lineno or 0,
+            "description": f"SyntaxError: {e.msg}",
+            "fix_hint": f"Fix syntax at line {e.lineno}: {(e.text or '').strip()}"
+        }
+
+
+# ─── Walk (once) ─────────────────────────────────────────────────────────────
+
+def run_checks(tree: ast.AST, ctx: CheckContext) -> list:
+    """Single traversal of tree, dispatching each node to its registered checks."""
+    handlers = _NODE_HANDLERS
+    for node in ast.walk(tree):
+        for handler in handlers.get(type(node), ()):
+            try:
+                handler(node, ctx)
+            except Exception as e:
+                logger.warning(f"[SCAN] {handler.__name__} failed on {ctx.relative} "
+                               f"line {getattr(node, 'lineno', 0)}: {e}")
+    return ctx.errors
+
+
+# ─── IMPORT references ───────────────────────────────────────────────────────
+# Imports are only collected here; import_resolver.ImportResolver checks them
+# once per scan, so its lookups are shared across every file.
+
+@node_check(ast.Import)
+def collect_import(node: ast.Import, ctx: CheckContext):
+    for alias in node.names:
+        ctx.imports.append({"line": node.lineno, "module": alias.name, "names": None, "level": 0})
+
+
+@node_check(ast.ImportFrom)
+def collect_import_from(node: ast.ImportFrom, ctx: CheckContext):
+    ctx.imports.append({
+        "line": node.lineno,
+        "module": node.module or "",
+        "names": [alias.name for alias in node.names],
+        "level": node.level or 0
+    })
+
+
+# ─── TYPE_ERROR check (string + non-string concatenation) ───────────────────
+
+@node_check(ast.BinOp)
+def check_str_concat(node: ast.BinOp, ctx: CheckContext):
+    if not isinstance(node.op, ast.Add):
+        return
+
+    left, right = node.left, node.right
+    left_str  = isinstance(left,  ast.Constant) and isinstance(left.value,  str)
+    right_str = isinstance(right, ast.Constant) and isinstance(right.value, str)
+
+    if left_str and isinstance(right, ast.Name) and not right_str:
+        ctx.report(
+            "TYPE_ERROR", node.lineno,
+            f"TypeError: string + non-string variable '{right.id}'",
+            f"Wrap '{right.id}' with str() at line {node.lineno}"
+        )
+    elif right_str and isinstance(left, ast.Name) and not left_str:
+        ctx.report(
+            "TYPE_ERROR", node.lineno,
+            f"TypeError: non-string variable '{left.id}' + string",
+            f"Wrap '{left.id}' with str() at line {node.lineno}"
+        )
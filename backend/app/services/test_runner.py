@@ -311,12 +311,12 @@
  
 import os 
 import json 
-import glob 
 import subprocess 
 import logging 
 import tempfile 
 import re 
 from app.utils.docker_executor import run_tests_sandboxed
+from app.services.file_discovery import discover_files
  
 logger = logging.getLogger(__name__) 
  
@@ -382,34 +382,23 @@ def _extract_line_number(error_text: str) -> int:
     return 0  # Unknown line 
  
  
-def discover_test_files(repo_path: str) -> dict: 
+def discover_test_files(repo_path: str, discovered: dict = None) -> dict: 
     """ 
-    Auto-discover all test files in the repo using glob patterns. 
+    Auto-discover all test files in the repo. 
      
     DISQUALIFICATION RISK: Hardcoded test paths → DQ 
-    This function uses recursive glob — never hardcodes paths. 
+    Uses file_discovery's single scandir walk (ignored dirs pruned, .gitignore 
+    honoured) — never hardcodes paths. Pass `discovered` to reuse a walk the 
+    scanner already did. 
  
     Returns: 
         dict with "python" and "javascript" lists of absolute paths 
     """ 
-    # Python test file conventions 
-    py_tests = ( 
-        glob.glob(os.path.join(repo_path, "**/test_*.py"), recursive=True) + 
-        glob.glob(os.path.join(repo_path, "**/*_test.py"), recursive=True) + 
-        glob.glob(os.path.join(repo_path, "**/tests/*.py"), recursive=True) 
-    ) 
- 
-    # JavaScript/TypeScript test file conventions 
-    js_tests = ( 
-        glob.glob(os.path.join(repo_path, "**/*.test.js"), recursive=True) + 
-        glob.glob(os.path.join(repo_path, "**/*.spec.js"), recursive=True) + 
-        glob.glob(os.path.join(repo_path, "**/*.test.ts"), recursive=True) + 
-        glob.glob(os.path.join(repo_path, "**/*.spec.ts"), recursive=True) 
-    ) 
- 
-    # Deduplicate 
-    py_tests = list(set(py_tests)) 
-    js_tests = list(set(js_tests)) 
+    if discovered is None: 
+        discovered = discover_files(repo_path) 
+ 
+    py_tests = discovered["python_test"] 
+    js_tests = discovered["js_test"] + discovered["ts_test"] 
  
     logger.info(f"[DISCOVER] Found {len(py_tests)} Python test files, {len(js_tests)} JS test files") 
     for f in py_tests + js_tests: 
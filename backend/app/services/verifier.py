@@ -0,0 +1,146 @@
+# app/services/verifier.py
+# Per-fix verification engine.
+# Instead of a full scan_repo + full pytest run at the end of a healing run,
+# each fix is verified on its own: the file it touched and the files importing
+# that file are re-analyzed, and only the tests that (transitively) import the
+# touched module are re-run. The engine keeps the current error picture for the
+# whole repo, so the run's PASSED/FAILED verdict comes straight from it.
+
+import os
+import logging
+
+from app.services.file_discovery import discover_files
+from app.services.import_resolver import ImportResolver, ModuleIndex
+from app.services.repo_scanner import collect_imports, detect_logic_errors, iter_analyzed_files, sort_errors
+
+logger = logging.getLogger(__name__)
+
+
+class VerificationEngine:
+    """
+    Seeded with a scan report; call verify() after every fix.
+
+    Dependencies come from the same AST import data the scanner collects,
+    resolved against the repo-local module index, so the reverse-dependency
+    graph ("who imports this file?") costs one lookup per edge.
+    """
+
+    def __init__(self, repo_path: str, report: dict):
+        self.repo_path = os.path.abspath(repo_path)
+
+        self.errors = {}   # source file → static errors
+        self.logic = {}    # test file   → LOGIC errors
+        for e in report.get("errors", []):
+            bucket = self.logic if e["bug_type"] == "LOGIC" else self.errors
+            bucket.setdefault(os.path.normpath(e["file"]), []).append(e)
+
+        self.index = ModuleIndex(self.repo_path)
+        discovered = discover_files(self.repo_path, self.index)
+        self.resolver = ImportResolver(self.repo_path, self.index)
+        self.sources = {self._rel(f) for f in discovered["python_source"]}
+        self.tests = {self._rel(f) for f in discovered["python_test"]}
+
+        self.deps = {}        # file → files it imports
+        self.importers = {}   # file → files importing it
+        for rel in sorted(self.sources | self.tests):
+            self._set_deps(rel, self._deps_of(rel))
+
+        logger.info(f"[VERIFY] Dependency graph: {len(self.deps)} files, "
+                    f"{sum(len(d) for d in self.deps.values())} edges")
+
+    def _rel(self, path: str) -> str:
+        return os.path.relpath(path, self.repo_path)
+
+    def _abs(self, rel: str) -> str:
+        return os.path.join(self.repo_path, rel)
+
+    # ── Dependency graph ─────────────────────────────────────────────────────
+
+    def _deps_of(self, rel: str) -> set:
+        imports = collect_imports(self._abs(rel), self.repo_path)
+        deps = self.resolver.local_dependencies(imports, rel)
+        return {self._rel(p) for p in deps} - {rel}
+
+    def _set_deps(self, rel: str, deps: set):
+        for old in self.deps.get(rel, ()):
+            self.importers.get(old, set()).discard(rel)
+        self.deps[rel] = deps
+        for dep in deps:
+            self.importers.setdefault(dep, set()).add(rel)
+
+    def dependents(self, files: set, transitive: bool = False) -> set:
+        """Files importing any of `files` (directly, or through any chain if transitive)."""
+        found, frontier = set(), set(files)
+        while frontier:
+            nxt = set()
+            for rel in frontier:
+                for importer in self.importers.get(rel, ()):
+                    if importer not in found and importer not in files:
+                        found.add(importer)
+                        nxt.add(importer)
+            frontier = nxt if transitive else set()
+        return found
+
+    # ── Verification ─────────────────────────────────────────────────────────
+
+    def verify(self, changed_files: list) -> dict:
+        """
+        Re-check everything a change to `changed_files` can affect.
+
+        Returns:
+            {
+                "analyzed":     [files re-analyzed],
+                "tests_run":    [test files re-run],
+                "errors":       [current errors in those files],
+                "total_errors": int   # across the whole repo
+            }
+        """
+        changed = {os.path.normpath(f) for f in changed_files}
+
+        # The changed modules' exported names are stale in the old resolver's memo
+        self.resolver = ImportResolver(self.repo_path, self.index)
+        for rel in changed & set(self.deps):
+            self._set_deps(rel, self._deps_of(rel))
+
+        # Static checks: the changed files plus their direct importers (an
+        # import of a removed/renamed name shows up one hop away)
+        to_analyze = sorted((changed | self.dependents(changed)) & self.sources)
+        for rel, file_errors in iter_analyzed_files([self._abs(r) for r in to_analyze],
+                                                    self.repo_path, self.resolver):
+            self.errors[rel] = file_errors
+
+        # Tests: any test reaching a changed module through its import chain
+        tests = sorted((changed | self.dependents(changed, transitive=True)) & self.tests)
+        if tests:
+            for rel in tests:
+                self.logic[rel] = []
+            for e in detect_logic_errors(self.repo_path, test_files=[self._abs(t) for t in tests]):
+                self.logic.setdefault(os.path.normpath(e["file"]), []).append(e)
+
+        logger.info(f"[VERIFY] {sorted(changed)}: re-analyzed {len(to_analyze)} file(s), "
+                    f"re-ran {len(tests)} test file(s), {self.total_errors} error(s) remain")
+
+        touched = set(to_analyze) | set(tests)
+        return {
+            "analyzed": to_analyze,
+            "tests_run": tests,
+            "errors": sort_errors([e for e in self.remaining_errors() if e["file"] in touched]),
+            "total_errors": self.total_errors
+        }
+
+    def is_resolved(self, error: dict) -> bool:
+        """An error is fixed once nothing of the same type and description remains in its file."""
+        bucket = self.logic if error["bug_type"] == "LOGIC" else self.errors
+        return not any(
+            e["bug_type"] == error["bug_type"] and e["description"] == error.get("description")
+            for e in bucket.get(os.path.normpath(error["file"]), [])
+        )
+
+    def remaining_errors(self) -> list:
+        errors = [e for errs in self.errors.values() for e in errs]
+        errors += [e for errs in self.logic.values() for e in errs]
+        return sort_errors(errors)
+
+    @property
+    def total_errors(self) -> int:
+        return sum(len(e) for e in self.errors.values()) + sum(len(e) for e in self.logic.values())
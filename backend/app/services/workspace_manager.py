@@ -0,0 +1,309 @@
+# app/services/workspace_manager.py
+# Per-run workspace allocation for cloned repos.
+# Every scan gets its own directory (on tmpfs when the node has room for it),
+# reference-counted by the steps that use it — the scan report that points at
+# it, a healing task working in it — and deleted by a background thread once
+# the last user lets go, so no request ever pays for an rmtree.
+#
+# Holders are recorded as lease files under <root>/.leases/<workspace>/, so
+# a workspace handed from the API process to a queue worker stays alive until
+# every process (and every queued job) holding it has let go. The API and the
+# workers may run in different containers sharing the volume: process leases
+# carry the host name, and each process keeps touching its own leases so the
+# others can tell a live holder from a dead one.
+
+import os
+import time
+import uuid
+import queue
+import socket
+import shutil
+import logging
+import threading
+
+from app.services.git_services import CLONE_RUNS_DIR, release_checkout
+from app.services.job_queue import get_job_queue
+from app.services.report_store import REPORT_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+WORKSPACE_ROOT = os.getenv("WORKSPACE_ROOT", "")   # forced root; skips tmpfs detection
+WORKSPACE_TMPFS = os.getenv("WORKSPACE_TMPFS", "/dev/shm")
+WORKSPACE_TMPFS_MIN_FREE_MB = int(os.getenv("WORKSPACE_TMPFS_MIN_FREE_MB", "1024"))
+WORKSPACE_ORPHAN_HOURS = float(os.getenv("WORKSPACE_ORPHAN_HOURS", "24"))
+WORKSPACE_HEARTBEAT_SECONDS = float(os.getenv("WORKSPACE_HEARTBEAT_SECONDS", "600"))
+
+_workspace_manager = None
+_workspace_manager_lock = threading.Lock()
+
+
+def _pick_root() -> str:
+    """WORKSPACE_ROOT if set, else tmpfs when mounted, writable and roomy enough, else CLONE_RUNS_DIR."""
+    if WORKSPACE_ROOT:
+        return WORKSPACE_ROOT
+    if os.path.isdir(WORKSPACE_TMPFS) and os.access(WORKSPACE_TMPFS, os.W_OK):
+        free_mb = shutil.disk_usage(WORKSPACE_TMPFS).free // (1024 * 1024)
+        if free_mb >= WORKSPACE_TMPFS_MIN_FREE_MB:
+            return os.path.join(WORKSPACE_TMPFS, "agent_repos", "runs")
+        logger.info(f"[WORKSPACE] tmpfs at {WORKSPACE_TMPFS} has only {free_mb} MB free, using disk")
+    return CLONE_RUNS_DIR
+
+
+class WorkspaceManager:
+    """
+    Hands out unique per-run directories and deletes them once unused.
+
+        path = manager.allocate(repo_url)    # refcount 1, directory not created yet
+        clone_repo(repo_url, local_path=path)
+        manager.acquire(path)                # another user (e.g. a healing task)
+        manager.release(path)                # ... each user releases once
+        manager.release(path)                # → 0: queued for background deletion
+
+    In-process refcounts share one lease per process ("proc-<host>-<pid>");
+    other holders — a queued job, a worker process — take named leases with
+    lease()/unlease(). The directory is collected once no lease is left.
+    Every WORKSPACE_HEARTBEAT_SECONDS the manager refreshes its own leases
+    and drops "report-<team>" leases whose report has expired.
+    Directories left behind by a crashed process are swept once they are
+    older than WORKSPACE_ORPHAN_HOURS and none of their leases is live; the
+    sweep is run by the parent process (API startup, worker supervisor), not
+    on every construction.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = root or _pick_root()
+        self.leases_dir = os.path.join(self.root, ".leases")
+        self._host = socket.gethostname()
+        self._owner = f"proc-{self._host}-{os.getpid()}"
+        os.makedirs(self.leases_dir, exist_ok=True)
+        self._refs = {}   # path → refcount
+        self._lock = threading.Lock()
+        self._gc_queue = queue.Queue()
+        self._gc_thread = threading.Thread(target=self._gc_loop, name="workspace-gc", daemon=True)
+        self._gc_thread.start()
+        logger.info(f"[WORKSPACE] Allocating run directories under {self.root}")
+
+    # ── Reference counting ──────────────────────────────────────────────────
+
+    def allocate(self, repo_url: str) -> str:
+        """A fresh, unique path for one run, held once by the caller."""
+        name = repo_url.rstrip("/").split("/")[-1].replace(".git", "") or "repo"
+        path = os.path.join(self.root, f"{name}-{uuid.uuid4().hex[:12]}")
+        with self._lock:
+            self._refs[path] = 1
+        self.lease(path, self._owner)
+        return path
+
+    def acquire(self, path: str) -> str:
+        with self._lock:
+            if path not in self._refs:
+                raise KeyError(f"Workspace {path} is not live")
+            self._refs[path] += 1
+        return path
+
+    def release(self, path: str):
+        """Drop one reference; the last one queues the directory for deletion."""
+        with self._lock:
+            refs = self._refs.get(path)
+            if refs is None:
+                logger.warning(f"[WORKSPACE] Release of unknown workspace {path}")
+                return
+            if refs > 1:
+                self._refs[path] = refs - 1
+                return
+            del self._refs[path]
+        self.unlease(path, self._owner)
+
+    def refcount(self, path: str) -> int:
+        with self._lock:
+            return self._refs.get(path, 0)
+
+    # ── Cross-process leases ────────────────────────────────────────────────
+
+    @staticmethod
+    def _lease_dir(path: str) -> str:
+        # Next to the workspace, not under self.root: any process can find a
+        # workspace's leases from its path alone
+        return os.path.join(os.path.dirname(path), ".leases", os.path.basename(path))
+
+    def leases(self, path: str) -> list:
+        try:
+            return sorted(os.listdir(self._lease_dir(path)))
+        except OSError:
+            return []
+
+    def lease(self, path: str, owner: str):
+        """Record `owner` as a holder of path; idempotent."""
+        lease_dir = self._lease_dir(path)
+        os.makedirs(lease_dir, exist_ok=True)
+        with open(os.path.join(lease_dir, owner), "w"):
+            pass
+
+    def unlease(self, path: str, owner: str):
+        """Drop `owner`'s lease; the last one queues the directory for deletion."""
+        try:
+            os.remove(os.path.join(self._lease_dir(path), owner))
+        except FileNotFoundError:
+            logger.warning(f"[WORKSPACE] {owner} held no lease on {path}")
+        if not self.leases(path):
+            self._gc_queue.put(path)
+
+    # ── Garbage collection ──────────────────────────────────────────────────
+
+    def _gc_loop(self):
+        while True:
+            try:
+                path = self._gc_queue.get(timeout=WORKSPACE_HEARTBEAT_SECONDS)
+            except queue.Empty:
+                self._heartbeat()
+                continue
+            try:
+                # A holder may have leased it again while it sat in the queue
+                if self.leases(path):
+                    continue
+                if os.path.exists(path):
+                    release_checkout(path)
+                    logger.info(f"[WORKSPACE] Collected {path}")
+                shutil.rmtree(self._lease_dir(path), ignore_errors=True)
+            except Exception as e:
+                logger.warning(f"[WORKSPACE] Could not collect {path}: {e}")
+            finally:
+                self._gc_queue.task_done()
+
+    def _heartbeat(self):
+        """Refresh our own leases' mtimes and drop leases of expired reports."""
+        with self._lock:
+            paths = list(self._refs)
+        for path in paths:
+            try:
+                os.utime(os.path.join(self._lease_dir(path), self._owner))
+            except OSError:
+                pass
+        try:
+            self.expire_leases("report-", REPORT_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"[WORKSPACE] Could not expire report leases: {e}")
+
+    def expire_leases(self, prefix: str, max_age: float) -> int:
+        """
+        Drop the leases whose owner starts with `prefix` and that are older
+        than max_age seconds, e.g. "report-" leases once their report is past
+        its TTL. Workspaces left without a lease are queued for deletion.
+        Returns the number dropped.
+        """
+        cutoff = time.time() - max_age
+        expired = 0
+        try:
+            names = os.listdir(self.leases_dir)
+        except OSError:
+            return 0
+        for name in names:
+            path = os.path.join(self.root, name)
+            for owner in self.leases(path):
+                if not owner.startswith(prefix):
+                    continue
+                lease_file = os.path.join(self._lease_dir(path), owner)
+                try:
+                    if os.stat(lease_file).st_mtime >= cutoff:
+                        continue
+                    os.remove(lease_file)
+                except FileNotFoundError:
+                    continue   # refreshed or dropped by another process meanwhile
+                expired += 1
+                if not self.leases(path):
+                    self._gc_queue.put(path)
+        if expired:
+            logger.info(f"[WORKSPACE] Dropped {expired} expired {prefix}lease(s)")
+        return expired
+
+    def _lease_live(self, path: str, owner: str, cutoff: float) -> bool:
+        """
+        Whether a lease still has a holder: proc-<host>-<pid> on this host
+        while that process runs, run-<id> while its job is queued or running;
+        any other lease (a process on another host or container, a run with
+        no job, i.e. inline) until it is older than cutoff.
+        """
+        if owner.startswith("proc-"):
+            host, _, pid = owner[len("proc-"):].rpartition("-")
+            # A pid only means something in our own namespace; leases from
+            # other hosts are judged by the mtime their heartbeat keeps fresh
+            if host == self._host:
+                if owner == self._owner:
+                    # Ours, yet not in self._refs: a dead process that had our pid
+                    return False
+                try:
+                    os.kill(int(pid), 0)
+                except ProcessLookupError:
+                    return False
+                except (PermissionError, ValueError):
+                    return True
+                return True
+        if owner.startswith("run-"):
+            job = get_job_queue().find(owner)
+            if job is not None:
+                return job["status"] in ("queued", "running")
+        try:
+            return os.stat(os.path.join(self._lease_dir(path), owner)).st_mtime >= cutoff
+        except OSError:
+            return False
+
+    def sweep_orphans(self, max_age_hours: float = None) -> int:
+        """
+        Queue untracked directories under root older than max_age_hours for
+        deletion, leases and all — unless one of their leases is still live
+        (see _lease_live). Returns the number queued.
+        """
+        max_age = (WORKSPACE_ORPHAN_HOURS if max_age_hours is None else max_age_hours) * 3600
+        self.expire_leases("report-", REPORT_TTL_SECONDS)
+        cutoff = time.time() - max_age
+        swept = 0
+        try:
+            entries = list(os.scandir(self.root))
+        except OSError:
+            return 0
+        for entry in entries:
+            if entry.path == self.leases_dir:
+                continue
+            with self._lock:
+                live = entry.path in self._refs
+            try:
+                stale = entry.is_dir(follow_symlinks=False) and entry.stat().st_mtime < cutoff
+            except OSError:
+                continue
+            if live or not stale:
+                continue
+            try:
+                if any(self._lease_live(entry.path, owner, cutoff) for owner in self.leases(entry.path)):
+                    continue
+            except Exception as e:
+                logger.warning(f"[WORKSPACE] Could not check the leases of {entry.path}, keeping it: {e}")
+                continue
+            shutil.rmtree(self._lease_dir(entry.path), ignore_errors=True)
+            self._gc_queue.put(entry.path)
+            swept += 1
+        if swept:
+            logger.info(f"[WORKSPACE] Sweeping {swept} orphaned workspace(s)")
+        return swept
+
+    def drain(self, timeout: float = None) -> bool:
+        """Wait for queued deletions to finish (tests, shutdown). False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._gc_queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            live = len(self._refs)
+        return {"root": self.root, "live": live, "pending_gc": self._gc_queue.unfinished_tasks}
+
+
+def get_workspace_manager() -> WorkspaceManager:
+    """Process-wide workspace manager, created lazily on first use."""
+    global _workspace_manager
+    with _workspace_manager_lock:
+        if _workspace_manager is None:
+            _workspace_manager = WorkspaceManager()
+    return _workspace_manager
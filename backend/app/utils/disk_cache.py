@@ -0,0 +1,170 @@
+# app/utils/disk_cache.py
+# Persistent, size-bounded key/value cache backed by SQLite.
+# Least-recently-used entries are evicted once the stored bytes exceed max_bytes.
+# Hits don't write: their access times are buffered and flushed in one
+# transaction (on put, every TOUCH_FLUSH_SIZE hits, or on flush()), and the
+# stored byte total lives in a meta row instead of being summed on every put.
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+TOUCH_FLUSH_SIZE = 256      # buffered hits before their access times are written
+TOUCH_FLUSH_SECONDS = 30.0
+
+
+class DiskCache:
+    """
+    A small LRU cache on disk. Keys and values are strings.
+
+    SQLite (WAL mode) lets several uvicorn workers share one cache file;
+    a lock serialises access from threads within a process.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._touched = {}   # key → last access time, not yet written
+        self._touched_at = time.monotonic()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON entries(last_used)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        # Caches created before the meta row existed: total them once
+        self._conn.execute(
+            "INSERT OR IGNORE INTO meta (name, value)"
+            " SELECT 'bytes', COALESCE(SUM(size), 0) FROM entries"
+        )
+        self._conn.commit()
+
+    def get(self, key: str):
+        """Return the cached value (and mark it recently used), or None on a miss."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[key] = time.time()
+            if (len(self._touched) >= TOUCH_FLUSH_SIZE
+                    or time.monotonic() - self._touched_at >= TOUCH_FLUSH_SECONDS):
+                self._write_touched()
+                self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, value: str):
+        size = len(key) + len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._write_touched()
+                old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                    (key, value, size, time.time())
+                )
+                self._add_bytes(size - (old[0] if old else 0))
+                self._evict()
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._touched.pop(key, None)
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+                if old:
+                    self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    self._add_bytes(-old[0])
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._conn.commit()
+
+    def flush(self):
+        """Write buffered access times now (e.g. at the end of a scan)."""
+        with self._lock:
+            if self._touched:
+                self._write_touched()
+                self._conn.commit()
+
+    def _write_touched(self):
+        """One batched UPDATE for the buffered hits. Caller holds the lock and commits."""
+        if self._touched:
+            self._conn.executemany("UPDATE entries SET last_used = ? WHERE key = ?",
+                                   [(used, key) for key, used in self._touched.items()])
+            self._touched = {}
+        self._touched_at = time.monotonic()
+
+    def _add_bytes(self, delta: int):
+        if delta:
+            self._conn.execute("UPDATE meta SET value = value + ? WHERE name = 'bytes'", (delta,))
+
+    def _total_bytes(self) -> int:
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'bytes'").fetchone()
+        return row[0] if row else 0
+
+    def _evict(self):
+        """Drop least-recently-used rows until the cache fits in max_bytes. Caller holds the lock."""
+        total = self._total_bytes()
+        if total <= self.max_bytes:
+            return
+
+        # Evict down to 90% so we don't pay this on every single put
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute("SELECT key, size FROM entries ORDER BY last_used ASC")
+        doomed = []
+        for key, size in rows:
+            if total <= target:
+                break
+            doomed.append((key,))
+            total -= size
+
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+        self._add_bytes(total - self._total_bytes())
+        self.evictions += len(doomed)
+        logger.info(f"[CACHE] Evicted {len(doomed)} entries from {os.path.basename(self.path)}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            size = self._total_bytes()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._touched = {}
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("UPDATE meta SET value = 0 WHERE name = 'bytes'")
+            self._conn.commit()
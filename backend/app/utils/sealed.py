@@ -0,0 +1,39 @@
+# app/utils/sealed.py
+# Symmetric sealing for secrets that have to be persisted (GitHub tokens in
+# stored scan reports and queued jobs). Fernet with a key derived from
+# SECRET_KEY, so every API and worker process sharing the .env can unseal.
+# There is no fallback key: without SECRET_KEY nothing is sealed or unsealed.
+
+import os
+import base64
+import hashlib
+
+from cryptography.fernet import Fernet, InvalidToken
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_PREFIX = "sealed:"
+
+
+def _fernet() -> Fernet:
+    secret = os.getenv("SECRET_KEY")
+    if not secret:
+        raise ValueError("SECRET_KEY is missing from environment; it is needed to seal stored tokens")
+    return Fernet(base64.urlsafe_b64encode(hashlib.sha256(secret.encode("utf-8")).digest()))
+
+
+def seal(value: str) -> str:
+    if not value or value.startswith(_PREFIX):
+        return value
+    return _PREFIX + _fernet().encrypt(value.encode("utf-8")).decode("ascii")
+
+
+def unseal(value: str) -> str:
+    """Inverse of seal(); plain values pass through unchanged."""
+    if not value or not value.startswith(_PREFIX):
+        return value
+    try:
+        return _fernet().decrypt(value[len(_PREFIX):].encode("ascii")).decode("utf-8")
+    except InvalidToken:
+        raise ValueError("Sealed value was sealed with a different SECRET_KEY")
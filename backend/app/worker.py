@@ -0,0 +1,171 @@
+# app/worker.py
+# Healing-run worker processes.
+# Pulls jobs from the durable job queue (app/services/job_queue.py) and runs
+# them outside the API process, so a reload or crash of the API no longer
+# kills in-flight runs and healing doesn't compete with request handling.
+#
+# Usage (from backend/):
+#   python -m app.worker [--processes 2]
+
+import os
+import time
+import signal
+import socket
+import asyncio
+import logging
+import argparse
+import threading
+import multiprocessing
+
+from app.services.job_queue import JOB_VISIBILITY_TIMEOUT, get_job_queue
+
+logger = logging.getLogger(__name__)
+
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", "2"))
+WORKER_POLL_SECONDS = float(os.getenv("WORKER_POLL_SECONDS", "2"))
+
+
+# ─── Job handlers ────────────────────────────────────────────────────────────
+
+async def _heal(run_id, data, db, retry: bool):
+    from app.controllers.agent_controller import process_healing_task
+    from app.services.llm_client import aclose_all
+
+    try:
+        await process_healing_task(run_id, data, db, retry=retry)
+    finally:
+        # Each job gets a fresh event loop; its pooled LLM connections go with it
+        await aclose_all()
+
+
+def _run_heal(job: dict, final_attempt: bool):
+    """
+    One healing run. The job holds a workspace lease ("run-<id>") taken at
+    enqueue time; it is given up once the job is done for good. Later
+    attempts start the run over (see process_healing_task's retry).
+    """
+    from app.db.database import SessionLocal
+    from app.db.models import Run
+    from app.services.workspace_manager import get_workspace_manager
+
+    run_id = job["payload"]["run_id"]
+    data = job["payload"]["data"]
+    db = SessionLocal()
+    try:
+        try:
+            asyncio.run(_heal(run_id, data, db, retry=job["attempts"] > 1))
+        except Exception:
+            if final_attempt:
+                run = db.query(Run).filter(Run.id == run_id).first()
+                if run:
+                    run.status = "FAILED"
+                    db.commit()
+                get_workspace_manager().unlease(data["local_path"], f"run-{run_id}")
+            raise
+        get_workspace_manager().unlease(data["local_path"], f"run-{run_id}")
+    finally:
+        db.close()
+
+
+HANDLERS = {
+    "heal": _run_heal,
+}
+
+
+# ─── Worker loop ─────────────────────────────────────────────────────────────
+
+def _heartbeat(queue, job_id: int, worker: str, stop: threading.Event):
+    """Keep the claim alive while the job runs; a dead worker stops heartbeating."""
+    while not stop.wait(JOB_VISIBILITY_TIMEOUT / 3):
+        if not queue.heartbeat(job_id, worker):
+            logger.warning(f"[WORKER] {worker} lost its claim on job {job_id}")
+            return
+
+
+def run_one(queue, job: dict, worker: str):
+    handler = HANDLERS.get(job["kind"])
+    if handler is None:
+        queue.fail(job["id"], worker, f"No handler for job kind '{job['kind']}'")
+        return
+
+    stop = threading.Event()
+    beat = threading.Thread(target=_heartbeat, args=(queue, job["id"], worker, stop), daemon=True)
+    beat.start()
+    try:
+        handler(job, final_attempt=job["attempts"] >= job["max_attempts"])
+    except Exception as e:
+        logger.exception(f"[WORKER] Job {job['id']} failed")
+        queue.fail(job["id"], worker, f"{type(e).__name__}: {e}")
+    else:
+        queue.complete(job["id"], worker)
+        logger.info(f"[WORKER] Job {job['id']} done")
+    finally:
+        stop.set()
+        beat.join()
+
+
+def worker_loop(index: int):
+    """One worker process: claim, run, repeat until SIGTERM/SIGINT."""
+    logging.basicConfig(level=logging.INFO)
+    worker = f"{socket.gethostname()}-{os.getpid()}-{index}"
+    stopping = threading.Event()
+
+    def request_stop(signum, frame):
+        # Finish the current job, then exit; an abrupt kill is covered by the
+        # visibility timeout
+        stopping.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    queue = get_job_queue()
+    logger.info(f"[WORKER] {worker} polling {queue.path}")
+    while not stopping.is_set():
+        job = queue.claim(worker)
+        if job is None:
+            stopping.wait(WORKER_POLL_SECONDS)
+            continue
+        run_one(queue, job, worker)
+    logger.info(f"[WORKER] {worker} stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run healing-job worker processes")
+    parser.add_argument("--processes", type=int, default=WORKER_PROCESSES)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    # Only the supervisor sweeps orphaned workspaces; the workers it spawns
+    # hold leases of their own
+    from app.services.workspace_manager import get_workspace_manager
+    get_workspace_manager().sweep_orphans()
+
+    ctx = multiprocessing.get_context("spawn")
+    processes = [ctx.Process(target=worker_loop, args=(i,), name=f"worker-{i}") for i in range(args.processes)]
+    for p in processes:
+        p.start()
+
+    stopping = threading.Event()
+
+    def forward(signum, frame):
+        stopping.set()
+        for p in processes:
+            if p.is_alive():
+                os.kill(p.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+
+    # Replace processes that die unexpectedly (OOM kill, crash in a dependency...)
+    while any(p.is_alive() for p in processes) or not stopping.is_set():
+        time.sleep(1)
+        for i, p in enumerate(processes):
+            if not stopping.is_set() and not p.is_alive() and p.exitcode != 0:
+                logger.warning(f"[WORKER] {p.name} exited with {p.exitcode}, restarting")
+                processes[i] = ctx.Process(target=worker_loop, args=(i,), name=p.name)
+                processes[i].start()
+
+
+if __name__ == "__main__":
+    main()
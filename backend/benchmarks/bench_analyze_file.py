@@ -0,0 +1,130 @@
+# benchmarks/bench_analyze_file.py
+# Micro-benchmark: per-file cost of the AST stage of analyze_file.
+#
+#   before → the old flow: ast.parse + compile() + ast.parse, then two ast.walk passes
+#   after  → analyze_source: one parse, one walk, checks dispatched by node type
+#
+# flake8 is left out on both sides; it runs as a separate batched stage.
+#
+# Usage (from backend/):
+#   python -m benchmarks.bench_analyze_file [--files 300] [--funcs 80] [--repeat 3]
+
+import argparse
+import ast
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.import_resolver import ImportResolver  # noqa: E402
+from app.services.repo_scanner import analyze_source  # noqa: E402
+
+
+# ─── Synthetic corpus ────────────────────────────────────────────────────────
+
+FUNC_TEMPLATE = '''
+def handler_{i}(payload, retries=3):
+    """Generated function {i}."""
+    total = 0
+    for item in payload.get("items", []):
+        if item.get("enabled") and retries > 0:
+            total += item["value"] * {i}
+        else:
+            label = "item-" + str(item.get("id"))
+            path = os.path.join("/tmp", label)
+            total -= len(json.dumps({{"path": path}}))
+    message = "total=" + total
+    return re.sub(r"\\s+", " ", message)
+'''
+
+
+def build_corpus(root: str, n_files: int, n_funcs: int) -> list:
+    header = "import os\nimport re\nimport json\nfrom collections import OrderedDict, defaultdict\n"
+    body = "".join(FUNC_TEMPLATE.format(i=i) for i in range(n_funcs))
+    paths = []
+    for n in range(n_files):
+        path = os.path.join(root, f"module_{n}.py")
+        with open(path, "w") as f:
+            f.write(header + body)
+        paths.append(path)
+    return paths
+
+
+# ─── Legacy flow (pre single-pass), kept here only for comparison ───────────
+
+def legacy_analyze_source(source: str, file_path: str) -> list:
+    errors = []
+    try:
+        ast.parse(source)
+    except SyntaxError:
+        return ["SYNTAX"]
+    try:
+        compile(source, file_path, "exec")
+    except IndentationError:
+        return ["INDENTATION"]
+
+    tree = ast.parse(source)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom):
+            names = [alias.name for alias in node.names]
+            mod = __import__(node.module or "", fromlist=names)
+            errors.extend("IMPORT" for name in names if not hasattr(mod, name))
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                __import__(alias.name)
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+            left_str = isinstance(node.left, ast.Constant) and isinstance(node.left.value, str)
+            right_str = isinstance(node.right, ast.Constant) and isinstance(node.right.value, str)
+            if (left_str and isinstance(node.right, ast.Name)) or (right_str and isinstance(node.left, ast.Name)):
+                errors.append("TYPE_ERROR")
+    return errors
+
+
+# ─── Runner ──────────────────────────────────────────────────────────────────
+
+def time_per_file(fn, sources: list, repeat: int) -> float:
+    """Best-of-`repeat` mean seconds per file."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path, source in sources:
+            fn(path, source)
+        runs.append((time.perf_counter() - start) / len(sources))
+    return min(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-file cost of analyze_file's AST stage")
+    parser.add_argument("--files", type=int, default=300)
+    parser.add_argument("--funcs", type=int, default=80, help="functions per file")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        paths = build_corpus(root, args.files, args.funcs)
+        sources = []
+        for path in paths:
+            with open(path) as f:
+                sources.append((path, f.read()))
+
+        lines = statistics.mean(s.count("\n") for _, s in sources)
+        print(f"corpus: {len(sources)} files, ~{lines:.0f} lines each")
+
+        before = time_per_file(lambda p, s: legacy_analyze_source(s, p), sources, args.repeat)
+        # One resolver for the whole corpus, exactly as scan_repo shares it per scan
+        resolver = ImportResolver(root)
+        after = time_per_file(lambda p, s: analyze_source(s, os.path.relpath(p, root), p, root, resolver),
+                              sources, args.repeat)
+
+    print(f"before: {before * 1000:8.3f} ms/file")
+    print(f"after:  {after * 1000:8.3f} ms/file")
+    print(f"speedup: {before / after:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
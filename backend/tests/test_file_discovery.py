@@ -0,0 +1,72 @@
+# tests/test_file_discovery.py
+# .gitignore translation and test/source classification in discover_files.
+
+import os
+import re
+
+import pytest
+
+from app.services.file_discovery import _translate_glob, discover_files
+
+
+def _matches(pattern: str, path: str) -> bool:
+    return re.match(f"^{_translate_glob(pattern)}$", path) is not None
+
+
+@pytest.mark.parametrize("pattern, path, expected", [
+    ("*.pyc", "mod.pyc", True),
+    ("*.pyc", "pkg/mod.pyc", False),        # "*" stays inside one segment
+    ("build/**", "build/lib/mod.py", True),
+    ("**/cache", "cache", True),
+    ("**/cache", "a/b/cache", True),
+    ("a/**/b", "a/b", True),
+    ("a/**/b", "a/x/y/b", True),
+    ("mod?.py", "mod1.py", True),
+    ("mod?.py", "mod12.py", False),
+    ("mod[0-9].py", "mod7.py", True),
+    ("mod[!0-9].py", "mod7.py", False),
+    ("mod[!0-9].py", "modx.py", True),
+    ("\\*.py", "*.py", True),
+    ("\\*.py", "x.py", False),
+    ("file.py", "fileXpy", False),           # "." is literal
+])
+def test_translate_glob(pattern, path, expected):
+    assert _matches(pattern, path) is expected
+
+
+def _write(root, rel, text=""):
+    path = os.path.join(root, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def _rel(root, paths):
+    return sorted(os.path.relpath(p, root) for p in paths)
+
+
+def test_gitignore_rules_are_honoured(tmp_path):
+    root = str(tmp_path)
+    _write(root, ".gitignore", "generated/\n*.gen.py\n/top_only.py\n!keep.gen.py\n")
+    _write(root, "app/.gitignore", "local_*.py\n")
+    for rel in ["main.py", "top_only.py", "sub/top_only.py", "generated/x.py", "a.gen.py",
+                "keep.gen.py", "app/local_settings.py", "app/views.py", "local_ok.py"]:
+        _write(root, rel)
+
+    found = discover_files(root)
+    assert _rel(root, found["python_source"]) == [
+        "app/views.py", "keep.gen.py", "local_ok.py", "main.py", "sub/top_only.py"
+    ]
+
+
+def test_tests_are_classified_by_name_only(tmp_path):
+    root = str(tmp_path)
+    for rel in ["tests/test_api.py", "tests/conftest.py", "tests/helpers.py",
+                "pkg/db_test.py", "pkg/db.py", "web/app.test.js", "web/app.spec.ts"]:
+        _write(root, rel)
+
+    found = discover_files(root)
+    assert _rel(root, found["python_test"]) == ["pkg/db_test.py", "tests/test_api.py"]
+    assert _rel(root, found["python_source"]) == ["pkg/db.py", "tests/conftest.py", "tests/helpers.py"]
+    assert _rel(root, found["js_test"]) == ["web/app.test.js"]
+    assert _rel(root, found["ts_test"]) == ["web/app.spec.ts"]
@@ -0,0 +1,36 @@
+# tests/test_fix_validator.py
+# The local gate in front of every commit.
+
+import pytest
+
+from app.services.fix_validator import validate_fix
+
+ORIGINAL = "def g(x):\n    y = x + 1\n      return y\n"
+
+
+def test_accepts_a_fix_that_compiles(tmp_path):
+    fixed = "def g(x):\n    y = x + 1\n    return y\n"
+    verdict = validate_fix(ORIGINAL, fixed, "mod.py", str(tmp_path))
+    assert verdict["success"] is True
+
+
+@pytest.mark.parametrize("fixed, message", [
+    # Both parse, neither compiles
+    ("def g(x):\n    y = x + 1\nreturn y\n", "'return' outside function"),
+    ("def g(x):\n    return x\n\nyield 1\n", "'yield' outside function"),
+])
+def test_rejects_a_fix_that_parses_but_does_not_compile(tmp_path, fixed, message):
+    verdict = validate_fix(ORIGINAL, fixed, "mod.py", str(tmp_path))
+    assert verdict["success"] is False
+    assert message in verdict["reason"]
+
+
+def test_rejects_a_fix_that_deletes_a_definition(tmp_path):
+    original = "def f():\n    return 1\n\n\ndef g():\n    return 2\n"
+    verdict = validate_fix(original, "def f():\n    return 1\n", "mod.py", str(tmp_path))
+    assert verdict["success"] is False
+    assert "g" in verdict["reason"]
+
+
+def test_non_python_files_pass(tmp_path):
+    assert validate_fix("a: 1\n", "a: [\n", "config.yml", str(tmp_path))["success"] is True
@@ -0,0 +1,122 @@
+# tests/test_llm_client.py
+# LLMClient against a local stub of the chat completions endpoint: retries,
+# the shared 429 pause and hedging.
+
+import json
+import time
+import asyncio
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from app.services import llm_client
+from app.services.llm_client import LLMClient, LLMError, TokenBucket, aclose_all, get_llm_client
+
+
+class StubAPI(BaseHTTPRequestHandler):
+    """Answers POSTs from `script`: one (status, headers, delay) per request, then 200s."""
+    protocol_version = "HTTP/1.1"
+    script = []
+    requests = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        cls = type(self)
+        cls.requests += 1
+        status, headers, delay = cls.script.pop(0) if cls.script else (200, {}, 0)
+        time.sleep(delay)
+        if status == 200:
+            body = json.dumps({"choices": [{"message": {"content": f"answer {cls.requests}"}}]}).encode()
+        else:
+            body = b'{"message": "stub error"}'
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    monkeypatch.setattr(llm_client, "LLM_RETRY_BASE_SECONDS", 0.01)
+    StubAPI.script, StubAPI.requests = [], 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+async def _chat(client):
+    try:
+        return await client.chat("codestral-latest", [{"role": "user", "content": "fix it"}])
+    finally:
+        await client.aclose()
+
+
+def test_retries_server_errors(stub):
+    StubAPI.script = [(503, {}, 0), (502, {}, 0)]
+    client = LLMClient("key", base_url=stub, bucket=TokenBucket(6000, 10), hedge_after="off")
+
+    assert asyncio.run(_chat(client)) == "answer 3"
+    assert client.stats()["retries"] == 2
+
+
+def test_client_errors_are_not_retried(stub):
+    StubAPI.script = [(400, {}, 0)]
+    client = LLMClient("key", base_url=stub, bucket=TokenBucket(6000, 10), hedge_after="off")
+
+    with pytest.raises(LLMError) as e:
+        asyncio.run(_chat(client))
+    assert e.value.status_code == 400
+    assert StubAPI.requests == 1
+
+
+def test_gives_up_after_max_retries(stub):
+    StubAPI.script = [(500, {}, 0)] * 3
+    client = LLMClient("key", base_url=stub, bucket=TokenBucket(6000, 10), hedge_after="off", max_retries=2)
+
+    with pytest.raises(LLMError) as e:
+        asyncio.run(_chat(client))
+    assert e.value.status_code == 500
+    assert client.stats()["failures"] == 1
+
+
+def test_429_pauses_the_shared_bucket(stub):
+    StubAPI.script = [(429, {"Retry-After": "0.3"}, 0)]
+    bucket = TokenBucket(6000, 10)
+    client = LLMClient("key", base_url=stub, bucket=bucket, hedge_after="off")
+
+    started = time.monotonic()
+    assert asyncio.run(_chat(client)) == "answer 2"
+    assert time.monotonic() - started >= 0.3
+    # Every other caller on the bucket is held back for the same window
+    assert bucket._paused_until >= started + 0.3
+
+
+def test_hedge_wins_over_a_slow_primary(stub):
+    StubAPI.script = [(200, {}, 1.5)]   # the first request stalls
+    client = LLMClient("key", base_url=stub, bucket=TokenBucket(6000, 10), hedge_after=0.1)
+
+    started = time.monotonic()
+    assert asyncio.run(_chat(client)) == "answer 2"
+    assert time.monotonic() - started < 1.5
+    stats = client.stats()
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+
+
+def test_aclose_all_closes_the_loops_clients():
+    async def run():
+        client = get_llm_client("key")
+        assert get_llm_client("key") is client
+        await aclose_all()
+        assert client._http.is_closed
+        assert get_llm_client("key") is not client
+        await aclose_all()
+
+    asyncio.run(run())
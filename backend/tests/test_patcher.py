@@ -0,0 +1,78 @@
+# tests/test_patcher.py
+# apply_unified_diff: exact and drifted hunks, whitespace and context fuzz,
+# and the PatchError paths.
+
+import pytest
+
+from app.services.patcher import PatchError, apply_unified_diff, parse_unified_diff
+
+SOURCE = "".join(f"line {i}\n" for i in range(1, 21))
+
+
+def test_applies_an_exact_hunk():
+    diff = (
+        "--- a/mod.py\n"
+        "+++ b/mod.py\n"
+        "@@ -4,3 +4,3 @@\n"
+        " line 4\n"
+        "-line 5\n"
+        "+line five\n"
+        " line 6\n"
+    )
+    assert apply_unified_diff(SOURCE, diff) == SOURCE.replace("line 5\n", "line five\n")
+
+
+def test_finds_a_hunk_whose_line_numbers_drifted():
+    diff = "@@ -1,3 +1,3 @@\n line 14\n-line 15\n+line fifteen\n line 16\n"
+    assert apply_unified_diff(SOURCE, diff) == SOURCE.replace("line 15\n", "line fifteen\n")
+
+
+def test_ignores_trailing_whitespace_and_keeps_the_files_own():
+    source = "a = 1   \nb = 2\nc = 3\n"
+    diff = "@@ -1,3 +1,3 @@\n a = 1\n-b = 2\n+b = 20\n c = 3\n"
+    assert apply_unified_diff(source, diff) == "a = 1   \nb = 20\nc = 3\n"
+
+
+def test_drops_mismatched_context_up_to_fuzz():
+    diff = "@@ -9,5 +9,5 @@\n not in file\n line 10\n-line 11\n+line eleven\n line 12\n"
+    assert apply_unified_diff(SOURCE, diff) == SOURCE.replace("line 11\n", "line eleven\n")
+    with pytest.raises(PatchError):
+        apply_unified_diff(SOURCE, diff, fuzz=0)
+
+
+def test_insertion_after_line_n():
+    diff = "@@ -2,0 +3,1 @@\n+inserted\n"
+    assert apply_unified_diff("one\ntwo\nthree\n", diff) == "one\ntwo\ninserted\nthree\n"
+
+
+def test_removed_line_starting_with_dashes_is_not_a_header():
+    source = "x = 1\n-- comment\ny = 2\n"
+    diff = "@@ -1,3 +1,2 @@\n x = 1\n--- comment\n y = 2\n"
+    assert apply_unified_diff(source, diff) == "x = 1\ny = 2\n"
+
+
+def test_multiple_hunks_apply_in_order():
+    diff = (
+        "@@ -2,1 +2,1 @@\n-line 2\n+line two\n"
+        "@@ -18,1 +18,1 @@\n-line 18\n+line eighteen\n"
+    )
+    patched = apply_unified_diff(SOURCE, diff)
+    assert "line two\n" in patched and "line eighteen\n" in patched
+    assert len(patched.splitlines()) == 20
+
+
+@pytest.mark.parametrize("diff, message", [
+    ("", "No hunks"),
+    ("just prose\n", "outside a hunk"),
+    ("@@ -1,1 +1,1 @@\n line 1\n", "changes nothing"),
+    ("@@ -1,1 +1,1 @@\n*line 1\n", "Malformed"),
+])
+def test_malformed_diffs(diff, message):
+    with pytest.raises(PatchError, match=message):
+        parse_unified_diff(diff)
+
+
+def test_hunk_that_does_not_apply():
+    diff = "@@ -3,2 +3,2 @@\n nowhere\n-to be\n+found\n"
+    with pytest.raises(PatchError, match="doesn't apply"):
+        apply_unified_diff(SOURCE, diff)
@@ -0,0 +1,133 @@
+# tests/test_repo_scanner.py
+# Incremental scans: scope from git diff, only changed files and importers of
+# changed modules analyzed, everything else carried over.
+
+import os
+
+import pytest
+from git import Repo
+
+from app.services import repo_scanner
+from app.services.repo_scanner import _incremental_scope, scan_repo
+from app.utils.disk_cache import DiskCache
+
+
+@pytest.fixture(autouse=True)
+def analysis_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(repo_scanner, "_analysis_cache", DiskCache(str(tmp_path / "analysis.sqlite3"), 1 << 20))
+
+
+@pytest.fixture
+def repo(tmp_path):
+    root = tmp_path / "repo"
+    root.mkdir()
+    git_repo = Repo.init(root)
+    with git_repo.config_writer() as cw:
+        cw.set_value("user", "name", "test")
+        cw.set_value("user", "email", "test@example.com")
+    (root / "lib.py").write_text("def helper():\n    return 1\n")
+    (root / "app.py").write_text("from lib import helper\n\nprint(helper())\n")
+    (root / "other.py").write_text("print('unrelated')\n")
+    git_repo.git.add(A=True)
+    git_repo.index.commit("initial")
+    return str(root), git_repo
+
+
+def _commit(git_repo, message):
+    git_repo.git.add(A=True)
+    git_repo.index.commit(message)
+
+
+def _sources(root):
+    return [os.path.join(root, name) for name in ("app.py", "lib.py", "other.py")]
+
+
+def test_scope_needs_a_base_and_a_previous_report(repo):
+    root, git_repo = repo
+    head = git_repo.head.commit.hexsha
+    assert _incremental_scope(root, _sources(root), None, {"errors": [], "imports": {}}) is None
+    assert _incremental_scope(root, _sources(root), head, None) is None
+    # A report from before per-file import data was stored
+    assert _incremental_scope(root, _sources(root), head, {"errors": []}) is None
+
+
+def test_scope_falls_back_on_an_unknown_base(repo):
+    root, _ = repo
+    assert _incremental_scope(root, _sources(root), "0" * 40, {"errors": [], "imports": {}}) is None
+
+
+def test_scope_keeps_files_that_import_nothing_changed(repo):
+    root, git_repo = repo
+    first = scan_repo(root, workers=1)
+    assert first["imports"]["app.py"] == ["lib", "lib.helper"]
+
+    with open(os.path.join(root, "lib.py"), "a") as f:
+        f.write("\n\ndef extra():\n    return 2\n")
+    _commit(git_repo, "change lib")
+    with open(os.path.join(root, "new.py"), "w") as f:   # untracked counts as changed
+        f.write("x = 1\n")
+
+    analyze, carried_errors, carried_imports, changed = _incremental_scope(
+        root, _sources(root) + [os.path.join(root, "new.py")], first["commit"], first
+    )
+    # app.py imports lib, so it is re-checked; other.py is not
+    assert sorted(os.path.basename(f) for f in analyze) == ["app.py", "lib.py", "new.py"]
+    assert carried_imports == {"other.py": []}
+    assert carried_errors == []
+    assert changed == {"lib.py", "new.py"}
+
+
+def test_unrelated_change_analyzes_only_the_changed_file(repo):
+    root, git_repo = repo
+    with open(os.path.join(root, "app.py"), "a") as f:
+        f.write("import os\n")
+    _commit(git_repo, "unused import")
+    first = scan_repo(root, workers=1)
+    assert [(e["file"], e["bug_type"]) for e in first["errors"]] == [("app.py", "LINTING")]
+
+    with open(os.path.join(root, "other.py"), "w") as f:
+        f.write("print('still unrelated')\n")
+    _commit(git_repo, "touch other")
+
+    second = scan_repo(root, workers=1, base_commit=first["commit"], previous_report=first)
+    assert second["incremental"] == {
+        "base_commit": first["commit"], "changed_files": 1, "analyzed_files": 1, "carried_files": 2
+    }
+    assert second["cache"]["hits"] + second["cache"]["misses"] == 1
+    # app.py's error is carried over without re-analysis
+    assert second["errors"] == first["errors"]
+    assert second["imports"] == first["imports"]
+
+
+def test_untouched_importer_picks_up_a_broken_import(repo):
+    root, git_repo = repo
+    first = scan_repo(root, workers=1)
+    assert first["errors"] == []
+
+    with open(os.path.join(root, "lib.py"), "w") as f:
+        f.write("def renamed():\n    return 1\n")
+    _commit(git_repo, "rename helper")
+
+    second = scan_repo(root, workers=1, base_commit=first["commit"], previous_report=first)
+    assert second["incremental"] == {
+        "base_commit": first["commit"], "changed_files": 1, "analyzed_files": 2, "carried_files": 1
+    }
+    assert second["cache"] == {"hits": 1, "misses": 1}   # app.py replayed, lib.py analyzed
+    assert [(e["file"], e["bug_type"]) for e in second["errors"]] == [("app.py", "IMPORT")]
+
+
+def test_untouched_importer_drops_a_fixed_import(repo):
+    root, git_repo = repo
+    with open(os.path.join(root, "lib.py"), "w") as f:
+        f.write("def renamed():\n    return 1\n")
+    _commit(git_repo, "rename helper")
+    first = scan_repo(root, workers=1)
+    assert [e["file"] for e in first["errors"]] == ["app.py"]
+
+    with open(os.path.join(root, "lib.py"), "a") as f:
+        f.write("\n\nhelper = renamed\n")
+    _commit(git_repo, "restore helper")
+
+    second = scan_repo(root, workers=1, base_commit=first["commit"], previous_report=first)
+    assert second["incremental"]["analyzed_files"] == 2
+    assert second["errors"] == []
@@ -0,0 +1,65 @@
+# tests/test_workspace_manager.py
+# Cross-process leases: which holders keep an orphaned workspace alive, and
+# report leases expiring with the report TTL.
+
+import os
+import time
+import subprocess
+import sys
+
+import pytest
+
+from app.services.workspace_manager import WorkspaceManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return WorkspaceManager(root=str(tmp_path / "runs"))
+
+
+def _workspace(manager, name, owner, age=0):
+    """An untracked workspace dir held by `owner`, both `age` seconds old."""
+    path = os.path.join(manager.root, name)
+    os.makedirs(path)
+    manager.lease(path, owner)
+    then = time.time() - age
+    os.utime(os.path.join(manager._lease_dir(path), owner), (then, then))
+    os.utime(path, (then, then))
+    return path
+
+
+def test_other_hosts_leases_are_judged_by_age(manager):
+    # pid 1 is alive in every container; on another host it proves nothing
+    fresh = _workspace(manager, "fresh", "proc-other-host-1")
+    os.utime(fresh, (time.time() - 7200, time.time() - 7200))
+    stale = _workspace(manager, "stale", "proc-other-host-1", age=7200)
+
+    assert manager.sweep_orphans(max_age_hours=1) == 1
+    assert manager.drain(timeout=5)
+    assert os.path.exists(fresh)
+    assert not os.path.exists(stale)
+
+
+def test_local_leases_are_checked_by_pid(manager):
+    done = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                          capture_output=True, text=True, check=True)
+    dead = _workspace(manager, "dead", f"proc-{manager._host}-{done.stdout.strip()}", age=7200)
+    alive = _workspace(manager, "alive", f"proc-{manager._host}-{os.getppid()}", age=7200)
+
+    assert manager.sweep_orphans(max_age_hours=1) == 1
+    assert manager.drain(timeout=5)
+    assert not os.path.exists(dead)
+    assert os.path.exists(alive)
+
+
+def test_report_leases_expire(manager):
+    expired = _workspace(manager, "expired", "report-team", age=120)
+    kept = _workspace(manager, "kept", "report-team")
+    shared = _workspace(manager, "shared", "report-team", age=120)
+    manager.lease(shared, "run-7")
+
+    assert manager.expire_leases("report-", 60) == 2
+    assert manager.drain(timeout=5)
+    assert not os.path.exists(expired)
+    assert manager.leases(kept) == ["report-team"]
+    assert manager.leases(shared) == ["run-7"] and os.path.exists(shared)